@@ -0,0 +1 @@
+"""Performance benchmarks for UVSim, see suite.py."""
@@ -0,0 +1,50 @@
+"""Run the benchmark suite: python -m benchmarks [--save] [--threshold 0.2] [--only NAME ...]
+
+Exits with status 1 when a benchmark regressed beyond the threshold against the baseline,
+or when there is no baseline to compare against (create one with --save).
+"""
+
+import argparse
+import sys
+
+from benchmarks.suite import BASELINE, THRESHOLD, compare, load_baseline, run_benchmarks, save_baseline
+
+
+def main(argv=None):
+    """Run the suite from the command line, returning the exit status."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="UVSim performance benchmarks")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"allowed slowdown as a fraction of the baseline (default: {THRESHOLD})")
+    parser.add_argument("--scale", type=float, default=1.0, help="work per round, use e.g. 0.1 for a quick run")
+    parser.add_argument("--only", nargs="+", metavar="NAME", default=None, help="run only these benchmarks")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.scale, args.only)
+    baseline = load_baseline(args.baseline)
+
+    regressed = False
+    if baseline is None:
+        for name, result in results.items():
+            print(f"{name:<26} {result['rate']:>16,.0f} {result['unit']}")
+        if not args.save:
+            print(f"Error: no baseline at {args.baseline}, run with --save on a reference machine to create one",
+                  file=sys.stderr)
+            return 1
+    else:
+        for entry in compare(results, baseline, args.threshold):
+            flag = "  REGRESSED" if entry["regressed"] else ""
+            print(f"{entry['name']:<26} {entry['rate']:>16,.0f} {entry['unit']:<16} "
+                  f"{entry['change']:+7.1%} vs {entry['baseline']:,.0f}{flag}")
+            regressed = regressed or entry["regressed"]
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
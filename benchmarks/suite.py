@@ -0,0 +1,229 @@
+"""Benchmarks of the core execution and rendering paths.
+
+Every benchmark returns a rate (higher is better) with its unit. Results are
+compared against a JSON baseline, and a benchmark regresses when its rate falls
+below the baseline by more than the threshold.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from src.boot import Bootstrapper
+from src.cpu import CPU
+from src.legacy import convert_file
+from src.memory import Memory
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Fraction a rate may drop below its baseline before it counts as a regression
+THRESHOLD = 0.2
+
+# Counts down from a large value: LOAD, SUBTRACT, STORE, BRANCHZERO, BRANCH per iteration
+LOOP_PROGRAM = ["+020006", "+031007", "+021006", "+042005", "+040000", "+043000", "+999999", "+000001"]
+
+
+def measure(function, operations, repeat=5, min_time=0.05):
+    """Return the best rate of function in operations per second.
+
+    Parameters:
+    function (callable): Performs `operations` operations per call, or returns the number it performed
+    operations (int): Work done by one call that returns None
+    repeat (int): Number of timed rounds, the fastest one is kept
+    min_time (float): Each round calls function until at least this many seconds passed
+    """
+    best = 0.0
+    for _ in range(repeat):
+        work = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            done = function()
+            work += operations if done is None else done
+            elapsed = time.perf_counter() - start
+        best = max(best, work / elapsed)
+    return best
+
+
+def bench_cpu_run(engine, steps):
+    """Instructions per second of a loop-heavy program."""
+    boot = Bootstrapper()
+    boot.load_program(LOOP_PROGRAM)
+    image = boot.image
+
+    def run():
+        # The loop counts down in memory: restore it so every run does the same work
+        boot.restore(image)
+        boot.run(None, max_steps=steps, engine=engine)
+        return boot.cpu.steps
+
+    return measure(run, steps), "instructions/s"
+
+
+def bench_memory_read(operations):
+    """Memory.read calls per second, cycling through every address."""
+    memory = Memory()
+
+    def read():
+        for address in range(operations):
+            memory.read(address % 250)
+
+    return measure(read, operations), "ops/s"
+
+
+def bench_memory_write(operations):
+    """Memory.write calls per second, cycling through every address."""
+    memory = Memory()
+
+    def write():
+        for address in range(operations):
+            memory.write(address % 250, "+000001")
+
+    return measure(write, operations), "ops/s"
+
+
+def bench_memory_str(operations):
+    """Renders per second of a full memory as text."""
+    memory = Memory()
+    memory.load_words(["+012345"] * 250)
+
+    def render():
+        for _ in range(operations):
+            str(memory)
+
+    return measure(render, operations), "ops/s"
+
+
+def bench_load_from_file(directory, operations):
+    """Loads per second of a 249-word program file written to directory."""
+    path = os.path.join(directory, "load.txt")
+    with open(path, "w") as file:
+        file.write("\n".join(f"+{20000 + i:06d}" for i in range(249)))
+    boot = Bootstrapper()
+
+    def load():
+        for _ in range(operations):
+            boot.load_from_file(path)
+
+    return measure(load, operations), "ops/s"
+
+
+def bench_convert_file(directory, operations):
+    """Conversions per second of a 249-word legacy program written to directory."""
+    path = os.path.join(directory, "legacy.txt")
+    with open(path, "w") as file:
+        file.write("\n".join(f"+{2000 + i % 100:04d}" for i in range(249)))
+
+    def convert():
+        for _ in range(operations):
+            convert_file(path)
+
+    return measure(convert, operations), "ops/s"
+
+
+def bench_update_memory_text(operations):
+    """Redraws per second of the memory grid with a few changed cells, against a hidden Tk root.
+
+    Returns None if no display is available.
+    """
+    try:
+        import tkinter as tk
+        from src import gui
+    except ImportError:
+        return None
+
+    boot = Bootstrapper()
+    boot.load_program(LOOP_PROGRAM)
+    try:
+        app = gui.App(boot, mainloop=False)
+    except tk.TclError:
+        return None
+    app.root.withdraw()
+
+    def update():
+        for step in range(operations):
+            boot.memory.write(6, step)
+            boot.cpu.pointer = step % 6
+            app.update_memory_text()
+
+    try:
+        return measure(update, operations), "ops/s"
+    finally:
+        app.root.destroy()
+
+
+def run_benchmarks(scale=1.0, only=None):
+    """Run the suite and return {name: {"rate": float, "unit": str}}.
+
+    Parameters:
+    scale (float): Multiplies the amount of work per round, small values give a quick smoke run
+    only (iterable): Names of the benchmarks to run, all by default
+    """
+    def size(n):
+        return max(1, int(n * scale))
+
+    directory = tempfile.mkdtemp(prefix="uvsim-bench-")
+    limit = CPU.MAX_INSTRUCTION_LIMIT
+    CPU.MAX_INSTRUCTION_LIMIT = 10**9  # max_steps bounds the loop, not the testing limit
+    benchmarks = {
+        "cpu_run_reference": lambda: bench_cpu_run("reference", size(20000)),
+        "cpu_run_fast": lambda: bench_cpu_run("fast", size(100000)),
+        "memory_read": lambda: bench_memory_read(size(10000)),
+        "memory_write": lambda: bench_memory_write(size(10000)),
+        "memory_str": lambda: bench_memory_str(size(100)),
+        "load_from_file": lambda: bench_load_from_file(directory, size(50)),
+        "convert_file": lambda: bench_convert_file(directory, size(50)),
+        "gui_update_memory_text": lambda: bench_update_memory_text(size(200)),
+    }
+
+    results = {}
+    try:
+        for name, benchmark in benchmarks.items():
+            if only and name not in only:
+                continue
+            result = benchmark()
+            if result is not None:  # Skipped, e.g. no display for the GUI benchmark
+                results[name] = {"rate": result[0], "unit": result[1]}
+    finally:
+        CPU.MAX_INSTRUCTION_LIMIT = limit
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def load_baseline(path=BASELINE):
+    """Return the saved baseline results, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_baseline(results, path=BASELINE):
+    """Write results as the new baseline."""
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Compare results against a baseline.
+
+    Returns:
+    list: One dict per benchmark in both, with the rate change and whether it regressed
+    """
+    comparison = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]["rate"]
+        change = result["rate"] / base - 1 if base else 0.0
+        comparison.append({
+            "name": name,
+            "rate": result["rate"],
+            "baseline": base,
+            "unit": result["unit"],
+            "change": change,
+            "regressed": change < -threshold,
+        })
+    return comparison
@@ -0,0 +1,350 @@
+"""Symbolic assembler for BasicML.
+
+Source programs contain one statement per line:
+
+    [label:] [MNEMONIC [operand]] [; comment]
+
+MNEMONIC is one of the BasicML operations (READ, WRITE, LOAD, STORE, ADD,
+SUBTRACT, DIVIDE, MULTIPLY, BRANCH, BRANCHNEG, BRANCHZERO, HALT) or the DATA
+directive, which places a literal word in memory. A bare signed word such as
++020007 is also accepted and is stored as is. Operands are either a label or a
+number. Every statement takes exactly one memory word, starting at address 0.
+
+The Assembler caches each parsed line, the address layout and the encoded words.
+Editing a program re-parses only the lines that changed, and unless an edit adds,
+removes or renames a label or a statement, only those lines are re-encoded.
+"""
+
+from src.memory import Memory
+
+OPCODES = {
+    "READ": 10,
+    "WRITE": 11,
+    "LOAD": 20,
+    "STORE": 21,
+    "ADD": 30,
+    "SUBTRACT": 31,
+    "DIVIDE": 32,
+    "MULTIPLY": 33,
+    "BRANCH": 40,
+    "BRANCHNEG": 41,
+    "BRANCHZERO": 42,
+    "HALT": 43,
+}
+
+DATA = "DATA"
+COMMENT_CHARS = (";", "#")
+
+
+class AssemblyError(ValueError):
+    """Raised for invalid assembly source, carrying the 1-based line number."""
+
+    def __init__(self, line, message):
+        """Store the line number alongside the message."""
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+        self.message = message
+
+
+def is_assembly(text: str):
+    """Guess whether program text is assembly source rather than BasicML words.
+
+    Only the first statement is inspected: BasicML word files start with a sign.
+    """
+    for line in text.splitlines():
+        code = strip_comment(line).strip()
+        if code:
+            return code[0] not in ("+", "-")
+    return False
+
+
+def strip_comment(text: str):
+    """Remove a trailing ; or # comment from a source line."""
+    for char in COMMENT_CHARS:
+        idx = text.find(char)
+        if idx != -1:
+            text = text[:idx]
+    return text
+
+
+def parse_number(token: str):
+    """Parse a signed decimal operand, returning None if token is not a number."""
+    digits = token[1:] if token[0] in ("+", "-") else token
+    if not digits.isdigit():
+        return None
+    return int(token)
+
+
+def parse_line(text: str):
+    """Parse a single source line.
+
+    Returns:
+    tuple: (label, mnemonic, operand) - any of which may be None
+
+    Raises:
+    ValueError: If the line is malformed
+    """
+    code = strip_comment(text)
+    label = None
+
+    if ":" in code:
+        label, _, code = code.partition(":")
+        label = label.strip()
+        if not label.isidentifier():
+            raise ValueError(f"Invalid label '{label}'")
+
+    tokens = code.split()
+    if not tokens:
+        return (label, None, None)
+    if len(tokens) > 2:
+        raise ValueError(f"Unexpected '{' '.join(tokens[2:])}'")
+
+    mnemonic = tokens[0].upper()
+    operand = tokens[1] if len(tokens) == 2 else None
+
+    if mnemonic[0] in ("+", "-"):
+        # Raw BasicML word
+        if operand is not None:
+            raise ValueError(f"Unexpected '{operand}'")
+        Memory.validate_word(mnemonic)
+        return (label, DATA, mnemonic)
+
+    if mnemonic != DATA and mnemonic not in OPCODES:
+        raise ValueError(f"Unknown mnemonic '{tokens[0]}'")
+    if operand is None and mnemonic not in ("HALT", DATA):
+        raise ValueError(f"{mnemonic} requires an operand")
+    if operand is None:
+        operand = "0"
+    if parse_number(operand) is None and not operand.isidentifier():
+        raise ValueError(f"Invalid operand '{operand}'")
+
+    return (label, mnemonic, operand)
+
+
+def layout_shape(statement):
+    """Return the part of a parsed line that affects the address layout: (label, takes a word)."""
+    if isinstance(statement, AssemblyError):
+        return (None, False)
+    return (statement[0], statement[1] is not None)
+
+
+class Assembler:
+    """Incremental assembler.
+
+    Call update() with the full list of source lines (or update_line() for a
+    single edited line), then assemble() to get BasicML words suitable for
+    Bootstrapper.load_program().
+    """
+
+    def __init__(self, memory_size=250):
+        """Create an empty assembler for a memory of memory_size words."""
+        self.memory_size = memory_size
+        self.lines = []
+        self.parsed = []  # (label, mnemonic, operand) or AssemblyError, per line
+        self.symbols = {}
+        self.addresses = []  # address -> index of the source line
+        self.words = []
+        self.errors = []
+        self.parse_count = 0
+        self.encode_count = 0
+        self._layout_valid = False  # addresses and symbols match self.parsed
+        self._layout_errors = []  # Duplicate labels and program size
+        self._encode_errors = {}  # line index -> AssemblyError
+        self._address_of = {}  # line index -> address
+        self._dirty = set()  # Lines changed since the last assemble()
+
+    def _parse(self, index, text):
+        self.parse_count += 1
+        try:
+            return parse_line(text)
+        except ValueError as e:
+            return AssemblyError(index + 1, str(e))
+
+    def update(self, lines):
+        """Replace the source, re-parsing only the lines that changed.
+
+        Lines shared with the previous source at the start and at the end are
+        kept, so inserting or deleting lines does not re-parse the rest.
+        """
+        lines = list(lines)
+        old = self.lines
+
+        start = 0
+        limit = min(len(old), len(lines))
+        while start < limit and old[start] == lines[start]:
+            start += 1
+
+        end = 0
+        while end < limit - start and old[-1 - end] == lines[-1 - end]:
+            end += 1
+
+        middle = [self._parse(i, lines[i]) for i in range(start, len(lines) - end)]
+        tail = self.parsed[len(old) - end:] if end else []
+        before = self.parsed
+        self.parsed = self.parsed[:start] + middle + tail
+        self.lines = lines
+
+        if len(lines) != len(old):
+            self._layout_valid = False
+        else:
+            for i in range(start, len(lines) - end):
+                self._changed(i, before[i])
+
+        # Errors in shifted lines carry stale line numbers
+        for i in range(len(lines) - end, len(lines)):
+            if isinstance(self.parsed[i], AssemblyError) and self.parsed[i].line != i + 1:
+                self.parsed[i] = AssemblyError(i + 1, self.parsed[i].message)
+
+    def update_line(self, index, text):
+        """Replace a single source line (0-based index), re-parsing only that line."""
+        if index == len(self.lines):
+            self.lines.append(text)
+            self.parsed.append(self._parse(index, text))
+            self._layout_valid = False
+        elif self.lines[index] != text:
+            before = self.parsed[index]
+            self.lines[index] = text
+            self.parsed[index] = self._parse(index, text)
+            self._changed(index, before)
+
+    def _changed(self, index, before):
+        """Record that a line was re-parsed, dropping the layout if its label or word changed."""
+        if layout_shape(before) != layout_shape(self.parsed[index]):
+            self._layout_valid = False
+        self._dirty.add(index)
+
+    def assemble(self):
+        """Lay out addresses, resolve symbols and encode the program.
+
+        The layout is kept between calls while no label or statement was added,
+        removed or renamed, then only the lines changed since the last call are
+        re-encoded.
+
+        Returns:
+        list: BasicML words as strings
+
+        Raises:
+        AssemblyError: For the first invalid line, also recorded in self.errors
+        """
+        if not self._layout_valid:
+            self._layout()
+        else:
+            self.words = list(self.words)  # Words returned by the last call stay unchanged
+            for index in self._dirty:
+                if index in self._address_of:
+                    self._encode_line(index, self._address_of[index])
+        self._dirty.clear()
+
+        self.errors = [p for p in self.parsed if isinstance(p, AssemblyError)]
+        self.errors.extend(self._layout_errors)
+        self.errors.extend(self._encode_errors.values())
+        if self.errors:
+            self.errors.sort(key=lambda e: e.line)
+            raise self.errors[0]
+
+        return self.words
+
+    def _layout(self):
+        """Assign addresses and symbols to every statement, then encode all of them."""
+        self.symbols = {}
+        self.addresses = []
+        self._layout_errors = []
+
+        for index, statement in enumerate(self.parsed):
+            if isinstance(statement, AssemblyError):
+                continue
+            label, mnemonic, _ = statement
+            if label is not None:
+                if label in self.symbols:
+                    self._layout_errors.append(AssemblyError(index + 1, f"Duplicate label '{label}'"))
+                self.symbols[label] = len(self.addresses)
+            if mnemonic is not None:
+                self.addresses.append(index)
+
+        if len(self.addresses) > self.memory_size:
+            self._layout_errors.append(
+                AssemblyError(self.addresses[self.memory_size] + 1, f"Program exceeds memory size of {self.memory_size}")
+            )
+
+        self._address_of = {index: address for address, index in enumerate(self.addresses)}
+        self._encode_errors = {}
+        self.words = ["+000000"] * len(self.addresses)
+        for address, index in enumerate(self.addresses):
+            self._encode_line(index, address)
+        self._layout_valid = True
+
+    def _encode_line(self, index, address):
+        self.encode_count += 1
+        self._encode_errors.pop(index, None)
+        try:
+            self.words[address] = self._encode(*self.parsed[index])
+        except ValueError as e:
+            self._encode_errors[index] = AssemblyError(index + 1, str(e))
+            self.words[address] = "+000000"
+
+    def _encode(self, label, mnemonic, operand):
+        value = parse_number(operand)
+        if value is None:
+            if operand not in self.symbols:
+                raise ValueError(f"Undefined label '{operand}'")
+            value = self.symbols[operand]
+
+        if mnemonic == DATA:
+            return Memory.int_to_word(value)
+
+        if not (0 <= value < min(self.memory_size, 1000)):
+            raise ValueError(f"Address {value} out of range")
+        return Memory.int_to_word(OPCODES[mnemonic] * 1000 + value)
+
+    def listing(self):
+        """Return a listing mapping each address to its word and source line."""
+        output = ["ADDR  WORD     LINE  SOURCE"]
+        for address, index in enumerate(self.addresses):
+            word = self.words[address] if address < len(self.words) else "???????"
+            output.append(f"{address:03d}   {word}  {index + 1:4d}  {self.lines[index].rstrip()}")
+
+        if self.symbols:
+            output.append("")
+            output.append("SYMBOL           ADDR")
+            for name, address in sorted(self.symbols.items(), key=lambda item: item[1]):
+                output.append(f"{name:<16} {address:03d}")
+
+        return "\n".join(output)
+
+    def source_line(self, address):
+        """Return the 1-based source line that produced the word at address."""
+        return self.addresses[address] + 1
+
+
+def assemble_file(file_name: str, output: str | None = None, listing: str | None = None, memory_size=250):
+    """Assemble a source file into a BasicML text program and a listing file.
+
+    Parameters:
+    file_name (str): Assembly source
+    output (str): Program destination, defaults to <name>_assembled.txt
+    listing (str): Listing destination, defaults to <name>.lst
+
+    Returns:
+    tuple: (program path, listing path)
+
+    Raises:
+    AssemblyError: If the source is invalid
+    """
+    with open(file_name, "r") as file:
+        lines = file.read().splitlines()
+
+    assembler = Assembler(memory_size)
+    assembler.update(lines)
+    words = assembler.assemble()
+
+    idx = file_name.rfind(".")
+    base_name = file_name[:idx] if idx > 0 else file_name
+    output = output or f"{base_name}_assembled.txt"
+    listing = listing or f"{base_name}.lst"
+
+    with open(output, "w") as file:
+        file.write("\n".join(words))
+    with open(listing, "w") as file:
+        file.write(assembler.listing() + "\n")
+
+    return output, listing
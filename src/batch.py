@@ -0,0 +1,93 @@
+"""Run many programs with many input tapes, optionally in parallel and with coverage.
+
+Used by the uvsim batch command. Every program is parsed once in the calling
+process, then every (program, input tape) pair runs as a job. With several
+workers the jobs run in a process pool, and coverage comes back from the
+workers as bitmaps that are merged per program (see coverage.py).
+"""
+
+import os
+
+from src.boot import Bootstrapper
+from src.coverage import CoverageMemory, ProgramCoverage
+from src.image import ProgramImage
+from src.tape import TapeIO
+
+
+def run_job(job):
+    """Run one program with one input tape, the unit of work of run_batch.
+
+    Parameters:
+    job (tuple): (program index, words, memory size, inputs, engine, max steps, coverage)
+
+    Returns:
+    dict: {"program", "inputs", "result", "outputs", "accumulator", "steps", "coverage" (bitmaps or None)}
+    """
+    index, words, memory_size, inputs, engine, max_steps, coverage = job
+    boot = Bootstrapper(memory_size)
+    boot.restore(ProgramImage(words, memory_size))
+    memory = CoverageMemory.attach(boot) if coverage else None
+    tape = TapeIO(inputs)
+    try:
+        result = boot.run(tape, max_steps=max_steps, engine=engine)
+    except (IndexError, ZeroDivisionError) as e:
+        result = f"Error: {e}"
+    return {
+        "program": index,
+        "inputs": list(inputs),
+        "result": result,
+        "outputs": tape.outputs,
+        "accumulator": f"{int(boot.cpu.accumulator):+07d}",
+        "steps": boot.cpu.steps,
+        "coverage": memory.bitmaps() if memory is not None else None,
+    }
+
+
+def run_batch(files, tapes=((),), engine="reference", max_steps=None, memory_size=250, workers=None,
+              coverage=False):
+    """Run every program with every input tape.
+
+    Parameters:
+    files (list): Text programs, assembly sources or binary images
+    tapes (list): Input tapes (lists of words), each program runs once per tape
+    engine (str): See Bootstrapper.run, coverage always uses the reference engine
+    max_steps (int): Instruction limit per run, see CPU.run
+    memory_size (int): Words of memory of every machine
+    workers (int): Worker processes, defaults to the CPU count. 1 runs in-process.
+    coverage (bool): Record and merge instruction coverage per program
+
+    Returns:
+    dict: {"runs": one result per job (see run_job, with "file" instead of "program"),
+           "coverage": ProgramCoverage.report() per program, or None}
+
+    Raises:
+    OSError, ValueError, IndexError: If a program can not be loaded
+    """
+    programs = [ProgramCoverage.from_file(file_name, memory_size) for file_name in files]
+    jobs = [
+        (index, tuple(program.words), memory_size, tuple(tape), engine, max_steps, coverage)
+        for index, program in enumerate(programs)
+        for tape in tapes
+    ]
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [run_job(job) for job in jobs]
+    else:
+        # Imported here: multiprocessing is only needed for parallel batches
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(run_job, jobs, chunksize=chunksize))
+
+    for result in results:
+        program = programs[result.pop("program")]
+        result["file"] = program.file_name
+        bitmaps = result.pop("coverage")
+        if bitmaps is not None:
+            program.add(bitmaps)
+
+    return {
+        "runs": results,
+        "coverage": [program.report() for program in programs] if coverage else None,
+    }
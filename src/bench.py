@@ -0,0 +1,87 @@
+"""Throughput measurement of a loaded program, used by the uvsim bench command."""
+
+import math
+import time
+import tracemalloc
+
+from src.boot import ENGINES
+from src.tape import TapeIO
+
+
+def percentile(samples, percent):
+    """Return the nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def bench_program(boot, engines=ENGINES, runs=20, warmup=3, inputs=(), max_steps=None):
+    """Run the program loaded in boot repeatedly under each engine.
+
+    Every run starts from the loaded program image with a fresh input tape,
+    only the run itself is timed. Warm-up runs are not timed. Peak memory is taken from one extra run under
+    tracemalloc, so tracing does not slow the timed runs.
+
+    Parameters:
+    boot (Bootstrapper): Bootstrapper with a program loaded
+    engines (iterable): Engines to compare, see Bootstrapper.run
+    runs (int): Timed runs per engine
+    warmup (int): Untimed runs per engine before timing
+    inputs (list): Words fed to READ on every run
+    max_steps (int): Instruction limit per run, see CPU.run
+
+    Returns:
+    dict: {engine: {"result", "steps", "runs", "instructions_per_second",
+          "latency": {"mean", "p50", "p90", "p99", "min", "max"} (seconds), "peak_memory" (bytes)}}
+
+    Raises:
+    ValueError: If no program is loaded
+    """
+    if boot.image is None:
+        raise ValueError("ValueError: No program loaded")
+    if runs < 1:
+        raise ValueError("ValueError: At least one timed run is needed")
+
+    def run(engine):
+        """Run once from the loaded image, returning (result, seconds spent running)."""
+        boot.restore(boot.image)
+        tape = TapeIO(inputs)
+        start = time.perf_counter()
+        result = boot.run(tape, max_steps=max_steps, engine=engine)
+        return result, time.perf_counter() - start
+
+    report = {}
+    for engine in engines:
+        for _ in range(warmup):
+            run(engine)
+
+        latencies = []
+        for _ in range(runs):
+            result, latency = run(engine)
+            latencies.append(latency)
+        steps = boot.cpu.steps
+
+        tracemalloc.start()
+        try:
+            run(engine)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        total = sum(latencies)
+        report[engine] = {
+            "result": result,
+            "steps": steps,
+            "runs": runs,
+            "instructions_per_second": steps * runs / total if total > 0 else 0.0,
+            "latency": {
+                "mean": total / runs,
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "min": min(latencies),
+                "max": max(latencies),
+            },
+            "peak_memory": peak,
+        }
+    return report
@@ -3,11 +3,17 @@
 import logging
 from typing import List
 from src.cpu import CPU
-from src.legacy import legacy_word_to_new
+from src.events import event
+from src.trace import span
+from src.image import ProgramImage, is_image, read_image
+from src.legacy import convert_word, legacy_word_to_new
 from src.memory import Memory
 
 LOGGER = logging.getLogger(__name__)
 
+# Execution engines accepted by Bootstrapper.run
+ENGINES = ("reference", "fast")
+
 
 class Bootstrapper:
     """Class to bootstrap the UVSim module.
@@ -15,14 +21,18 @@ class Bootstrapper:
     Parse a file containing BasicML instructions and load it into memory.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, memory_size=250) -> None:
         """Boostrap CPU, Memory, IOHandler."""
-        self.memory = Memory()
+        self.memory = Memory(memory_size)
         self.cpu = CPU(self.memory)
+        self.image = None
 
     def load_program(self, program):
         """Load a program from a list of instructions into memory, starting at address 0
-        
+
+        Legacy 4-digit words are detected per line and converted in memory, so
+        legacy, 6-digit and mixed programs can all be loaded directly.
+
         Parameters:
         program (list): List of strings representing BasicML instructions
 
@@ -31,8 +41,9 @@ class Bootstrapper:
         IndexError: If address is invalid
         """
         try:
-            for addr, instruction in enumerate(program):                
-                self.memory.write(addr, instruction.split()[0].rstrip())
+            for addr, instruction in enumerate(program):
+                word, _ = convert_word(instruction.split()[0].rstrip())
+                self.memory.write(addr, word)
         except IndexError:
             if addr == self.memory.size:
                 raise IndexError(f"IndexError: Cannot write to memory larger than size of {addr}")
@@ -41,7 +52,9 @@ class Bootstrapper:
             
         except ValueError:
             raise ValueError(f"ValueError: Invalid Instruction given : {instruction}")
-                               
+
+        self.image = ProgramImage(self.memory.memory[: len(program)], self.memory.size)
+
 
     def legacy_load(self, program):
         """Load a program from a list of instructions into memory, starting at address 0
@@ -61,28 +74,108 @@ class Bootstrapper:
             raise IndexError(addr)
         except ValueError:
             raise ValueError(instruction)
+
+        self.image = ProgramImage(self.memory.memory[: len(program)], self.memory.size)
     
-    def load_from_file(self, file_name: str):
-        """Create a list of instructions from reading a file to pass to load_program()
+    def build_image(self, file_name: str):
+        """Parse and validate a program file once, returning a reusable ProgramImage
+
+        Binary images produced by image.compile_file() are detected by their
+        magic number and read with a single bulk read. Text files are read in a
+        single streaming pass that detects legacy 4-digit words per line and
+        converts them in memory, without writing a _converted copy.
 
         Parameters:
         file_name (str) : file_name location
 
         Raises:
-        ValueError: If program is too large for memory
+        ValueError: If a word is invalid or the image is corrupt
+        IndexError: If program is too large for memory
         """
-        with open(file_name, "r") as file:
-            program: List[str] = []
+        size = self.memory.size
+
+        if is_image(file_name):
+            memory_size, numbers = read_image(file_name)
+            # The program may address anything below the size it was compiled for
+            if memory_size > size:
+                raise IndexError(f"IndexError: Image written for memory of size {memory_size}, "
+                                 f"larger than size of {size}")
+            return ProgramImage.from_ints(numbers, size, file_name)
 
-            for line in file.readlines():
+        program: List[str] = []
+        with open(file_name, "r") as file:
+            for line in file:
                 words = line.split()
-                program.append(words[0])
+                if not words:
+                    continue
+                if len(program) == size:
+                    raise IndexError(f"IndexError: Cannot write to memory larger than size of {size}")
+                try:
+                    word, _ = convert_word(words[0])
+                except ValueError:
+                    raise ValueError(f"ValueError: Invalid Instruction given : {words[0]}")
+                program.append(word)
+
+        return ProgramImage(program, size, file_name)
 
-            self.load_program(program)
+    def restore(self, image: ProgramImage):
+        """Restore a program image into memory in one bulk copy and reset the CPU
 
-    def run(self, gui, cont=False):
-        """Run the CPU."""
-        self.cpu.run(gui, cont)
+        Parameters:
+        image (ProgramImage) : previously built image, may be shared between machines
+        """
+        image.restore(self.memory)
+        self.cpu.boot_up()
+        # Not cleared by boot_up(), which run() calls: a stop() made before the run starts must hold
+        self.cpu.stop_requested = False
+        self.image = image
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info("loaded %d words from %s", len(image.words), image.source,
+                        extra=event("load", file=image.source, words=len(image.words)))
+
+    def load_from_file(self, file_name: str):
+        """Build a ProgramImage from a text (legacy, 6-digit or mixed) or binary program file
+        and load it into memory
+
+        Parameters:
+        file_name (str) : file_name location
+
+        Raises:
+        ValueError: If a word is invalid
+        IndexError: If program is too large for memory
+        """
+        with span(self.cpu.tracer, "load", "load", file=file_name):
+            self.restore(self.build_image(file_name))
+
+    def load_from_image(self, file_name: str):
+        """Load a binary program image into memory with a single bulk read
+
+        Parameters:
+        file_name (str) : file_name location
+
+        Raises:
+        ValueError: If the file is not an image or the image is corrupt
+        IndexError: If program is too large for memory
+        """
+        if not is_image(file_name):
+            raise ValueError(f"ValueError: {file_name} is not a BasicML image")
+        self.load_from_file(file_name)
+
+    def run(self, gui, cont=False, refresh_rate=None, max_steps=None, engine="reference"):
+        """Run the CPU, see CPU.run for the refresh_rate and max_steps semantics.
+
+        Parameters:
+        engine (str): "reference" runs CPU.run, "fast" runs CPU.run_fast (no display refreshes)
+        """
+        if engine == "fast":
+            return self.cpu.run_fast(gui, cont, max_steps)
+        if engine not in ENGINES:
+            raise ValueError(f"ValueError: Unknown engine {engine}")
+        return self.cpu.run(gui, cont, refresh_rate, max_steps)
+
+    def engine_used(self, engine):
+        """Return the engine a run with engine actually uses, observed runs (see CPU.is_observed) use the reference engine"""
+        return "reference" if engine == "fast" and self.cpu.is_observed() else engine
 
 
 def main():
@@ -0,0 +1,236 @@
+"""Instruction coverage of BasicML programs.
+
+CoverageMemory records which addresses a run executed and which way each
+conditional branch (BRANCHNEG, BRANCHZERO) went. A branch is taken when the
+next fetch is not the following address. Results are kept as integer bitmaps
+(bit n for address n), so runs from different processes merge with a bitwise
+or, and ProgramCoverage maps them back to the lines of the source file.
+"""
+
+from src.assembler import DATA, Assembler, is_assembly
+from src.boot import Bootstrapper
+from src.cpu import CPU
+from src.image import is_image
+from src.legacy import convert_word
+from src.memory import Memory
+
+# Operators whose direction is recorded
+CONDITIONAL_BRANCHES = (41, 42)
+
+
+def to_bitmap(addresses):
+    """Return the bitmap with the bits of addresses set."""
+    bits = 0
+    for address in addresses:
+        bits |= 1 << address
+    return bits
+
+
+def from_bitmap(bits):
+    """Return the addresses set in a bitmap, in order."""
+    addresses = []
+    address = 0
+    while bits:
+        if bits & 1:
+            addresses.append(address)
+        bits >>= 1
+        address += 1
+    return addresses
+
+
+class CoverageMemory(Memory):
+    """Memory recording executed addresses and branch directions.
+
+    Uses Memory.count_accesses() for the executed addresses, so the fast engine
+    runs covered programs with the reference engine.
+    """
+
+    def __init__(self, size=250):
+        """Initialize an empty memory with coverage recording on."""
+        super().__init__(size)
+        self.count_accesses()
+
+    def count_accesses(self, enabled=True):
+        """Start counting accesses like Memory.count_accesses, also resetting the branch directions."""
+        super().count_accesses(enabled)
+        self.taken = set()
+        self.not_taken = set()
+        self.branch = None  # Address of a conditional branch fetched last
+
+    def load_words(self, words):
+        """Load a program like Memory.load_words, the next fetch starts a new run."""
+        super().load_words(words)
+        # A run stopped right after a branch (limit or error) must not credit the next run's first fetch to it
+        self.branch = None
+
+    def fetch(self, address):
+        """Fetch an instruction like Memory.fetch, recording which way the previous conditional branch went."""
+        word = super().fetch(address)
+        branch = self.branch
+        if branch is not None:
+            # A branch to the next address goes both ways
+            if address != branch + 1 or Memory.word_to_int(self.memory[branch]) % 1000 == address:
+                self.taken.add(branch)
+            if address == branch + 1:
+                self.not_taken.add(branch)
+        self.branch = address if int(word) // 1000 in CONDITIONAL_BRANCHES else None
+        return word
+
+    @classmethod
+    def attach(cls, boot):
+        """Replace the memory of a Bootstrapper with a covered copy of it, see ProfiledMemory.attach."""
+        memory = cls(boot.memory.size)
+        memory.memory = list(boot.memory.memory)
+        boot.memory = memory
+        boot.cpu.memory = memory
+        return memory
+
+    def bitmaps(self):
+        """Return {"executed", "taken", "not_taken"} bitmaps of the runs so far."""
+        return {
+            "executed": to_bitmap(address for address, count in enumerate(self.executes) if count),
+            "taken": to_bitmap(self.taken),
+            "not_taken": to_bitmap(self.not_taken),
+        }
+
+
+class ProgramCoverage:
+    """Coverage of one program file, merged over any number of runs."""
+
+    def __init__(self, file_name, words, lines=None, sources=None, data=()):
+        """Prepare empty coverage for a program.
+
+        Parameters:
+        file_name (str): Program file, used in reports
+        words (sequence): Program words, starting at address 0
+        lines (list): 1-based source line per address, None where unknown (images)
+        sources (list): Source text per address
+        data (iterable): Addresses declared as data, never counted as instructions
+        """
+        self.file_name = file_name
+        self.words = list(words)
+        self.lines = lines if lines is not None else [None] * len(self.words)
+        self.sources = sources if sources is not None else list(self.words)
+        data = set(data)
+
+        instructions, branches = [], []
+        for address, word in enumerate(self.words):
+            if address in data or CPU.describe(int(word)) is None:
+                continue
+            instructions.append(address)
+            if int(word) // 1000 in CONDITIONAL_BRANCHES:
+                branches.append(address)
+        self.instructions = to_bitmap(instructions)
+        self.branches = to_bitmap(branches)
+
+        self.runs = 0
+        self.executed = 0
+        self.taken = 0
+        self.not_taken = 0
+
+    @classmethod
+    def from_file(cls, file_name, memory_size=250):
+        """Read a text program, assembly source or binary image with its line mapping.
+
+        Raises:
+        OSError: If the file can not be read
+        ValueError: If a word is invalid or the image is corrupt
+        IndexError: If the program is too large for memory
+        """
+        if is_image(file_name):
+            return cls(file_name, Bootstrapper(memory_size).build_image(file_name).words)
+
+        with open(file_name, "r") as file:
+            text = file.read()
+        source = text.split("\n")
+        if is_assembly(text):
+            assembler = Assembler(memory_size)
+            assembler.update(source)
+            words = assembler.assemble()
+            return cls(
+                file_name, words,
+                [index + 1 for index in assembler.addresses],
+                [source[index].strip() for index in assembler.addresses],
+                [address for address, index in enumerate(assembler.addresses) if assembler.parsed[index][1] == DATA],
+            )
+
+        words, lines, sources = [], [], []
+        for number, line in enumerate(source, start=1):
+            tokens = line.split()
+            if not tokens:
+                continue
+            if len(words) == memory_size:
+                raise IndexError(f"IndexError: Cannot write to memory larger than size of {memory_size}")
+            try:
+                words.append(convert_word(tokens[0])[0])
+            except ValueError:
+                raise ValueError(f"ValueError: Invalid Instruction given : {tokens[0]}")
+            lines.append(number)
+            sources.append(line.strip())
+        return cls(file_name, words, lines, sources)
+
+    def add(self, bitmaps, runs=1):
+        """Merge the bitmaps of one or more runs (see CoverageMemory.bitmaps)."""
+        self.runs += runs
+        self.executed |= bitmaps["executed"]
+        self.taken |= bitmaps["taken"]
+        self.not_taken |= bitmaps["not_taken"]
+
+    def merge(self, other):
+        """Merge the coverage of the same program collected elsewhere."""
+        self.runs += other.runs
+        self.executed |= other.executed
+        self.taken |= other.taken
+        self.not_taken |= other.not_taken
+
+    def entry(self, address):
+        """Return {"address", "line", "source", "instruction"} describing an address, for report()."""
+        word = self.words[address]
+        return {"address": address, "line": self.lines[address], "source": self.sources[address],
+                "instruction": CPU.disassemble(int(word))}
+
+    def report(self):
+        """Return covered/uncovered instructions and branches that only went one way.
+
+        Returns:
+        dict: {"file", "runs", "instructions", "covered", "percent", "uncovered": [entry],
+              "partial_branches": [entry with "missing": "taken" or "fall through"]}
+        """
+        instructions = from_bitmap(self.instructions)
+        uncovered = from_bitmap(self.instructions & ~self.executed)
+        partial = []
+        for address in from_bitmap(self.branches & self.executed):
+            bit = 1 << address
+            if not self.taken & bit:
+                partial.append({**self.entry(address), "missing": "taken"})
+            elif not self.not_taken & bit:
+                partial.append({**self.entry(address), "missing": "fall through"})
+
+        covered = len(instructions) - len(uncovered)
+        return {
+            "file": self.file_name,
+            "runs": self.runs,
+            "instructions": len(instructions),
+            "covered": covered,
+            "percent": 100.0 * covered / len(instructions) if instructions else 100.0,
+            "uncovered": [self.entry(address) for address in uncovered],
+            "partial_branches": partial,
+        }
+
+
+def format_coverage(report):
+    """Render a ProgramCoverage.report() as text."""
+    def where(entry):
+        line = f"line {entry['line']:>4}" if entry["line"] is not None else "         "
+        return f"  {line}  {entry['address']:03d}  {entry['instruction']:<16} {entry['source']}"
+
+    lines = [f"{report['file']}: {report['covered']}/{report['instructions']} instructions covered "
+             f"({report['percent']:.1f}%) in {report['runs']} runs"]
+    if report["uncovered"]:
+        lines.append(" never executed:")
+        lines.extend(where(entry) for entry in report["uncovered"])
+    if report["partial_branches"]:
+        lines.append(" branches that only went one way:")
+        lines.extend(f"{where(entry)}  ({'never taken' if entry['missing'] == 'taken' else 'never fell through'})"
+                     for entry in report["partial_branches"])
+    return "\n".join(lines)
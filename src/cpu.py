@@ -1,10 +1,15 @@
 """CPU for UVSim."""
 
+from .events import event
 from .memory import Memory
-from termcolor import colored
-import difflib
-import tkinter as tk
-from tkinter import messagebox
+from .trace import span
+import functools
+import logging
+import time
+
+LOGGER = logging.getLogger(__name__)
+# Events are only written when configured (see events.py), not by logging's last resort handler
+LOGGER.addHandler(logging.NullHandler())
 
 
 class Halt(Exception):
@@ -29,6 +34,30 @@ class CPU:
     POINTER_DEFAULT = 000000
     # Used for testing purposes - Need to force the CPU to halt in case things go wrong
     MAX_INSTRUCTION_LIMIT = 1000
+    LIMIT_REACHED = "MAX INSTRUCTIONS LIMIT REACHED : Halting"
+
+    # Cost model for the cycle counter: one cycle to fetch, one per memory operand
+    # access and extra cycles for multiply and divide
+    CYCLES = {10: 2, 11: 2, 20: 2, 21: 2, 30: 2, 31: 2, 32: 5, 33: 4, 40: 1, 41: 1, 42: 1, 43: 1}
+
+    # Words whose descriptions/disassembly are kept in the LRU caches
+    DESCRIPTION_CACHE_SIZE = 1024
+
+    # Operator: (name, description of what it does with operand)
+    INSTRUCTIONS = {
+        10: ("READ", "Read a word from the keyboard into memory location {operand}."),
+        11: ("WRITE", "Write the word from memory location {operand} to screen."),
+        20: ("LOAD", "Load the word from memory location {operand} into the accumulator."),
+        21: ("STORE", "Store the word from the accumulator into memory location {operand}."),
+        30: ("ADD", "Add the word from memory location {operand} to the word in the accumulator (leave the result in the accumulator)"),
+        31: ("SUBTRACT", "Subtract the word from memory location {operand} to the word in the accumulator (leave the result in the accumulator)."),
+        32: ("DIVIDE", "Divide the word in the accumulator by the word from memory location {operand} (leave the result in the accumulator)."),
+        33: ("MULTIPLY", "Multiply the word from memory location {operand} to the word in the accumulator (leave the result in the accumulator)."),
+        40: ("BRANCH", "Branch to memory location {operand}."),
+        41: ("BRANCHNEG", "Branch to memory location {operand} if the accumulator is negative."),
+        42: ("BRANCHZERO", "Branch to memory location {operand} if the accumulator is zero."),
+        43: ("HALT", "Pause the program."),
+    }
 
     def __init__(
         self,
@@ -36,14 +65,19 @@ class CPU:
     ):
         """Initialize CPU module, using the boot_up function and default values to clear."""
         self.boot_up()
+        # Log a memory event with the words changed by every instruction (see log_memory)
         self.log = False
+        # Log one in this many instruction events when DEBUG events are enabled (see events.py)
+        self.log_sample = 1
+        # trace.Tracer recording spans of runs, None when not tracing
+        self.tracer = None
         self.halted = True
-
-        self.previous_memory_state = " "
-        self.current_memory_state = " "
+        # Set from another thread (see stop()) to preempt run()
+        self.stop_requested = False
 
         self.memory = memory
-        self.current_memory_state = str(self.memory)
+        # Addresses written since the last memory_diff(), watched from its first call
+        self.memory_changes = None
 
     def boot_up(self):
         """Clears all values to original defaults, allowing the CPU to be restarted."""
@@ -51,34 +85,149 @@ class CPU:
         self.register = CPU.REGISTER_DEFAULT
         self.pointer = CPU.POINTER_DEFAULT
         self.halted = False
+        # Performance counters, read by the GUI while running
+        self.steps = 0
+        self.cycles = 0
+        self.elapsed = 0.0
+        self.started = None
    
+    def stop(self):
+        """Ask a running run() loop to halt before its next instruction.
+
+        Safe to call from another thread. A request made before run() starts
+        stops it before the first instruction; Bootstrapper.restore() and
+        CPUWorker.start() clear requests left over from earlier runs.
+        """
+        self.stop_requested = True
+
+    def run_time(self):
+        """Seconds spent in run() since boot_up, including a run in progress."""
+        started = self.started
+        if started is None:
+            return self.elapsed
+        return self.elapsed + time.perf_counter() - started
+
+    def instructions_per_second(self):
+        """Average instructions executed per second of run() time."""
+        run_time = self.run_time()
+        return self.steps / run_time if run_time > 0 else 0.0
+
     def _get_memory(self):
         return self.memory
 
+    def memory_diff(self):
+        """Return the words that changed since the previous call, in address order.
+
+        Driven by a Memory watcher, so the cost is proportional to the number of
+        written addresses rather than the size of memory. The first call reports
+        every non-empty word.
+
+        Return - list of {"address": int, "previous": str, "word": str}
+        """
+        memory = self.memory
+        if self.memory_changes is None:
+            self.memory_changes = memory.watch()
+            return [
+                {"address": address, "previous": "+000000", "word": word}
+                for address, word in enumerate(memory.memory)
+                if word != "+000000"
+            ]
+
+        changes = self.memory_changes
+        diff = []
+        for address in sorted(list(changes)):
+            previous = changes.pop(address)
+            word = memory.memory[address]
+            if word != previous:
+                diff.append({"address": address, "previous": previous, "word": word})
+        return diff
+
     def print_memory(self):
-        """Prints the current state of the CPU/Memory with differences highlighted from the previous state
-        Green background: Added text.
+        """Render the memory rows that changed since the previous call, changed words highlighted in green.
+
+        Uses the same layout as str(Memory), but only rows holding a changed word are shown.
+
+        Return - The rendered rows, or an empty string if nothing changed
         """
-        prev_text = self.previous_memory_state
-        curr_text = self.current_memory_state        
+        diff = self.memory_diff()
+        if not diff:
+            return ""
 
-        if curr_text is None:
-            return
+        from termcolor import colored  # Only needed for terminal output
 
-        if prev_text is None:
-            return curr_text
+        return self.format_rows(diff, lambda word: colored(word, "green"))
 
-        matcher = difflib.SequenceMatcher(None, prev_text, curr_text)
+    def format_rows(self, diff, highlight=None):
+        """Render the memory rows holding the addresses of a memory_diff(), in the layout of str(Memory).
 
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-            if tag == "equal":
-                # Print unchanged text normally
-                return curr_text
-            elif tag in ["replace", "insert"]:
-                # Print new/changed text in green
-                return colored(curr_text[j1:j2], "green")
+        Parameters:
+        diff (list): Changes returned by memory_diff()
+        highlight (callable): Applied to the changed words, e.g. to color them
+        """
+        changed = {change["address"] for change in diff}
+        lines = ["     " + " ".join(f"{i:02d}   " for i in range(10))]
+        for row in sorted({address // 10 * 10 for address in changed}):
+            label = f"\xa0{row:02d} " if row < 100 else f"{row:03d} "
+            words = (
+                highlight(word) if highlight is not None and row + i in changed else word
+                for i, word in enumerate(self.memory.memory[row : row + 10])
+            )
+            lines.append(label + " ".join(words))
+        return "\n".join(lines).rstrip()
+
+    def log_memory(self):
+        """Log the words changed since the last call as a memory event, see memory_diff()."""
+        diff = self.memory_diff()
+        if diff:
+            LOGGER.info("memory changed at %03d\n%s", self.pointer - 1, self.format_rows(diff),
+                        extra=event("memory", pointer=self.pointer - 1, changes=diff))
+
+    def log_instruction(self, address):
+        """Log the instruction about to run at address, one in log_sample of them."""
+        if self.steps % self.log_sample == 0:
+            word = self.register
+            LOGGER.debug("%03d %s", address, CPU.disassemble(word), extra=event(
+                "instruction", address=address, word=word, instruction=CPU.disassemble(word),
+                accumulator=int(self.accumulator)))
+
+    def log_writes(self, writes):
+        """Log and clear the words collected by a memory watcher."""
+        memory = self.memory.memory
+        for address, previous in writes.items():
+            LOGGER.debug("write %03d %s -> %s", address, previous, memory[address], extra=event(
+                "write", address=address, previous=previous, word=memory[address]))
+        writes.clear()
+
+    def log_io(self, operation, address, word=None):
+        """Log a READ or WRITE of the word at address."""
+        word = self.register if word is None else word
+        LOGGER.info("%s %03d %+07d", operation, address, word,
+                    extra=event("io", operation=operation, address=address, word=word))
+
+    def log_end(self, result):
+        """Log how a run ended: halted, stopped or with an error message."""
+        if result is None:
+            if self.halted:
+                LOGGER.info("halt at %03d after %d instructions", self.pointer, self.steps,
+                            extra=event("halt", pointer=self.pointer, steps=self.steps))
+        elif result.startswith("Error: ") or result == "Keyboard Interrupt":
+            LOGGER.error("%s at %03d", result, self.pointer, extra=event("error", pointer=self.pointer, message=result))
+
+    def is_observed(self):
+        """True when runs are observed per instruction (access counting, verbose log, DEBUG events, tracing),
+        run_fast() then hands them to run()."""
+        return (self.log or self.memory.reads is not None or self.tracer is not None
+                or LOGGER.isEnabledFor(logging.DEBUG))
+
+    def _instruction_limit(self, cont, max_steps):
+        """Boot up unless continuing and return the number of instructions run() may execute."""
+        if not cont:
+            self.boot_up()
+        if max_steps is not None:
+            return max_steps
+        return CPU.MAX_INSTRUCTION_LIMIT if not cont else CPU.MAX_INSTRUCTION_LIMIT - self.pointer
 
-    def run(self, gui=None, cont=False):
+    def run(self, gui=None, cont=False, refresh_rate=None, max_steps=None, breakpoints=(), watchpoints=()):
         """Creates loop that allows the CPU to run continuously
         Will self-increment to next instruction in memory and read until halted.
 
@@ -86,45 +235,248 @@ class CPU:
         Memory is then executed
 
         Parameters:
-            file_location - file location to read instructions into memory
+            gui - front end providing read_word() and write_word() for I/O. If it has a
+                  refresh_display() method, it is called to redraw memory, PC and
+                  accumulator while running
+            cont - continue from the current pointer instead of booting up
+            refresh_rate - redraws per second. None or 0 redraws after every instruction,
+                  otherwise the CPU runs at full speed and redraws at most this often
+                  (READ also redraws before waiting for input)
+            max_steps - instruction limit, defaults to MAX_INSTRUCTION_LIMIT
+                  (less the pointer when continuing)
+            breakpoints - addresses to stop at before they are executed. The
+                  instruction at the starting pointer always runs, so a run can
+                  continue from a breakpoint
+            watchpoints - addresses to stop after when an instruction (READ or STORE) writes them
+
+        Return - Error message, or None when the program halted or was stopped.
+                 Stopping at a break- or watchpoint leaves halted False
         """
-        if not cont:
-            self.boot_up()
-            max_instructions = CPU.MAX_INSTRUCTION_LIMIT
-        else:
-            max_instructions = CPU.MAX_INSTRUCTION_LIMIT - self.pointer
-
-        while max_instructions > 0:
-            self.previous_memory_state = self.current_memory_state
-            self.current_memory_state = str(self.memory)
-            if not gui is None:
-                gui.update_memory_text(self.print_memory())
-
-            try:
-                # DO NOT CHANGE UNLESS YOU KNOW EXPLICITLY WHAT IT WILL DO
-                # I had to spend almost two hours fixing a bug because someone changes the order of these two line..
-                # Pointer MUST be updated first, because otherwise it will jump and THEN skip to the next instruction......
+        max_instructions = self._instruction_limit(cont, max_steps)
+        breaks = frozenset(breakpoints)
+        watches = frozenset(watchpoints)
+
+        refresh = getattr(gui, "refresh_display", None)
+        interval = 1 / refresh_rate if refresh_rate else 0
+        next_refresh = 0
+        log = self.log
+        # Checked once per run, so disabled events cost nothing per instruction
+        events = LOGGER.isEnabledFor(logging.DEBUG)
+        writes = self.memory.watch() if events else None
+        tracer = self.tracer
+
+        self.started = time.perf_counter()
+        if tracer is not None:
+            run_start = tracer.now()
+            tracer.start_block(self.pointer)
+        result = None
+        try:
+            while max_instructions > 0:
+                if self.stop_requested:
+                    self.stop_requested = False
+                    self.halted = True
+                    return
+
+                if refresh is not None:
+                    if not interval:
+                        refresh()
+                    else:
+                        now = time.perf_counter()
+                        if now >= next_refresh:
+                            refresh()
+                            next_refresh = now + interval
+
+                try:
+                    # DO NOT CHANGE UNLESS YOU KNOW EXPLICITLY WHAT IT WILL DO
+                    # I had to spend almost two hours fixing a bug because someone changes the order of these two line..
+                    # Pointer MUST be updated first, because otherwise it will jump and THEN skip to the next instruction......
                 
-                self.register = Memory.word_to_int(self.memory.read(self.pointer))
-                self.pointer += 1 
-                self.operation(self.register, gui)
+                    # The instruction is kept in word: operations overwrite the register with data
+                    word = self.register = Memory.word_to_int(self.memory.fetch(self.pointer))
+                    self.pointer += 1 
+                    if events:
+                        self.log_instruction(self.pointer - 1)
+                    if tracer is not None and 40000 <= self.register < 44000:
+                        # Branches and HALT end a basic block
+                        tracer.end_block(self.pointer - 1)
+                        self.operation(self.register, gui)
+                        tracer.start_block(self.pointer)
+                    else:
+                        self.operation(self.register, gui)
+                    if events:
+                        self.log_writes(writes)
+                    if log:
+                        # Verbose mode: log the words this instruction changed, stdout is left to the program
+                        self.log_memory()
+                    if breaks or watches:
+                        if self.pointer in breaks:
+                            return
+                        if word // 1000 in (10, 21) and word % 1000 in watches:
+                            return
+
+                except Halt:
+                    self.halted = True
+                    return
 
-            except Halt:
-                self.halted = True
-                return
+                except ValueError as e:
+                    result = f"Error: {e}"
+                    return result
+
+                except KeyboardInterrupt:
+                    result = "Keyboard Interrupt"
+                    return result
+
+                finally:
+                    max_instructions -= 1
+
+            if max_instructions == 0:
+                return CPU.LIMIT_REACHED
+        finally:
+            self.elapsed += time.perf_counter() - self.started
+            self.started = None
+            if writes is not None:
+                self.memory.unwatch(writes)
+            if tracer is not None:
+                tracer.end_block(self.pointer - 1)
+                tracer.complete("run", "cpu", run_start, steps=self.steps, result=result)
+            self.log_end(result)
+    
+    def run_fast(self, gui=None, cont=False, max_steps=None, breakpoints=(), watchpoints=()):
+        """Run the program like run(), decoding memory into a list of ints once.
+
+        Results, error messages, registers, counters and the final memory are the
+        same as run(). Words are only written back to memory when they change and
+        before the front end is called for I/O. There are no display refreshes, and
+        runs that are observed (access counting, verbose log, DEBUG events, tracing) are run by run().
 
-            except ValueError as e:
-                return f"Error: {e}"
+        Parameters:
+            gui - front end providing read_word() and write_word() for I/O
+            cont - continue from the current pointer instead of booting up
+            max_steps - see run()
+            breakpoints, watchpoints - see run()
 
-            except KeyboardInterrupt:
-                return "Keyboard Interrupt"
+        Return - Error message, or None when the program halted or was stopped
+        """
+        memory = self.memory
+        if self.is_observed():
+            return self.run(gui, cont, max_steps=max_steps, breakpoints=breakpoints, watchpoints=watchpoints)
+
+        max_instructions = self._instruction_limit(cont, max_steps)
+        breaks = frozenset(breakpoints)
+        watches = frozenset(watchpoints)
+
+        words = [int(word) for word in memory.memory]
+        size = len(words)
+        written = set()
+        cycle_cost = CPU.CYCLES
+        pointer, accumulator, register = self.pointer, self.accumulator, self.register
+        steps = cycles = 0
+
+        def sync():
+            """Publish the local state, before I/O and when the run ends."""
+            self.pointer, self.accumulator, self.register = pointer, accumulator, register
+            self.steps += steps
+            self.cycles += cycles
+            for address in written:
+                word = Memory.int_to_word(words[address])
+                for changes in memory.watchers:
+                    changes.setdefault(address, memory.memory[address])
+                memory.memory[address] = word
+            written.clear()
+
+        self.started = time.perf_counter()
+        result = None
+        try:
+            while max_instructions > 0:
+                if self.stop_requested:
+                    self.stop_requested = False
+                    self.halted = True
+                    return
 
-            finally:
                 max_instructions -= 1
+                if pointer >= size:
+                    memory.validate_address(pointer)
+                register = words[pointer]
+                pointer += 1
+                if register < 10000:
+                    CPU.decypher_instruction(register)  # Raises the same ValueError as run()
+                operator, operand = divmod(register, 1000)
+                steps += 1
+                cycles += cycle_cost.get(operator, 1)
+
+                if operator == 43:
+                    raise Halt
+                elif operator >= 40:
+                    if operator == 40 or (operator == 41 and accumulator < 0) or (operator == 42 and accumulator == 0):
+                        pointer = operand
+                    elif operator > 42 and operator != 99:
+                        raise ValueError(f"Invalid Operation: {operator}")
+                elif operator == 21:
+                    value = int(accumulator)
+                    if not Memory.MIN_WORD <= value <= Memory.MAX_WORD:
+                        Memory.int_to_word(value)  # Raises the same ValueError as Memory.write()
+                    if operand >= size:
+                        memory.validate_address(operand)
+                    words[operand] = value
+                    written.add(operand)
+                    if operand in watches:
+                        return
+                elif operator == 10:
+                    sync()
+                    steps = cycles = 0
+                    self.op_READ(operand, gui)
+                    register = self.register
+                    words[operand] = register
+                    if operand in watches:
+                        return
+                elif operator in (11, 20, 30, 31, 32, 33):
+                    if operand >= size:
+                        memory.validate_address(operand)
+                    register = words[operand]
+                    if operator == 20:
+                        accumulator = register
+                    elif operator == 30:
+                        accumulator += register
+                    elif operator == 31:
+                        accumulator -= register
+                    elif operator == 32:
+                        accumulator /= register
+                    elif operator == 33:
+                        accumulator *= register
+                    else:
+                        if gui is not None:
+                            sync()
+                            steps = cycles = 0
+                            gui.write_word(Memory.int_to_word(register))
+                        if LOGGER.isEnabledFor(logging.INFO):
+                            self.log_io("WRITE", operand, register)
+                else:
+                    raise ValueError(f"Invalid Operation: {operator}")
+
+                if breaks and pointer in breaks:
+                    return
+
+            if max_instructions == 0:
+                return CPU.LIMIT_REACHED
+
+        except Halt:
+            self.halted = True
+            return
+
+        except ValueError as e:
+            result = f"Error: {e}"
+            return result
+
+        except KeyboardInterrupt:
+            result = "Keyboard Interrupt"
+            return result
+
+        finally:
+            sync()
+            self.elapsed += time.perf_counter() - self.started
+            self.started = None
+            self.log_end(result)
 
-        if max_instructions == 0:
-            return "MAX INSTRUCTIONS LIMIT REACHED : Halting"
-    
     @staticmethod
     def decypher_instruction(word):
         # Why 10,000? Because if a 6 digit instruciton starts with an operator of 010, it would be 010 000 meaning >= 10,000
@@ -144,6 +496,48 @@ class CPU:
 
         return (operator, operand)
 
+    @staticmethod
+    @functools.lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+    def describe(word):
+        """Return the description of an instruction word shown in the GUI.
+
+        Results are cached per word (bounded LRU), so redraws do not decode the word again.
+
+        Parameters:
+            word - Integer word
+
+        Return - Description string, or None if the word is not a valid instruction
+        """
+        try:
+            operator, operand = CPU.decypher_instruction(word)
+        except ValueError:
+            return None
+        if operator not in CPU.INSTRUCTIONS:
+            return None
+
+        name, text = CPU.INSTRUCTIONS[operator]
+        return f"{Memory.int_to_word(word)}: {name} ({operator})\n{text.format(operand=operand)}"
+
+    @staticmethod
+    @functools.lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+    def disassemble(word):
+        """Return the short mnemonic form of a word, e.g. 'LOAD 7', or 'DATA n' for data words.
+
+        The output is valid assembler source (see assembler.py). Cached per word.
+
+        Parameters:
+            word - Integer word
+        """
+        try:
+            operator, operand = CPU.decypher_instruction(word)
+        except ValueError:
+            return f"DATA {word}"
+        if operator not in CPU.INSTRUCTIONS:
+            return f"DATA {word}"
+
+        name = CPU.INSTRUCTIONS[operator][0]
+        return name if operator == 43 and operand == 0 else f"{name} {operand}"
+
     def operation(self, word, gui=None, matchAndReturnInstInfo=False):
         """Function to run a specific instruction (word) or return it's name.
 
@@ -164,64 +558,49 @@ class CPU:
             Halt:
                 - Instructs the machine to halt if certain conditions are met
         """
+        if matchAndReturnInstInfo:
+            description = CPU.describe(word)
+            # Keep raising for invalid words, describe() returns None for them
+            if description is None and CPU.decypher_instruction(word)[0] != 99:
+                raise ValueError(f"Invalid Operation: {word // 1000}")
+            return description
+
         try:
             operator, operand = CPU.decypher_instruction(word)
+            self.steps += 1
+            self.cycles += CPU.CYCLES.get(operator, 1)
 
             match operator:
                 # I/O Operations
                 case 10:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: READ (10)\nRead a word from the keyboard into memory location {operand}."
                     self.op_READ(operand, gui)
                 case 11:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: WRITE (11)\nWrite the word from memory location {operand} to screen."
                     self.op_WRITE(operand, gui)
 
                 # Load/Store Operations
                 case 20:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: LOAD (20)\nLoad the word from memory location {operand} into the accumulator."
                     self.op_LOAD(operand)
                 case 21:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: STORE (21)\nStore the word from the accumulator into memory location {operand}."
                     self.op_STORE(operand)
 
                 # Arithmetic Operation
                 case 30:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: ADD (30)\nAdd the word from memory location {operand} to the word in the accumulator (leave the result in the accumulator)"
                     self.op_ADD(operand)
                 case 31:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: SUBTRACT (31)\nSubtract the word from memory location {operand} to the word in the accumulator (leave the result in the accumulator)."
                     self.op_SUBTRACT(operand)
                 case 32:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: DIVIDE (32)\nDivide the word in the accumulator by the word from memory location {operand} (leave the result in the accumulator)."
                     self.op_DIVIDE(operand)
                 case 33:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: MULTIPLY (33)\nMultiply the word from memory location {operand} to the word in the accumulator (leave the result in the accumulator)."
                     self.op_MULTIPLY(operand)
 
                 # Control Operations
                 case 40:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: BRANCH (40)\nBranch to memory location {operand}."
                     self.op_BRANCH(operand)
                 case 41:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: BRANCHNEG (41)\nBranch to memory location {operand} if the accumulator is negative."
                     self.op_BRANCHNEG(operand)
                 case 42:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: BRANCHZERO (42)\nBranch to memory location {operand} if the accumulator is zero."
                     self.op_BRANCHZERO(operand)
                 case 43:
-                    if matchAndReturnInstInfo:
-                        return f"{self.memory.int_to_word(word)}: HALT (43)\nPause the program."
                     # Raises HALT
                     self.op_HALT()
 
@@ -256,55 +635,30 @@ class CPU:
         self.memory.write(address, value)
 
     def op_READ(self, operand, gui):
-        """Mini Method used to read a 6-digit signed instruction from 
-        the io_text entry object in the GUI and save it to a specific 
-        memory location (operand).
+        """Mini Method used to read a 6-digit signed word from the front end
+        and save it to a specific memory location (operand).
+
+        The front end (GUI, worker bridge or headless tape) provides
+        read_word(), returning the entered word as an integer.
 
         Parameters:
             operand - Memory Location (2-digits)
 
         Return - None
         """
-        def read_input(event):
-            check = True
-            while (check):
-                operand = gui.io_text.get().strip()
+        # Show the up to date state before waiting on the user
+        if hasattr(gui, "refresh_display"):
+            gui.refresh_display()
 
-                try:
-                    gui.input.set(self.memory.word_to_int(operand))
-                    check = False
-                    break
-                except ValueError as e:
-                    pass
-                
-                if check:
-                    try:
-                        operand = self.memory.int_to_word(int(operand))
-                        gui.input.set(self.memory.word_to_int(operand))
-                        break
-                        
-                    except ValueError as e:
-                        messagebox.showerror("Error", str(e))
-                        gui.root.wait_variable(gui.input)
-                        continue
-        
-        gui.io_text.config(state=tk.NORMAL)
-        gui.io_text.delete("0", "end")
-        gui.io_text.bind("<Return>", read_input)
-        gui.io_label.configure(text="Read a 6-digit instruction: (Press enter to submit)")
-        gui.input = tk.StringVar()
-        gui.root.wait_variable(gui.input)
-        gui.io_text.delete("0", "end")
-        gui.io_label.configure(text="I/O")
-        gui.io_text.unbind("<Return>")
-        gui.io_text.config(state=tk.DISABLED)
-
-        self.register = int(gui.input.get().strip())
+        with span(self.tracer, "READ", "io", address=operand):
+            self.register = int(gui.read_word())
         self.load_to_memory(operand, self.register)
+        if LOGGER.isEnabledFor(logging.INFO):
+            self.log_io("READ", operand)
 
     def op_WRITE(self, operand, gui):
         """Mini Method used to write data from memory at
-        a specific memory location (operand) to the io_text entry object in the GUI.
+        a specific memory location (operand) to the front end's write_word().
 
         Parameters:
             operand - Memory Location (2-digits)
@@ -314,10 +668,9 @@ class CPU:
         self.read_from_memory(operand)
 
         if gui is not None:
-            gui.io_text.config(state=tk.NORMAL)
-            gui.io_label.configure(text="Write Output:")
-            gui.io_text.delete(0, tk.END)
-            gui.io_text.insert(tk.END, self.memory.int_to_word(self.register))
+            gui.write_word(self.memory.int_to_word(self.register))
+        if LOGGER.isEnabledFor(logging.INFO):
+            self.log_io("WRITE", operand)
 
     def op_LOAD(self, operand):
         """Mini Method used to load a word from memory at the operand location
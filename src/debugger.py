@@ -0,0 +1,270 @@
+"""Terminal debugger for BasicML programs, used by the uvsim debug command.
+
+Drives the CPU directly without Tk, so programs can be debugged over SSH.
+Execution between stops uses CPU.run_fast with the break- and watchpoints
+passed in, nothing is rendered per instruction.
+"""
+
+import cmd
+
+from src.cpu import CPU
+from src.memory import Memory
+
+
+def parse_address(text: str, size: int):
+    """Parse a memory address.
+
+    Raises:
+    ValueError: If text is not an address inside memory
+    """
+    try:
+        address = int(text)
+    except ValueError:
+        raise ValueError(f"Invalid address '{text}'")
+    if not 0 <= address < size:
+        raise ValueError(f"Address {address} out of bounds. Valid range: 0-{size - 1}")
+    return address
+
+
+def parse_value(text: str):
+    """Parse a word given as a number, e.g. "+020007" or "-5".
+
+    Raises:
+    ValueError: If text is not a number in word range
+    """
+    try:
+        value = int(text)
+    except ValueError:
+        raise ValueError(f"Invalid word '{text}'")
+    Memory.int_to_word(value)  # Raises if out of range
+    return value
+
+
+class Debugger(cmd.Cmd):
+    """Interactive debugger for the program loaded in a Bootstrapper.
+
+    Also the front end of the CPU: READ takes words from the input tape first,
+    then asks on the terminal, and WRITE prints the word.
+    """
+
+    intro = "UVSim debugger. Type help or ? to list commands."
+    prompt = "(uvsim) "
+
+    def __init__(self, boot, inputs=(), max_steps=None, stdin=None, stdout=None):
+        """Prepare a session paused before the first instruction.
+
+        Parameters:
+        boot (Bootstrapper): Bootstrapper with a program loaded
+        inputs (list): Words fed to READ before asking on the terminal
+        max_steps (int): Instruction limit of continue, defaults to CPU.MAX_INSTRUCTION_LIMIT
+        stdin, stdout: Streams of the session, see cmd.Cmd
+        """
+        super().__init__(stdin=stdin, stdout=stdout)
+        if stdin is not None:
+            self.use_rawinput = False
+        self.boot = boot
+        self.inputs = list(inputs)
+        self.max_steps = CPU.MAX_INSTRUCTION_LIMIT if max_steps is None else max_steps
+        self.breakpoints = set()
+        self.watchpoints = set()
+        self.restart()
+
+    # Front end protocol used by the CPU
+
+    def read_word(self):
+        """Return the next input word from the tape, or ask for it.
+
+        Raises:
+        ValueError: If the entered word is invalid or input ended, which stops the run with an error
+        """
+        if self.position < len(self.inputs):
+            value = self.inputs[self.position]
+            self.position += 1
+            self.print(f"READ {value:+07d} (input {self.position})")
+            return value
+
+        self.stdout.write("READ > ")
+        self.stdout.flush()
+        line = self.stdin.readline()
+        if not line:
+            raise ValueError("READ with no input left")
+        return parse_value(line.strip())
+
+    def write_word(self, word):
+        """Print a word written by the program."""
+        self.print(f"WRITE {word}")
+
+    # Helpers
+
+    def print(self, text=""):
+        """Write a line to the session's output."""
+        self.stdout.write(f"{text}\n")
+
+    def restart(self):
+        """Reload the program image and reset the CPU."""
+        self.boot.restore(self.boot.image)
+        self.position = 0
+        self.finished = False
+
+    def location(self):
+        """Return the pointer and the instruction it points at, e.g. '005: LOAD 7'."""
+        cpu = self.boot.cpu
+        if cpu.pointer >= self.boot.memory.size:
+            return f"{cpu.pointer:03d}: <outside memory>"
+        word = Memory.word_to_int(self.boot.memory.memory[cpu.pointer])
+        return f"{cpu.pointer:03d}: {CPU.disassemble(word)}"
+
+    def execute(self, max_steps, report_limit=False):
+        """Run from the current pointer until a stop, the limit or the end of the program.
+
+        Parameters:
+        max_steps (int): Instructions to execute at most
+        report_limit (bool): Mention it when the run stopped at max_steps
+        """
+        if self.finished:
+            self.print("The program has ended, use restart to run it again")
+            return
+
+        cpu = self.boot.cpu
+        memory = self.boot.memory
+        changes = memory.watch()
+        start = cpu.steps
+        try:
+            result = cpu.run_fast(self, cont=True, max_steps=max_steps,
+                                  breakpoints=self.breakpoints, watchpoints=self.watchpoints)
+        except (IndexError, ZeroDivisionError) as e:
+            result = f"Error: {e}"
+        finally:
+            memory.unwatch(changes)
+        executed = cpu.steps - start
+
+        if cpu.halted:
+            self.finished = True
+            self.print(f"Halted after {executed} instructions, accumulator {int(cpu.accumulator):+07d}")
+            return
+        if result and result != CPU.LIMIT_REACHED:
+            self.finished = True
+            self.print(result)
+            return
+
+        for address in sorted(self.watchpoints & changes.keys()):
+            self.print(f"Watchpoint {address:03d}: {changes[address]} -> {memory.memory[address]}")
+        if cpu.pointer in self.breakpoints and executed:
+            self.print(f"Breakpoint {cpu.pointer:03d}")
+        elif result and report_limit:
+            self.print(f"Stopped after the instruction limit of {max_steps}")
+        self.print(self.location())
+
+    def addresses(self, arg):
+        """Parse the addresses given to break/watch/delete/unwatch."""
+        return [parse_address(text, self.boot.memory.size) for text in arg.split()]
+
+    def onecmd(self, line):
+        """Run one command, reporting invalid arguments instead of leaving the session."""
+        try:
+            return super().onecmd(line)
+        except ValueError as e:
+            self.print(f"Error: {e}")
+
+    def emptyline(self):
+        """Do nothing on an empty line, instead of repeating the last command."""
+
+    # Commands
+
+    def do_step(self, arg):
+        """Execute N instructions (default 1), stopping early at breakpoints. Usage: step [N]"""
+        try:
+            count = int(arg) if arg.strip() else 1
+        except ValueError:
+            raise ValueError(f"Invalid step count '{arg.strip()}'")
+        if count < 1:
+            raise ValueError("Step count must be at least 1")
+        self.execute(count)
+
+    def do_continue(self, arg):
+        """Run until a breakpoint, watchpoint, halt, error or the instruction limit. Usage: continue"""
+        self.execute(self.max_steps, report_limit=True)
+
+    def do_break(self, arg):
+        """Stop before executing ADDR, without arguments list the breakpoints. Usage: break [ADDR ...]"""
+        if not arg.strip():
+            self.print(" ".join(f"{address:03d}" for address in sorted(self.breakpoints)) or "No breakpoints")
+            return
+        self.breakpoints.update(self.addresses(arg))
+
+    def do_delete(self, arg):
+        """Remove breakpoints. Usage: delete ADDR ..."""
+        self.breakpoints.difference_update(self.addresses(arg))
+
+    def do_watch(self, arg):
+        """Stop after an instruction writes ADDR, without arguments list the watchpoints. Usage: watch [ADDR ...]"""
+        if not arg.strip():
+            self.print(" ".join(f"{address:03d}" for address in sorted(self.watchpoints)) or "No watchpoints")
+            return
+        self.watchpoints.update(self.addresses(arg))
+
+    def do_unwatch(self, arg):
+        """Remove watchpoints. Usage: unwatch ADDR ..."""
+        self.watchpoints.difference_update(self.addresses(arg))
+
+    def do_print(self, arg):
+        """Show a register, a word, a range of words or all of memory. Usage: print acc | pc | ir | ADDR [END] | mem"""
+        args = arg.lower().split()
+        cpu = self.boot.cpu
+        memory = self.boot.memory
+        if not args:
+            self.print(f"ACC {int(cpu.accumulator):+07d}  PC {cpu.pointer:03d}  IR {int(cpu.register):+07d}")
+        elif args[0] == "acc":
+            self.print(f"{int(cpu.accumulator):+07d}")
+        elif args[0] == "pc":
+            self.print(self.location())
+        elif args[0] == "ir":
+            self.print(f"{int(cpu.register):+07d}")
+        elif args[0] == "mem":
+            self.print(str(memory))
+        else:
+            first = parse_address(args[0], memory.size)
+            last = parse_address(args[1], memory.size) if len(args) > 1 else first
+            for address in range(first, last + 1):
+                word = memory.memory[address]
+                self.print(f"{address:03d}: {word}  {CPU.disassemble(int(word))}")
+
+    def do_set(self, arg):
+        """Change a register or a word in memory. Usage: set acc VALUE | pc ADDR | ADDR WORD"""
+        args = arg.lower().split()
+        if len(args) != 2:
+            raise ValueError("Usage: set acc VALUE | pc ADDR | ADDR WORD")
+        cpu = self.boot.cpu
+        target, value = args
+        if target == "acc":
+            cpu.accumulator = parse_value(value)
+        elif target == "pc":
+            cpu.pointer = parse_address(value, self.boot.memory.size)
+            self.finished = False
+        else:
+            self.boot.memory.write(parse_address(target, self.boot.memory.size), parse_value(value))
+
+    def do_list(self, arg):
+        """Disassemble the instructions around ADDR (default: the pointer). Usage: list [ADDR]"""
+        size = self.boot.memory.size
+        center = parse_address(arg.strip(), size) if arg.strip() else min(self.boot.cpu.pointer, size - 1)
+        for address in range(max(0, center - 4), min(size, center + 6)):
+            word = self.boot.memory.memory[address]
+            marker = "=>" if address == self.boot.cpu.pointer else ("b " if address in self.breakpoints else "  ")
+            self.print(f"{marker} {address:03d}: {word}  {CPU.disassemble(int(word))}")
+
+    def do_restart(self, arg):
+        """Reload the program and start over, keeping break- and watchpoints. Usage: restart"""
+        self.restart()
+        self.print(self.location())
+
+    def do_quit(self, arg):
+        """Leave the debugger. Usage: quit"""
+        return True
+
+    do_s = do_step
+    do_c = do_continue
+    do_b = do_break
+    do_p = do_print
+    do_q = do_quit
+    do_EOF = do_quit
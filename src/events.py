@@ -0,0 +1,87 @@
+"""Structured simulator events on top of the logging module.
+
+The CPU and Bootstrapper log events through their module loggers ("src.cpu",
+"src.boot") with the event name and its fields attached to the record:
+
+    DEBUG  instruction  address, word, instruction, accumulator (sampled, see CPU.log_sample)
+    DEBUG  write        address, previous, word
+    INFO   load         file, words
+    INFO   memory       pointer, changes: [{address, previous, word}] (only with CPU.log, see -v)
+    INFO   io           operation ("READ" or "WRITE"), address, word
+    INFO   halt         pointer, steps
+    ERROR  error        pointer, message
+
+Nothing is logged unless a handler enables the level, and the CPU checks the
+level once per run, so disabled events cost nothing per instruction.
+configure_logging() buffers records in a MemoryHandler, so messages are only
+formatted when the buffer is flushed.
+"""
+
+import json
+import logging
+import sys
+
+# Loggers of the modules that emit events
+EVENT_LOGGERS = ("src.cpu", "src.boot")
+
+# Records held by configure_logging() before they are formatted and written
+BUFFER_CAPACITY = 4096
+
+
+def event(name: str, **fields):
+    """Return the logging `extra` argument attaching an event name and its fields to a record."""
+    return {"event": name, "fields": fields}
+
+
+class EventFormatter(logging.Formatter):
+    """Formats records as one JSON object per line: time, level, event, message and the event's fields."""
+
+    def format(self, record):
+        """Return the record as a JSON line, records without an event get "event": null."""
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry)
+
+
+def configure_logging(level=logging.INFO, file_name=None, structured=True, capacity=BUFFER_CAPACITY):
+    """Send simulator events at level and above to a file or stderr, buffered in memory.
+
+    Parameters:
+    level (int): Lowest level logged, logging.DEBUG includes per-instruction events
+    file_name (str): File to append to, stderr by default
+    structured (bool): Write JSON lines (see EventFormatter) instead of plain messages
+    capacity (int): Records buffered before they are formatted and written, errors flush at once
+
+    Returns:
+    logging.Handler: The buffering handler, close() it (or let logging.shutdown() do it) to flush
+    """
+    import logging.handlers  # Pulls in socket and pickle, only needed once logging is set up
+
+    target = logging.FileHandler(file_name) if file_name else logging.StreamHandler(sys.stderr)
+    if structured:
+        target.setFormatter(EventFormatter())
+    else:
+        target.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    handler = logging.handlers.MemoryHandler(capacity, flushLevel=logging.ERROR, target=target)
+
+    for name in EVENT_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        logger.addHandler(handler)
+    return handler
+
+
+def remove_logging(handler):
+    """Flush and detach a handler returned by configure_logging()."""
+    for name in EVENT_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+    target = handler.target
+    handler.close()  # Flushes the buffer, then drops the target
+    target.close()
@@ -3,21 +3,38 @@
 import textwrap
 import tkinter as tk
 from tkinter import *
-from termcolor import colored
 from tkinter import filedialog, messagebox, ttk, font, colorchooser
 import json
+import math
 import os
+import queue
+import threading
 
-from src.legacy import convert_file
+from src.legacy import convert_file, convert_directories, convert_word
+from src.assembler import Assembler, AssemblyError, is_assembly
+from src.worker import CPUWorker
+from src.cpu import CPU
+from src.boot import Bootstrapper
 
 class ColoredText(tk.Text):
     '''Class to handle colored text from termcolor in the GUI'''
+
+    # Background tags of the memory heatmap, from least to most accessed
+    HEAT_TAGS = ("heat0", "heat1", "heat2", "heat3", "heat4")
+
     def __init__(self, *args, **kwargs):
         '''Initialize the ColoredText class to inherit from the Text tkinter class'''
         super().__init__(*args, **kwargs)
         self.tag_configure("primary", foreground=COLOR["primary_text"])
         self.tag_configure("secondary", foreground=COLOR["secondary_text"])
         self.tag_configure("center", justify="center") 
+        for tag, color in zip(ColoredText.HEAT_TAGS, COLOR["heat"]):
+            self.tag_configure(tag, background=color)
+
+    def clear_heat(self):
+        '''Remove the heatmap background from all text'''
+        for tag in ColoredText.HEAT_TAGS:
+            self.tag_remove(tag, "1.0", tk.END)
 
     def insert_colored_text(self, text, color=None):
         '''Insert colored text into the text widget'''
@@ -256,7 +273,9 @@ COLOR = {
             "primary_text" : "#000000",
             "secondary_text" : "#505050",
             "darkened_color" : "#d0d0d0",
-            "pc" : "#008000"
+            "pc" : "#008000",
+            "invalid" : "#C00000",
+            "heat" : ("#FFF4C2", "#FFDD85", "#FFB65C", "#FF8A3D", "#F0502A")  # Least to most accessed
         }
 
 # Default font scheme
@@ -268,14 +287,39 @@ FONT = {
 
 class App:
     '''GUI functionality'''
-    def __init__(self, boot, InitWithFileLoaded=None):
-        '''Initialize the GUI'''
-        self.boot = boot
-        self.mem = boot.memory
-        self.cpu = boot.cpu
+
+    # Milliseconds between checks of the CPU worker's event queue
+    POLL_INTERVAL = 15
+
+    # Memory rows rendered before the grid widget has a size, afterwards the rows that fit its height
+    MEMORY_VIEW_ROWS = 25
+
+    # Smallest and largest font size tried when fitting the memory grid to its widget
+    MEMORY_FONT_SIZES = (6, 72)
+
+    # The grid shrinks its font down to this size to show every row, below it the rows that fit are scrolled through
+    MEMORY_READABLE_SIZE = 10
+
+    # Text tag marking invalid words in the program editor
+    INVALID_TAG = "invalid"
+
+    def __init__(self, boot, InitWithFileLoaded=None, refresh_rate=30, max_tabs=3, mainloop=True):
+        '''Initialize the GUI. With mainloop=False the window is built but the event loop is not entered (benchmarks, scripting)'''
+        # Every tab owns a machine, boot becomes the machine of the first tab.
+        # The memory grid, registers and I/O show the machine of the selected tab
+        self.machine = self.new_machine(boot)
 
         # Set Maximum number of files to be opened in GUI tabs
-        self.max_files = 3
+        self.max_files = max_tabs
+
+        # Redraws per second while running in turbo mode
+        self.refresh_rate = refresh_rate
+
+        # True while a step waits for input on the Tk thread, the machine can not be switched then
+        self.stepping = False
+
+        # Thread converting a folder of legacy programs, see convert_folder
+        self.conversion = None
 
         # Initialize default colors
         self.default_primary_color = COLOR["primary"]  # Dark green for backgrounds
@@ -319,8 +363,71 @@ class App:
         # Set initial frame states
         self.highlight_program_frame()
         
-        self.root.mainloop()
+        if mainloop:
+            self.root.mainloop()
     
+    @property
+    def boot(self):
+        '''Bootstrapper of the selected tab'''
+        return self.machine["boot"]
+
+    @property
+    def mem(self):
+        return self.machine["boot"].memory
+
+    @property
+    def cpu(self):
+        return self.machine["boot"].cpu
+
+    @property
+    def worker(self):
+        '''Background runner of the selected tab's program, see run_program'''
+        return self.machine["worker"]
+
+    @worker.setter
+    def worker(self, worker):
+        self.machine["worker"] = worker
+
+    def new_machine(self, boot=None):
+        '''Return the state of a tab's machine. Without boot a Bootstrapper like the current one is created'''
+        if boot is None:
+            boot = Bootstrapper(self.mem.size)
+            boot.cpu.log = self.cpu.log
+            boot.cpu.log_sample = self.cpu.log_sample
+            boot.cpu.tracer = self.cpu.tracer
+        return {
+            "boot": boot,
+            "worker": None,  # CPUWorker while the tab's program runs
+            "tab": None,  # Notebook tab frame owning the machine
+            "output": None,  # Last word written by the program
+            "awaiting_input": False,  # The program is blocked on READ
+        }
+
+    def select_machine(self, machine):
+        '''Show the machine of the selected tab: watch its memory and redraw the grid, registers and I/O'''
+        if machine is self.machine:
+            return
+        self.cancel_input()
+        self.mem.unwatch(self.memory_changes)
+        self.mem.unwatch(self.disassembly_changes)
+
+        self.machine = machine
+        self.sync_access_counting()
+        self.memory_changes = self.mem.watch()
+        self.disassembly_changes = self.mem.watch()
+        self.build_memory_grid()
+        self.update_memory_text()
+
+        if machine["output"] is not None:
+            self.write_word(machine["output"])
+        if self.is_running() and machine["awaiting_input"]:
+            self.status_label.config(text="Status: Waiting for input")
+            self.prompt_input(self.submit_worker_input)
+        elif self.is_running():
+            self.status_label.config(text="Status: Running")
+        else:
+            self.status_label.config(text="Status: Halted" if self.cpu.halted else "Status: Ready")
+
     def setup_root(self):
         '''Sets up the root behavior of the window'''
         self.root = tk.Tk()
@@ -335,15 +442,34 @@ class App:
         filemenu = Menu(menubar, tearoff=0)
         filemenu.add_command(label="Open", command=self.load_file)
         filemenu.add_command(label="Clear", command=self.clear_program)
+        filemenu.add_command(label="Convert Legacy Folder", command=self.convert_folder)
         filemenu.add_command(label="Exit", command=self.root.quit)
         menubar.add_cascade(label="File", menu=filemenu)
 
+        # Run mode: animate redraws after every instruction, turbo runs at full speed
+        # and redraws at refresh_rate. Both execute the program identically.
+        self.run_mode = tk.StringVar(self.root, value="animate")
+        runmenu = Menu(menubar, tearoff=0)
+        runmenu.add_radiobutton(label="Animate Every Step", variable=self.run_mode, value="animate")
+        runmenu.add_radiobutton(label=f"Turbo ({self.refresh_rate} Hz refresh)", variable=self.run_mode, value="turbo")
+        menubar.add_cascade(label="Run", menu=runmenu)
+
+        # Heatmap overlay on the memory grid, the value names the Memory access counter shown
+        self.heatmap_mode = tk.StringVar(self.root, value="off")
+        viewmenu = Menu(menubar, tearoff=0)
+        viewmenu.add_radiobutton(label="No Heatmap", variable=self.heatmap_mode, value="off", command=self.on_heatmap_changed)
+        viewmenu.add_radiobutton(label="Heatmap: Reads", variable=self.heatmap_mode, value="reads", command=self.on_heatmap_changed)
+        viewmenu.add_radiobutton(label="Heatmap: Writes", variable=self.heatmap_mode, value="writes", command=self.on_heatmap_changed)
+        viewmenu.add_radiobutton(label="Heatmap: Executions", variable=self.heatmap_mode, value="executes", command=self.on_heatmap_changed)
+        menubar.add_cascade(label="View", menu=viewmenu)
+
         appearancemenu = Menu(menubar, tearoff=0)
         appearancemenu.add_command(label="Customize Colors", command=self.open_color_dialog)
         menubar.add_cascade(label="Appearance", menu=appearancemenu)
 
         helpmenu = Menu(menubar, tearoff=0)
         helpmenu.add_command(label="Instructions Set", command=self.instructions_window)
+        helpmenu.add_command(label="Disassembly Listing", command=self.disassembly_window)
         helpmenu.add_command(label="About", command=lambda: messagebox.showinfo("About", "UVSim - BasicML Simulator\n\nVersion 2.0\n"))
         menubar.add_cascade(label="Help", menu=helpmenu)
 
@@ -392,20 +518,106 @@ class App:
     
         return prog_input_frame 
       
+    def record_edit_start(self, event):
+        """
+        Bound function to the program_text area, that activates on key press
+        Remembers where the edit starts so only the touched lines are validated on release,
+        and the selection around the cursor, which typing or pasting replaces
+        """
+        widget = event.widget
+        widget.edit_start = widget.index(tk.INSERT)
+        widget.edit_selection = None
+        if widget.tag_ranges(tk.SEL) and widget.compare(tk.SEL_FIRST, "<=", tk.INSERT) \
+                and widget.compare(tk.SEL_LAST, ">=", tk.INSERT):
+            widget.edit_selection = (widget.index(tk.SEL_FIRST), widget.get(tk.SEL_FIRST, tk.SEL_LAST))
+
     def check_text_length(self, event):
         """
         Bound function to the program_text area, that activates on key release
-        Checks if the length of the text is invaild, if so will revert to previously accepted value
+        Updates the line counter from the end index, reverts an edit that exceeds the maximum length
+        and re-validates only the lines between the cursor positions before and after the edit
         """
-        current_text = self.program_text.get("1.0", "end-1c")  # Get text without the trailing newline
-        current_text_lines = current_text.split("\n")
+        widget = event.widget
+        start = getattr(widget, "edit_start", None) or widget.index(tk.INSERT)
+        end = widget.index(tk.INSERT)
+        replaced = ""
+        selection = getattr(widget, "edit_selection", None)
+        if selection is not None and not widget.tag_ranges(tk.SEL):
+            # The selection was replaced: the edit starts where it started
+            start, replaced = selection
+        widget.edit_start = None
+        widget.edit_selection = None
+        if widget.compare(end, "<", start):
+            start, end = end, start
+
+        line_count = int(widget.index("end-1c").split(".")[0])
+        if line_count >= self.mem.size and line_count > widget.line_count:
+            # Revert the edit: remove the inserted text and put back the selection it replaced
+            widget.delete(start, end)
+            widget.insert(start, replaced)
+            messagebox.showerror("Error", f"Maximum Length Exceeded\nLen:{line_count+1}")
+            line_count = int(widget.index("end-1c").split(".")[0])
+            end = widget.index(f"{start}+{len(replaced)}c")
+        widget.line_count = line_count
+
+        self.validate_lines(widget, int(start.split(".")[0]), int(end.split(".")[0]))
+
+    def text_replaced(self, widget):
+        '''Recount and re-validate every line after the whole contents of a program_text widget changed'''
+        widget.line_count = int(widget.index("end-1c").split(".")[0])
+        widget.is_assembly = None
+        self.validate_lines(widget)
+
+    def validate_lines(self, widget, first=1, last=None):
+        '''Highlight invalid words on lines first to last (inclusive) of a program_text widget.
+        Assembly source is checked by the assembler instead (see reassemble_line)'''
+        assembly = is_assembly(widget.get("1.0", "1.end"))
+        if assembly != widget.is_assembly:
+            # The header line switched the format, every line has to be looked at again
+            widget.is_assembly = assembly
+            first, last = 1, None
+        if last is None:
+            last = widget.line_count
+        last = min(last, widget.line_count)
+
+        widget.tag_remove(App.INVALID_TAG, f"{first}.0", f"{last}.end")
+        if assembly:
+            return
 
-        if len(current_text_lines) >= 250:
-            self.program_text.delete("1.0", tk.END)
-            self.program_text.insert("1.0", self.program_text.last_valid_text)
-            messagebox.showerror("Error", f"Maximum Length Exceeded\nLen:{len(current_text_lines)+1}")
-        else:
-            self.program_text.last_valid_text = current_text
+        for number in range(first, last + 1):
+            line = widget.get(f"{number}.0", f"{number}.end")
+            words = line.split()
+            if not words:
+                continue
+            try:
+                convert_word(words[0])
+            except ValueError:
+                column = line.index(words[0])
+                widget.tag_add(App.INVALID_TAG, f"{number}.{column}", f"{number}.{column + len(words[0])}")
+
+    def reassemble_line(self, event):
+        """
+        Bound function to the program_text area, that activates on key release
+        If the tab holds assembly source, re-assembles it re-parsing only the edited lines
+        and reports the result in the status label
+        """
+        tab_data = self.get_tab_data()
+        if not tab_data:
+            return
+        widget = tab_data["text_widget"]
+        if not is_assembly(widget.get("1.0", "1.end")):
+            return
+
+        assembler = tab_data["assembler"]
+        # Pastes, undo and replaced selections can change lines away from the cursor,
+        # update() compares the whole text and re-parses only the changed region
+        assembler.update(widget.get("1.0", "end-1c").split("\n"))
+
+        try:
+            words = assembler.assemble()
+            self.status_label.config(text=f"Status: Assembled {len(words)} words")
+        except AssemblyError as e:
+            self.status_label.config(text=f"Status: {e}")
 
     def setup_main_frame(self):
         '''Sets up the main frame of the program. Including the instruction frame, memory frame, and control frame.
@@ -489,16 +701,31 @@ class App:
         self.acc_label.grid(row=0, column=6, sticky=NS)
         seperator2.grid(row=0, column=7, sticky=NS)
         self.status_label.grid(row=0, column=8, sticky=NSEW)
-        boldseperator1.grid(row=1, column=0, columnspan=9, sticky=EW)
+        boldseperator1.grid(row=1, column=0, columnspan=11, sticky=EW)
 
         # Update memory text to expand
         self.memory_text.grid(row=2, column=0, columnspan=9, sticky="nsew")  # Ensure it fills the space
 
-        # Initialize memory display with initial memory data and disable input
-        self.memory_text.config(state=tk.NORMAL)
-        self.update_memory_text(self.mem.__str__())
-        self.memory_text.tag_add("center", "1.0", "end")  # Center the rest of the text
-        self.memory_text.config(state=tk.DISABLED)
+        # Only the rows in view are rendered, the scrollbar moves that window over memory
+        self.memory_scrollbar = ttk.Scrollbar(memory_frame, orient=tk.VERTICAL, command=self.scroll_memory)
+        self.memory_scrollbar.grid(row=2, column=9, sticky=NS)
+        # Disassembly of the addresses in the memory view, served from the CPU's disassembly cache
+        self.disassembly_list = tk.Listbox(memory_frame, width=18, font=FONT["secondary"], activestyle="none",
+                                           exportselection=False, relief=tk.FLAT, highlightthickness=0)
+        self.disassembly_list.grid(row=2, column=10, sticky=NS, padx=(5, 0))
+        # Performance counters of the CPU, refreshed with the memory grid
+        self.hud_label = tk.Label(memory_frame, text="", bg=self.secondary_color, fg=self.secondary_text_color, anchor=tk.W, font=FONT["secondary"])
+        self.hud_label.grid(row=3, column=0, columnspan=11, sticky=EW, pady=(5, 0))
+        self.memory_text.bind("<MouseWheel>", self.on_memory_wheel)
+        self.memory_text.bind("<Button-4>", self.on_memory_wheel)
+        self.memory_text.bind("<Button-5>", self.on_memory_wheel)
+
+        # Build the memory grid once, later updates only touch changed cells
+        self.memory_font_cache = {}
+        self.memory_font_fit = None
+        self.memory_changes = self.mem.watch()
+        self.disassembly_changes = self.mem.watch()
+        self.build_memory_grid()
         self.memory_text.bind("<Configure>", self.adjust_memory_font_size) # Binds the adjust memory font size when window is changed
 
         return memory_frame
@@ -572,7 +799,7 @@ class App:
         if widget in self.file_tabs and self.file_tabs[widget]["file_path"]:
             # Ensure the number of tabs does not exceed the maximum amount of files
             if len(self.file_tabs) >= self.max_files:
-                messagebox.showerror("Error", "Cannot open more than 3 files at once.")
+                messagebox.showerror("Error", f"Cannot open more than {self.max_files} files at once.")
                 return
 
             # Create a new tab for the file
@@ -584,19 +811,23 @@ class App:
         tab_data = self.file_tabs.get(widget)
         prog_text_widget = tab_data["text_widget"]
         prog_text_widget.delete("1.0", tk.END)
-        prog_text_widget.last_valid_text = ""
 
         try:
             with open(file_path, "r") as file:
-                lines = file.read().split("\n")
+                contents = file.read()
+                lines = contents.split("\n")
                 data = ""
-                for index, line in enumerate(lines):
-                    if line:
-                        data += line.split()[0]
-                        if index != len(lines) - 1:
-                            data += "\n"
+                if is_assembly(contents):
+                    # Keep labels, operands and comments of assembly source
+                    data = contents.rstrip("\n")
+                else:
+                    for index, line in enumerate(lines):
+                        if line:
+                            data += line.split()[0]
+                            if index != len(lines) - 1:
+                                data += "\n"
                 prog_text_widget.insert(tk.END, data)
-                prog_text_widget.last_valid_text = prog_text_widget.get("1.0", "end-1c")
+                self.text_replaced(prog_text_widget)
                 tab_data["file_path"] = file_path
                 trunc_path = self.truncate_text(os.path.basename(file_path))
                 self.notebook.tab(widget, text=trunc_path)
@@ -632,6 +863,11 @@ class App:
         if not tab_data:
             return
         
+        # Stop the tab's program if it is still running in the background
+        worker = tab_data["machine"]["worker"]
+        if worker is not None and worker.running:
+            worker.stop()
+
         # Clear the program text widget and remove the tab
         prog_text_widget = tab_data["text_widget"]
         prog_text_widget.delete("1.0", tk.END)
@@ -654,8 +890,65 @@ class App:
             return
 
 
+    def convert_folder(self, directory: str | None = None):
+        '''Convert every legacy program in a folder in parallel and save a JSON report of invalid lines.
+        The conversion runs on a background thread, poll_conversion reports the result'''
+        if self.conversion is not None:
+            messagebox.showerror("Error", "A folder is already being converted")
+            return
+        if not directory:
+            directory = filedialog.askdirectory(title="Select a folder of legacy programs")
+        if not directory:
+            return
+
+        report_path = os.path.join(directory, "conversion_report.json")
+        results = queue.Queue()
+
+        def convert():
+            # Runs off the Tk thread: the outcome is only posted to results
+            try:
+                report = convert_directories([directory])
+            except Exception as e:
+                results.put((None, f"Error converting folder: {e}"))
+                return
+            try:
+                with open(report_path, "w") as file:
+                    json.dump(report, file, indent=2)
+            except OSError as e:
+                results.put((None, f"Error saving report: {e}"))
+                return
+            results.put((report, None))
+
+        self.status_label.config(text="Status: Converting...")
+        self.conversion = threading.Thread(target=convert, name="convert-folder", daemon=True)
+        self.conversion.start()
+        self.root.after(self.POLL_INTERVAL, self.poll_conversion, results, report_path)
+
+    def poll_conversion(self, results, report_path):
+        '''Report the folder conversion started by convert_folder once it finished, rescheduling itself until then'''
+        try:
+            report, error = results.get_nowait()
+        except queue.Empty:
+            self.root.after(self.POLL_INTERVAL, self.poll_conversion, results, report_path)
+            return
+
+        self.conversion = None
+        self.status_label.config(text="Status: Ready")
+        if error:
+            messagebox.showerror("Error", error)
+            return
+        messagebox.showinfo("Conversion Finished",
+                            f"Converted {report['converted']} of {report['files']} files\n"
+                            f"Skipped (already 6-digit): {report['skipped']}\n"
+                            f"Failed: {report['failed']}\n"
+                            f"Invalid lines nulled: {len(report['invalid_lines'])}\n\n"
+                            f"Report saved at {report_path}")
+
     def load_memory(self):
         '''Load the program_text widget contents into memory'''
+        if self.is_running():
+            messagebox.showerror("Error", "Halt the running program before loading a new one")
+            return
         prog_text_widget = self.program_text
         if not prog_text_widget:
             return
@@ -670,15 +963,17 @@ class App:
         self.mem.clear()
 
         try:
-            if len(text[0]) == 5:
-                print("LEGACY LOAD")
-                self.boot.legacy_load(text)
-                self.program_text.delete("1.0", tk.END)
-                for line in text:
-                    self.program_text.insert(tk.END, f"{line[0]}0{line[1:4]}0{line[4:]}\n") 
+            if is_assembly(text[0]):
+                assembler = self.get_tab_data()["assembler"]
+                assembler.update(self.program_text.get("1.0", "end-1c").split("\n"))
+                self.boot.load_program(assembler.assemble())
             else:
-                print("LOAD")
-                self.boot.load_program(text)                
+                # Legacy words are detected and converted per line while loading
+                self.boot.load_program(text)
+                if any(len(line.split()[0]) == 5 for line in text if line.strip()):
+                    self.program_text.delete("1.0", tk.END)
+                    self.program_text.insert(tk.END, "\n".join(self.boot.image.words))
+                    self.text_replaced(self.program_text)
 
         except (IndexError, ValueError) as e:
             messagebox.showerror("Error", str(e))
@@ -689,89 +984,313 @@ class App:
         # Switch focus to memory frame after loading
         self.highlight_main_frame()
 
-    def adjust_memory_font_size(self, event=None):
-        '''Dynamically adjusts font size to fit text within memory_text widget with some padding.'''
-        self.memory_text.config(state=tk.NORMAL)  # Temporarily enable editing
+    def memory_font_metrics(self, size):
+        '''Return (width of a full memory row, line height) for the memory font at size, measured once per size'''
+        key = (size, self.memory_label_width)
+        metrics = self.memory_font_cache.get(key)
+        if metrics is None:
+            text_font = font.Font(family="Consolas", size=size)
+            sample_row = "0" * self.memory_label_width + " " + "+000000 " * 10
+            metrics = (text_font.measure(sample_row), text_font.metrics("linespace"))
+            self.memory_font_cache[key] = metrics
+        return metrics
+
+    def largest_memory_font(self, fits):
+        '''Return the largest font size for which fits(text_width, line_height) holds, binary searching MEMORY_FONT_SIZES'''
+        low, high = self.MEMORY_FONT_SIZES
+        while low < high:
+            size = (low + high + 1) // 2
+            if fits(*self.memory_font_metrics(size)):
+                low = size
+            else:
+                high = size - 1
+        return low
 
-        text = self.memory_text.get("1.0", "end-1c").strip()
-        if not text:
-            return  # Avoid errors when text is empty
+    def adjust_memory_font_size(self, event=None):
+        '''Fit the memory grid to the memory_text widget with some padding: the font size and the number of rows in view.
 
+        Bound to <Configure>, so it only runs when the widget is resized (or the grid changes shape).
+        Every row is shown if that keeps the font readable, otherwise as many rows as fit the height.
+        Uses cached metrics per size and a binary search over sizes.
+        '''
         # Get widget dimensions
         widget_width = self.memory_text.winfo_width() * 0.97  # 3% padding on width
         widget_height = self.memory_text.winfo_height() * 0.97  # 3% padding on height
-        new_size = 8  # Start with a base font size
+        if widget_height <= 1:  # Not laid out yet
+            return
 
-        # Create a temporary font object
-        text_font = font.Font(family="Consolas", size=new_size)
-        
-        while True:
-            # Calculate text width & height with the current font size
-            text_width = max(text_font.measure(line) for line in text.split("\n"))  # Widest line
-            text_height = text_font.metrics("linespace") * len(text.split("\n"))  # Total height
-
-            # If text fits within the widget (with padding), increase size, otherwise stop
-            if text_width < widget_width and text_height < widget_height:
-                new_size += 1
-                text_font = font.Font(family="Consolas", size=new_size)
-            else:
-                new_size -= 1  # Step back to the last working size
-                break
+        fit = (widget_width, widget_height, self.memory_rows, self.memory_label_width)
+        if fit == self.memory_font_fit:
+            return
+        self.memory_font_fit = fit
+
+        # Largest size showing every row plus the column headers
+        lines = self.memory_rows + 1
+        size = self.largest_memory_font(lambda width, height: width < widget_width and height * lines < widget_height)
+        rows = self.memory_rows
+        if size < self.MEMORY_READABLE_SIZE:
+            # Too many rows for the height: keep the font readable and show the rows that fit
+            size = min(self.MEMORY_READABLE_SIZE, self.largest_memory_font(lambda width, height: width < widget_width))
+            _, line_height = self.memory_font_metrics(size)
+            rows = max(1, min(self.memory_rows, int(widget_height // line_height) - 1))
 
         # Apply the adjusted font size
-        self.memory_text.config(font=("Consolas", new_size), state=tk.DISABLED)
+        self.memory_text.config(font=("Consolas", size))
+        if self.set_memory_view_rows(rows):
+            self.render_memory_rows()
+
+    def set_memory_view_rows(self, rows):
+        '''Change the number of rows in view, keeping the view inside memory. Returns True if it changed'''
+        if rows == self.memory_view_rows:
+            return False
+        self.memory_view_rows = rows
+        self.memory_top_row = max(0, min(self.memory_top_row, self.memory_rows - rows))
+        if self.memory_rows > rows:
+            self.memory_scrollbar.grid()
+        else:
+            self.memory_scrollbar.grid_remove()
+        return True
+
+    def memory_cell_index(self, address):
+        '''Return the start and end text indices of the memory cell at address, or None if it is not in view'''
+        row = address // 10 - self.memory_top_row
+        if not 0 <= row < self.memory_view_rows:
+            return None
+        line = row + 2  # Line 1 holds the column headers
+        column = self.memory_label_width + 1 + (address % 10) * 8  # Each word is 7 characters plus a space
+        return f"{line}.{column}", f"{line}.{column + 7}"
+
+    def build_memory_grid(self):
+        '''Set up the virtualized memory grid for the current memory size and render the rows in view'''
+        self.memory_rows = (self.mem.size + 9) // 10
+        self.memory_view_rows = None
+        self.memory_top_row = 0
+        self.followed_pc = None
+        self.memory_label_width = max(3, len(str((self.memory_rows - 1) * 10)))
+        self.set_memory_view_rows(min(self.memory_rows, self.MEMORY_VIEW_ROWS))
+
+        # Fit the rows in view to the widget, then render them
+        self.memory_font_fit = None
+        self.adjust_memory_font_size()
+        self.render_memory_rows()
+
+    def disassembly_line(self, address):
+        '''Return the disassembly column entry for an address'''
+        return f"{address:03d} {CPU.disassemble(int(self.mem.memory[address]))}"
+
+    def render_disassembly(self):
+        '''Fill the disassembly column with the addresses of the memory rows in view'''
+        self.disassembly_changes.clear()
+        self.disassembly_first = self.memory_top_row * 10
+        last = min(self.mem.size, self.disassembly_first + self.memory_view_rows * 10)
+        self.disassembly_list.delete(0, tk.END)
+        self.disassembly_list.insert(tk.END, *(self.disassembly_line(address) for address in range(self.disassembly_first, last)))
+        self.disassembly_pc = None
+
+    def update_disassembly(self):
+        '''Rewrite the disassembly entries of changed addresses in view and highlight the pc'''
+        first = self.disassembly_first
+        count = self.disassembly_list.size()
+        changes = self.disassembly_changes
+        for address in list(changes):
+            previous = changes.pop(address)
+            index = address - first
+            if 0 <= index < count and self.mem.memory[address] != previous:  # Entries out of view are read when scrolled to
+                self.disassembly_list.delete(index)
+                self.disassembly_list.insert(index, self.disassembly_line(address))
 
-    def update_memory_text(self, text=None):
-        '''Update the memory_text widget with the current memory contents and highlights the pc'''
         pc = self.cpu.pointer
+        if pc != self.disassembly_pc:
+            self.disassembly_list.selection_clear(0, tk.END)
+            if 0 <= pc - first < count:
+                self.disassembly_list.selection_set(pc - first)
+                self.disassembly_list.see(pc - first)
+            self.disassembly_pc = pc
+
+    def disassembly_window(self):
+        '''Display a disassembly listing of the program in memory'''
+        words = self.mem.memory
+        end = len(words)
+        while end > 0 and words[end - 1] == "+000000":  # Trailing empty memory is not part of the program
+            end -= 1
+
+        listing = "\n".join(f"{address:03d}  {words[address]}  {CPU.disassemble(int(words[address]))}" for address in range(end))
+
+        window = tk.Toplevel(self.root)
+        window.title("Disassembly Listing")
+        window.geometry("420x600")
+        text = tk.Text(window, font=("Consolas", 12), wrap=NONE)
+        scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        text.pack(side="left", fill="both", expand=True)
+        text.insert("1.0", listing or "Memory is empty")
+        text.config(state=tk.DISABLED)
+
+    def render_memory_rows(self):
+        '''Render the header and the rows currently in view. Cost is proportional to the view, not to memory'''
+        # Everything in view is read fresh from memory below, older changes are no longer needed
+        self.memory_changes.clear()
 
         self.memory_text.config(state=tk.NORMAL)
         self.memory_text.delete("1.0", tk.END)
 
-        # Update the colors for the memory text widget
-        self.memory_text.set_colors(self.primary_text_color, self.pc_text_color)
+        column_headers = " " * (self.memory_label_width - 1)
+        for i in range(10):
+            column_headers += f"{i:02d}      "
+        self.memory_text.insert_colored_text(" " + column_headers.rstrip() + "\n")
 
-        # Get the current memory lines as a list
-        if not text:
-            text = self.mem.__str__()
-        
-        first_line = text.splitlines()[0].split()  # Get the first line
-        column_headers = "  "
-        for header in first_line:
-            column_headers += header
-            column_headers += "      "
-        first_line = column_headers.rstrip()
-        
-            
-        
-        memory_lines = text.splitlines()[1:] # Get the rest of the lines
-        
-        # Insert the first line with left alignment
-        self.memory_text.insert_colored_text(" " + first_line + "\n")
-
-        for i, line in enumerate(memory_lines):
-            instructions = line.split(" ")  # Split the line into individual instructions
-            for j, instruction in enumerate(instructions):
-                if i * len(instructions) + j - i == pc + 1:
-                    self.memory_text.insert_colored_text(instruction + " ", "secondary")
-                    # Display the current instruction in the instructions label
-                    try:
-                        self.instructions.config(text=f"{self.cpu.operation(self.mem.word_to_int(instruction), self, True)}")
-                    except:
-                        self.instructions.config(text="Instruction")
-                else:
-                    self.memory_text.insert_colored_text(instruction + " ", "primary")
-            if not line[0:2] == "240": # Don't add a newline if it is the last line
+        last_row = self.memory_top_row + self.memory_view_rows
+        for row in range(self.memory_top_row, last_row):
+            i = row * 10
+            if self.memory_label_width == 3 and i < 100:
+                label = f"\xa0{i:02d} "
+            else:
+                label = f"{i:0{self.memory_label_width}d} "
+            self.memory_text.insert_colored_text(label)
+            for word in self.mem.memory[i : i + 10]:
+                self.memory_text.insert_colored_text(word + " ", "primary")
+            if row + 1 < last_row:  # Don't add a newline after the last row in view
                 self.memory_text.insert_colored_text("\n")
-            
+
         self.memory_text.tag_add("center", "1.0", "end")
         self.memory_text.config(state=tk.DISABLED)
+
+        self.memory_scrollbar.set(self.memory_top_row / self.memory_rows, last_row / self.memory_rows)
+        self.highlighted_pc = None
+        self.render_disassembly()
+        self.update_memory_text()
+
+    def scroll_memory_to(self, top_row):
+        '''Move the memory view so it starts at top_row, re-rendering only if it moved'''
+        top_row = max(0, min(top_row, self.memory_rows - self.memory_view_rows))
+        if top_row != self.memory_top_row:
+            self.memory_top_row = top_row
+            self.render_memory_rows()
+
+    def scroll_memory(self, action, amount, unit=None):
+        '''Scrollbar command for the memory view'''
+        if action == "moveto":
+            self.scroll_memory_to(round(float(amount) * self.memory_rows))
+        elif unit == "pages":
+            self.scroll_memory_to(self.memory_top_row + int(amount) * self.memory_view_rows)
+        else:
+            self.scroll_memory_to(self.memory_top_row + int(amount))
+
+    def on_memory_wheel(self, event):
+        '''Scroll the memory view with the mouse wheel'''
+        if event.num == 4 or event.delta > 0:
+            self.scroll_memory_to(self.memory_top_row - 3)
+        else:
+            self.scroll_memory_to(self.memory_top_row + 3)
+        return "break"
+
+    def update_memory_text(self, text=None):
+        '''Update the memory cells that changed since the last call and move the pc highlight
+
+        Cost is proportional to the number of changed cells rather than the size of memory.
+        The text argument is accepted for compatibility and ignored.
+        '''
+        tracer = self.cpu.tracer
+        if tracer is not None:
+            refresh_start = tracer.now()
+        pc = self.cpu.pointer
+        changes = self.memory_changes
+
+        # Bring the program counter into view when it moves, the user may scroll away from it afterwards
+        if pc != self.followed_pc:
+            self.followed_pc = pc
+            if pc < self.mem.size and self.memory_cell_index(pc) is None:
+                self.scroll_memory_to(pc // 10 - self.memory_view_rows // 2)
+
+        if changes or pc != self.highlighted_pc:
+            describe = pc != self.highlighted_pc or pc in changes
+            self.memory_text.config(state=tk.NORMAL)
+
+            # The CPU worker thread may write while we draw: take a snapshot of the
+            # addresses and pop them one by one so no change is lost
+            for address in list(changes):
+                previous = changes.pop(address)
+                word = self.mem.memory[address]
+                cell = self.memory_cell_index(address)
+                if word == previous or cell is None:  # Cells out of view are read when scrolled to
+                    continue
+                start, end = cell
+                self.memory_text.delete(start, end)
+                self.memory_text.insert(start, word, ("primary", "center"))
+
+            if self.highlighted_pc is not None and self.memory_cell_index(self.highlighted_pc):
+                self.memory_text.tag_remove("secondary", *self.memory_cell_index(self.highlighted_pc))
+            if self.memory_cell_index(pc):
+                self.memory_text.tag_add("secondary", *self.memory_cell_index(pc))
+
+            self.memory_text.config(state=tk.DISABLED)
+
+            # Display the current instruction in the instructions label
+            if describe:
+                word = int(self.mem.memory[pc]) if pc < self.mem.size else 0
+                self.instructions.config(text=CPU.describe(word) or "Instruction")
+
+            self.highlighted_pc = pc
+
+        self.update_disassembly()
+        self.update_heatmap()
+        self.update_hud()
         self.pc_label.config(text=f"{self.cpu.pointer:03d}") # Ensure PC is always 3 digits
         self.acc_label.config(text=f"{"+" if self.cpu.accumulator >= 0 else "-"}{abs(int(self.cpu.accumulator)):06d}") # Ensure accumulator is always at least 7 digits
-        self.adjust_memory_font_size()
+        if tracer is not None:
+            tracer.complete("refresh", "gui", refresh_start, pc=pc)
+
+    def update_hud(self):
+        '''Show the CPU's performance counters'''
+        cpu = self.cpu
+        self.hud_label.config(text=f"Instructions: {cpu.steps:,}   IPS: {cpu.instructions_per_second():,.0f}   "
+                                   f"Cycles: {cpu.cycles:,}   Elapsed: {cpu.run_time():.2f} s")
+
+    def update_heatmap(self):
+        '''Color the memory cells in view by how often they were accessed, on a log scale relative to the busiest address'''
+        self.memory_text.clear_heat()
+        mode = self.heatmap_mode.get()
+        counts = getattr(self.mem, mode, None) if mode != "off" else None
+        if counts is None:
+            return
+        peak = max(counts)
+        if not peak:
+            return
+
+        levels = len(ColoredText.HEAT_TAGS)
+        scale = (levels - 1) / math.log1p(peak) if peak > 1 else 0
+        first = self.memory_top_row * 10
+        for address in range(first, min(self.mem.size, first + self.memory_view_rows * 10)):
+            count = counts[address]
+            if count:
+                level = round(math.log1p(count) * scale)
+                self.memory_text.tag_add(ColoredText.HEAT_TAGS[level], *self.memory_cell_index(address))
+
+    def sync_access_counting(self):
+        '''Count memory accesses of the selected machine only while a heatmap is shown'''
+        enabled = self.heatmap_mode.get() != "off"
+        if (self.mem.reads is not None) != enabled:
+            self.mem.count_accesses(enabled)
+
+    def on_heatmap_changed(self):
+        '''Start or stop counting accesses and redraw the heatmap for the chosen mode'''
+        self.sync_access_counting()
+        self.update_heatmap()
+
+    def refresh_display(self):
+        '''Redraw memory, PC and accumulator and let Tk repaint. Used when the CPU runs on the Tk thread (READ while stepping)'''
+        self.update_memory_text()
+        self.root.update_idletasks()
+
+    def is_running(self):
+        '''True while a program is executing on the CPU worker thread'''
+        return self.worker is not None and self.worker.running
 
     def run_program(self):
-        '''Run the program'''
+        '''Run the program on a background worker, keeping the window responsive'''
+        if self.is_running():
+            return
         if self.cpu.halted and self.mem.read(self.cpu.pointer) in ("+043000", "-043000"): # Don't run if the program is halted and send a halt message
             messagebox.showinfo("Halted", "Program is halted")
             return
@@ -787,18 +1306,101 @@ class App:
         self.status_label.config(text="Status: Running")
         # Switch focus to main frame when running
         self.highlight_main_frame()
-            
-        try:
-            self.boot.run(self, cont)
 
-        except Exception as e:
-            messagebox.showerror("Runtime Error", str(e))
+        refresh_rate = self.refresh_rate if self.run_mode.get() == "turbo" else None
+        self.worker = CPUWorker(self.boot, refresh_rate)
+        self.worker.start(cont)
+        self.root.after(self.POLL_INTERVAL, self.poll_worker, self.machine)
+
+    def poll_worker(self, machine):
+        '''Handle the events posted by a machine's CPU worker, rescheduling itself until the program stops.
+        Machines of tabs in the background keep running, only the selected one is drawn'''
+        worker = machine["worker"]
+        if worker is None:  # Discarded by reset_program
+            return
+        for kind, payload in worker.drain():
+            selected = machine is self.machine
+            if kind == CPUWorker.STATE:
+                if selected:
+                    self.update_memory_text()
+                worker.acknowledge()
+            elif kind == CPUWorker.WRITE:
+                machine["output"] = payload
+                if selected:
+                    self.write_word(payload)
+            elif kind == CPUWorker.READ:
+                machine["awaiting_input"] = True
+                if selected:
+                    self.status_label.config(text="Status: Waiting for input")
+                    self.update_memory_text()
+                    self.prompt_input(self.submit_worker_input)
+            elif kind == CPUWorker.DONE:
+                machine["awaiting_input"] = False
+                machine["boot"].cpu.halted = True
+                if selected:
+                    self.cancel_input()
+                    self.update_memory_text()
+                    self.status_label.config(text="Status: Halted")
+                if payload:
+                    title = self.notebook.tab(machine["tab"], "text") if machine["tab"] in self.file_tabs else "Program"
+                    messagebox.showerror("Runtime Error", f"{title}: {payload}")
+                return
+
+        self.root.after(self.POLL_INTERVAL, self.poll_worker, machine)
+
+    def submit_worker_input(self, value):
+        '''Hand a word entered by the user to the program waiting on READ'''
+        self.status_label.config(text="Status: Running")
+        self.machine["awaiting_input"] = False
+        self.worker.provide_input(value)
+
+    def prompt_input(self, on_submit):
+        '''Enable the I/O entry and call on_submit with the word (int) once the user enters a valid one'''
+        def read_input(event):
+            entry = self.io_text.get().strip()
+            try:
+                value = self.mem.word_to_int(entry)
+            except ValueError:
+                try:
+                    value = self.mem.word_to_int(self.mem.int_to_word(int(entry)))
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e))
+                    return
+            self.cancel_input()
+            on_submit(value)
+
+        self.io_text.config(state=tk.NORMAL)
+        self.io_text.delete("0", "end")
+        self.io_text.bind("<Return>", read_input)
+        self.io_label.configure(text="Read a 6-digit instruction: (Press enter to submit)")
+        self.io_text.focus_set()
+
+    def cancel_input(self):
+        '''Disable the I/O entry after a read'''
+        self.io_text.delete("0", "end")
+        self.io_label.configure(text="I/O")
+        self.io_text.unbind("<Return>")
+        self.io_text.config(state=tk.DISABLED)
+
+    def read_word(self):
+        '''Wait (processing Tk events) for the user to enter a word. Used by READ when stepping'''
+        self.input = tk.StringVar()
+        self.prompt_input(self.input.set)
+        self.root.wait_variable(self.input)
+        return int(self.input.get())
+
+    def write_word(self, word):
+        '''Show a word written by the program in the I/O entry'''
+        self.machine["output"] = word
+        self.io_text.config(state=tk.NORMAL)
+        self.io_label.configure(text="Write Output:")
+        self.io_text.delete(0, tk.END)
+        self.io_text.insert(tk.END, word)
 
-        self.update_memory_text()
-        self.halt_program()
-    
     def step_program(self):
         '''Step through the program'''
+        if self.is_running():
+            return
         if self.cpu.halted and self.mem.read(self.cpu.pointer) in ("+043000", "-043000"):
             messagebox.showinfo("Halted", "Program is halted")
             return
@@ -810,25 +1412,42 @@ class App:
         self.status_label.config(text="Status: Stepped")
 
         try:
-            operand = self.mem.word_to_int(self.mem.read(self.cpu.pointer))
+            self.stepping = True
+            operand = self.mem.word_to_int(self.mem.fetch(self.cpu.pointer))
             self.cpu.pointer += 1
             self.cpu.operation(operand, self)
         
         except Exception as e:
             messagebox.showerror("Runtime Error", str(e))
+        finally:
+            self.stepping = False
 
         self.update_memory_text()
         self.halt_program()
 
     def halt_program(self):
-        '''Halt the program'''
+        '''Halt the program, preempting it if it is running on the worker'''
+        if self.is_running():
+            self.worker.stop()
         self.cpu.halted = True
         self.status_label.config(text="Status: Halted")
     
     def reset_program(self):
-        '''Reset the program and reset labels and text widgets to default values'''
+        '''Reset the program to its loaded state and reset labels and text widgets to default values'''
+        if self.is_running():
+            self.worker.stop()
+            self.worker.join()
+            self.worker = None
         self.cpu.halted = False
-        self.mem.clear()
+        # Restore the loaded program in one copy instead of clearing it
+        if self.boot.image is not None:
+            self.boot.restore(self.boot.image)
+        else:
+            self.mem.clear()
+        self.machine["output"] = None
+        self.machine["awaiting_input"] = False
+        if self.mem.reads is not None:
+            self.mem.count_accesses()  # Start the heatmap over
         self.io_label.config(text="I/O")
         self.io_text.config(state=tk.NORMAL)
         self.io_text.delete("0", tk.END)
@@ -947,6 +1566,13 @@ class App:
             bg=self.secondary_color,
             fg=self.primary_text_color
         )
+        self.memory_text.set_colors(self.primary_text_color, self.pc_text_color)
+        self.disassembly_list.configure(
+            bg=self.secondary_color,
+            fg=self.primary_text_color,
+            selectbackground=self.secondary_color,
+            selectforeground=self.pc_text_color
+        )
         
         # Update all labels manually as ttk labels won't work on mac, and I am not sure why
         if hasattr(self, 'instructions'):
@@ -969,6 +1595,9 @@ class App:
             
         if hasattr(self, 'status_label'):
             self.status_label.configure(bg=self.secondary_color, fg=self.primary_text_color)
+
+        if hasattr(self, 'hud_label'):
+            self.hud_label.configure(bg=self.secondary_color, fg=self.secondary_text_color)
             
         if hasattr(self, 'io_label'):
             self.io_label.configure(bg=self.secondary_color, fg=self.primary_text_color)
@@ -1023,13 +1652,26 @@ class App:
         scrollbar = ttk.Scrollbar(prog_text_frame, orient=tk.VERTICAL, command=prog_text_widget.yview)
         scrollbar.pack(side="right", fill="y")
         prog_text_widget.configure(yscrollcommand=scrollbar.set)
+        prog_text_widget.bind("<KeyPress>", self.record_edit_start)
         prog_text_widget.bind("<KeyRelease>", self.check_text_length)
+        prog_text_widget.bind("<KeyRelease>", self.reassemble_line, add="+")
+        prog_text_widget.tag_configure(App.INVALID_TAG, foreground=COLOR["invalid"], underline=True)
+
+        # Incremental validation state, see check_text_length
+        prog_text_widget.line_count = 1
+        prog_text_widget.is_assembly = False
+        prog_text_widget.edit_start = None
+        prog_text_widget.edit_selection = None
 
-        prog_text_widget.last_valid_text = ""
+        # The first tab adopts the machine the App was started with
+        machine = self.machine if self.machine["tab"] is None else self.new_machine()
+        machine["tab"] = tab_frame
 
         self.file_tabs[tab_frame] = {
             "text_widget": prog_text_widget,
-            "file_path": None
+            "file_path": None,
+            "assembler": Assembler(self.mem.size),
+            "machine": machine
         }
 
         self.notebook.insert(self.notebook.index(self.plus_tab), tab_frame, text="New File")
@@ -1040,6 +1682,11 @@ class App:
         current_tab = self.notebook.select()
         widget = self.notebook.nametowidget(current_tab)
 
+        # A step waiting for input on the Tk thread keeps its machine selected
+        if self.stepping and widget is not self.machine["tab"]:
+            self.notebook.select(self.machine["tab"])
+            return
+
         # Do nothing if at maximum tabs and the plus tab is clicked
         if not hasattr(self, '_last_tab') or self._last_tab != current_tab:
             if widget != self.plus_tab:
@@ -1055,6 +1702,8 @@ class App:
                     tabs = self.notebook.tabs()
                     if tabs:
                         self.notebook.select(tabs[0])
+        elif widget in self.file_tabs:
+            self.select_machine(self.file_tabs[widget]["machine"])
     
     def get_tab_data(self):
         '''Get the current tab data'''
@@ -0,0 +1,207 @@
+"""Program images and the compact binary format for BasicML programs.
+
+A ProgramImage is a parsed, validated program that never changes once built.
+It can be shared between any number of machines and restored into Memory
+with a single bulk copy, so repeated runs skip parsing and validation.
+
+A binary image is a fixed header followed by the program words packed as
+little-endian signed 32-bit integers:
+
+    magic (4s) | version (H) | word width (H) | memory size (I) | word count (I) | checksum (I)
+
+The checksum is the CRC-32 of the packed body.
+"""
+
+import struct
+import sys
+import zlib
+from array import array
+
+from src.memory import Memory
+
+MAGIC = b"UVSB"
+VERSION = 1
+WORD_WIDTH = 6
+EXTENSION = ".bml"
+
+HEADER = struct.Struct("<4sHHIII")
+
+
+class ProgramImage:
+    """Immutable, validated BasicML program."""
+
+    __slots__ = ("words", "memory_size", "source", "_cells")
+
+    def __init__(self, words, memory_size=250, source=None):
+        """Create an image from validated words (strings, starting at address 0).
+
+        Parameters:
+        words (iterable): Validated BasicML words
+        memory_size (int): Size of the memory the image restores into
+        source (str): Optional path the program was read from
+
+        Raises:
+        ValueError: If the program is larger than memory
+        """
+        words = tuple(words)
+        if len(words) > memory_size:
+            raise ValueError(f"Program of {len(words)} words does not fit in memory of size {memory_size}")
+
+        object.__setattr__(self, "words", words)
+        object.__setattr__(self, "memory_size", memory_size)
+        object.__setattr__(self, "source", source)
+        # Full memory contents, padded once so restore() is a single copy
+        object.__setattr__(self, "_cells", words + ("+000000",) * (memory_size - len(words)))
+
+    @classmethod
+    def from_ints(cls, numbers, memory_size=250, source=None):
+        """Create an image from range-checked integer words."""
+        return cls(
+            (f"+{n:06d}" if n >= 0 else f"-{-n:06d}" for n in numbers),
+            memory_size,
+            source,
+        )
+
+    def __setattr__(self, name, value):
+        """Images are immutable."""
+        raise AttributeError("ProgramImage is immutable")
+
+    def __delattr__(self, name):
+        """Images are immutable."""
+        raise AttributeError("ProgramImage is immutable")
+
+    def __reduce__(self):
+        """Pickle support, so images can be sent to worker processes."""
+        return (ProgramImage, (self.words, self.memory_size, self.source))
+
+    def __len__(self):
+        """Number of words in the program."""
+        return len(self.words)
+
+    def __eq__(self, other):
+        """Images are equal when they hold the same words for the same memory size."""
+        if not isinstance(other, ProgramImage):
+            return NotImplemented
+        return self.words == other.words and self.memory_size == other.memory_size
+
+    def __hash__(self):
+        """Hash on the program contents."""
+        return hash((self.words, self.memory_size))
+
+    def restore(self, memory: Memory):
+        """Copy the program into memory, resetting every other address to +000000.
+
+        Raises:
+        IndexError: If the program is larger than memory
+        """
+        memory.load_words(self._cells if memory.size == self.memory_size else self.words)
+
+    def to_bytes(self):
+        """Pack the image into the binary format."""
+        return pack_words([int(word) for word in self.words], self.memory_size)
+
+
+def is_image(file_name: str):
+    """Check whether a file starts with the binary image magic number."""
+    with open(file_name, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def pack_words(numbers, memory_size=250):
+    """Pack a sequence of integer words into the binary image format.
+
+    Parameters:
+    numbers (iterable): Integer words, already in the valid word range
+    memory_size (int): Size of the memory the program was written for
+
+    Returns:
+    bytes: Header followed by the packed body
+    """
+    body = array("i", numbers)
+    if len(body) > memory_size:
+        raise ValueError(f"Program of {len(body)} words does not fit in memory of size {memory_size}")
+    if sys.byteorder == "big":
+        body.byteswap()
+
+    payload = body.tobytes()
+    header = HEADER.pack(MAGIC, VERSION, WORD_WIDTH, memory_size, len(body), zlib.crc32(payload))
+    return header + payload
+
+
+def unpack_words(data: bytes):
+    """Unpack a binary image created by pack_words().
+
+    Parameters:
+    data (bytes): Raw contents of an image file
+
+    Returns:
+    tuple: (memory_size the program was written for, array of integer words)
+
+    Raises:
+    ValueError: If the header, checksum or words are invalid
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Image is too short to contain a header")
+
+    magic, version, width, memory_size, count, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a BasicML image (bad magic number)")
+    if version != VERSION:
+        raise ValueError(f"Unsupported image version {version}")
+    if width != WORD_WIDTH:
+        raise ValueError(f"Unsupported word width {width}")
+    if count > memory_size:
+        raise ValueError(f"Image of {count} words does not fit in its memory size of {memory_size}")
+
+    payload = data[HEADER.size:]
+    if len(payload) != count * 4:
+        raise ValueError(f"Image body holds {len(payload) // 4} words, header says {count}")
+    if zlib.crc32(payload) != checksum:
+        raise ValueError("Image checksum mismatch")
+
+    body = array("i")
+    body.frombytes(payload)
+    if sys.byteorder == "big":
+        body.byteswap()
+
+    if body and not (Memory.MIN_WORD <= min(body) and max(body) <= Memory.MAX_WORD):
+        raise ValueError("Image contains words outside of the valid range")
+
+    return memory_size, body
+
+
+def read_image(file_name: str):
+    """Read a binary image from disk with a single bulk read."""
+    with open(file_name, "rb") as file:
+        return unpack_words(file.read())
+
+
+def compile_file(file_name: str, output: str | None = None, memory_size=250):
+    """Convert a text BasicML program (legacy, 6-digit or mixed) into a binary image.
+
+    Parameters:
+    file_name (str): Text program, one word per line
+    output (str): Destination path, defaults to the source name with a .bml extension
+    memory_size (int): Size of the memory the program is written for
+
+    Returns:
+    str: Path of the written image
+
+    Raises:
+    ValueError: If a word is invalid or the program does not fit in memory
+    """
+    from src.boot import Bootstrapper  # boot reads images through this module
+
+    try:
+        image = Bootstrapper(memory_size).build_image(file_name)
+    except IndexError as e:
+        raise ValueError(str(e).removeprefix("IndexError: "))
+
+    if output is None:
+        idx = file_name.rfind(".")
+        output = (file_name[:idx] if idx > 0 else file_name) + EXTENSION
+
+    with open(output, "wb") as file:
+        file.write(image.to_bytes())
+
+    return output
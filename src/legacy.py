@@ -1,5 +1,14 @@
+"""Conversion of legacy 4-digit BasicML programs to the 6-digit format."""
+
+import logging
+import os
+
 from src.memory import Memory
 
+LOGGER = logging.getLogger(__name__)
+
+CONVERTED_SUFFIX = "_converted"
+
 
 def legacy_word_to_new(word: str):
 
@@ -12,59 +21,183 @@ def legacy_word_to_new(word: str):
     return word
 
 
-def convert_file(file_path: str):
+def convert_word(word: str):
+    """Convert a single word, leaving 6-digit words untouched.
+
+    Returns:
+    tuple: (6-digit word, True if the word needed conversion)
+
+    Raises:
+    ValueError: If the word is neither a legacy nor a 6-digit word
+    """
+    if len(word) == 7 and word[0] in ("-", "+") and word[1:].isdigit():
+        return word, False
+    return legacy_word_to_new(word), True
+
+
+def converted_path(file_path: str):
+    """Return the path of the _converted copy written next to file_path."""
+    idx = file_path.rfind(".")
+    if idx <= 0 or os.sep in file_path[idx:]:
+        return f"{file_path}{CONVERTED_SUFFIX}"
+    return f"{file_path[:idx]}{CONVERTED_SUFFIX}{file_path[idx:]}"
+
+
+def convert_stream(lines, output):
+    """Convert lines of a program, streaming 6-digit words to an open file.
+
+    Invalid words are nulled (written as +000000).
+
+    Parameters:
+    lines (iterable): Lines of a BasicML program
+    output (file): Writable text file
+
+    Returns:
+    tuple: (list of (line number, word) for invalid lines, True if any line needed conversion)
+    """
     errors = []
-    instructions = []
     needs_conversion = False
+    first = True
+
+    for number, line in enumerate(lines, start=1):
+        word = line.split()
+        if not word:
+            continue
+        word = word[0]
+
+        try:
+            instruction, converted = convert_word(word)
+            needs_conversion = needs_conversion or converted
+        except ValueError:
+            needs_conversion = True
+            errors.append((number, word))
+            instruction = "+000000"
+
+        # No trailing newline after the last instruction
+        output.write(instruction if first else f"\n{instruction}")
+        first = False
+
+    return errors, needs_conversion
+
+
+def convert_file(file_path: str):
+    copy_file = converted_path(file_path)
+    partial_file = f"{copy_file}.part"
 
-    with open(file_path, "r") as f:
-        for line in f:
-            word = line.split()
-            if not word:
-                continue
-                
-            word = word[0]
-            
-            # Check if the word is already in 6-digit format
-            if len(word) == 7 and word[0] in ("-", "+") and word[1:].isdigit():
-                # Already in 6-digit format, keep as is
-                instructions.append(f"{word}\n")
-            else:
-
-                needs_conversion = True
-                try:
-                    instruction = legacy_word_to_new(word)
-                    instructions.append(f"{instruction}\n")
-                except ValueError as e:
-                    errors.append(word)
-                    print(
-                        f'Invalid instruction "{word}" in file: {file_path}\nNulling that line',
-                    )
-                    instructions.append("+000000\n")
-        
-        # Remove trailing newline from the last instruction
-        if instructions:
-            instructions[-1] = instructions[-1].rstrip()
+    with open(file_path, "r") as f, open(partial_file, "w") as out:
+        errors, needs_conversion = convert_stream(f, out)
 
     # If all lines are already in 6-digit format, throw an error
     if not needs_conversion:
+        os.remove(partial_file)
         raise ValueError(
             f"File '{file_path}' is already in 6-digit format. "
             f"No conversion needed."
         )
 
-
-    idx = file_path.rfind(".")
-    base_name = file_path[:idx]
-    extension = file_path[idx:]
-    copy_file = f"{base_name}_converted{extension}"
-
-    with open(copy_file, "w") as file:
-        file.writelines(instructions)
+    os.replace(partial_file, copy_file)
 
     if errors:
+        for number, word in errors:
+            LOGGER.warning('Invalid instruction "%s" on line %d in file: %s. Nulling that line', word, number, file_path)
         raise ValueError(
-            f"Invalid instructions '{" ".join(errors)}' in file: {file_path}. "
+            f"Invalid instructions '{" ".join(word for _, word in errors)}' in file: {file_path}. "
             f"\nThose lines have been nulled. \n\nFile saved at {copy_file}"
         )
     return copy_file
+
+
+def _convert_job(job):
+    """Convert one file for convert_directories(), returning a report entry.
+
+    Runs in a worker process, so it never raises.
+    """
+    source, destination = job
+    result = {"source": source, "output": None, "status": "converted", "invalid": [], "message": ""}
+    partial_file = f"{destination}.part"
+
+    try:
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        with open(source, "r") as f, open(partial_file, "w") as out:
+            errors, needs_conversion = convert_stream(f, out)
+
+        if not needs_conversion:
+            os.remove(partial_file)
+            result["status"] = "skipped"
+            result["message"] = "already in 6-digit format"
+            return result
+
+        os.replace(partial_file, destination)
+        result["output"] = destination
+        result["invalid"] = [{"line": number, "word": word} for number, word in errors]
+    except (OSError, UnicodeDecodeError) as e:
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+        result["status"] = "failed"
+        result["message"] = str(e)
+
+    return result
+
+
+def find_programs(directories, extension=".txt"):
+    """Yield (directory, path) for every program file below the given directories.
+
+    Files that are themselves _converted copies are skipped.
+    """
+    for directory in directories:
+        if os.path.isfile(directory):
+            yield os.path.dirname(directory), directory
+            continue
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                stem = name[: -len(extension)] if name.endswith(extension) else None
+                if stem is None or stem.endswith(CONVERTED_SUFFIX):
+                    continue
+                yield directory, os.path.join(root, name)
+
+
+def convert_directories(directories, output_dir: str | None = None, workers: int | None = None, extension=".txt"):
+    """Convert every legacy program below the given directories in parallel.
+
+    Parameters:
+    directories (list): Directories (or single files) to convert
+    output_dir (str): Where to write converted files, mirroring the input layout.
+                      Defaults to a _converted copy next to each file.
+    workers (int): Number of worker processes, defaults to the CPU count. 1 converts in-process.
+    extension (str): Extension of program files to convert
+
+    Returns:
+    dict: Report with totals, every invalid line and a result per file
+    """
+    jobs = []
+    for directory, path in find_programs(directories, extension):
+        if output_dir is None:
+            destination = converted_path(path)
+        else:
+            relative = os.path.relpath(path, directory or ".")
+            destination = os.path.join(output_dir, os.path.basename(os.path.normpath(directory)), relative)
+        jobs.append((path, destination))
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [_convert_job(job) for job in jobs]
+    else:
+        # Imported here: multiprocessing is only needed for parallel conversion
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(_convert_job, jobs, chunksize=chunksize))
+
+    report = {
+        "files": len(results),
+        "converted": sum(r["status"] == "converted" for r in results),
+        "skipped": sum(r["status"] == "skipped" for r in results),
+        "failed": sum(r["status"] == "failed" for r in results),
+        "invalid_lines": [
+            {"file": r["source"], "line": entry["line"], "word": entry["word"]}
+            for r in results
+            for entry in r["invalid"]
+        ],
+        "results": results,
+    }
+    return report
@@ -1,51 +1,462 @@
 """UVSim main entry point"""
 
-from . import gui
 import argparse
+import json
+import logging
+import sys
 import textwrap
-from .boot import Bootstrapper
-
-boot = Bootstrapper()
-mem = boot.memory
-cpu = boot.cpu
-
-parser = argparse.ArgumentParser(prog="UVSim", 
-                                 formatter_class=argparse.RawDescriptionHelpFormatter, 
-                                 add_help=False,
-                                 usage="poetry run python src/main.py [file_path] [-h] [-v] [--version]",
-                                 description=textwrap.dedent('''                        
-                                    This project is managed with Poetry. In order to run this project, first install Poetry, through 'pip install poetry' or one of the recommended methods described by its documentation. 
-                                    Once Poetry is installed, see the following commands:
-                                    $ poetry lock -- This step shouldn't be necessary, but it will make sure that the lockfile is up to date with the latest versions.
-                                                             
-                                    $ poetry install --all-extras -- This creates a .venv/ folder, in which poetry installs all the necessary libraries to run this project.
-
-                                    $ poetry run python src/main.py [file_path] [-h] [-v] [--version]
-
-                                                             
-                                    UVSim - Run a BasicML program
-                                    --------------------------------              
-                                    '''))
-
-parser.add_argument("file", type=str, action="store", nargs="?", metavar = "file_path", default = None, help="file path to the BasicML input file")
-parser.add_argument("-v", "--verbose", action="store_true", help="enable verbose mode for debugging")
-parser.add_argument("--version", action="version", version="%(prog)s 2.0")
-parser.add_argument("-h", "--help", action="help", help="show this help message and exit", )
-args = parser.parse_args()
-
-def main():
+import time
+from .boot import Bootstrapper, ENGINES
+from .image import compile_file, is_image
+from .assembler import Assembler, assemble_file, is_assembly
+from .legacy import convert_directories
+from .tape import TapeIO
+from .events import configure_logging, remove_logging
+from .profiler import ProfiledMemory
+from .trace import Tracer, span
+from .batch import run_batch
+from .bench import bench_program
+from .coverage import format_coverage
+from .debugger import Debugger
+from .watch import ProgramWatcher, format_report as format_watch_report
+
+# Subcommands, running without one opens the GUI
+COMMANDS = ("gui", "run", "batch", "bench", "watch", "debug", "compile", "assemble", "convert")
+
+DESCRIPTION = textwrap.dedent('''
+    This project is managed with Poetry. In order to run this project, first install Poetry, through 'pip install poetry' or one of the recommended methods described by its documentation.
+    Once Poetry is installed, see the following commands:
+    $ poetry lock -- This step shouldn't be necessary, but it will make sure that the lockfile is up to date with the latest versions.
+
+    $ poetry install --all-extras -- This creates a .venv/ folder, in which poetry installs all the necessary libraries to run this project.
+
+    $ poetry run uvsim [command] [file_path] [-h] [--version]
+
+
+    UVSim - Run a BasicML program
+    --------------------------------
+    Without a command the simulator window (gui) is opened.
+    ''')
+
+
+def non_negative_int(text):
+    """argparse type of instruction limits: an integer of at least 0"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{text}'")
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, got {value}")
+    return value
+
+
+def build_parser():
+    """Build the argument parser with one subparser per command"""
+    parser = argparse.ArgumentParser(prog="uvsim",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=DESCRIPTION)
+    parser.add_argument("--version", action="version", version="%(prog)s 2.0")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    memory_size = argparse.ArgumentParser(add_help=False)
+    memory_size.add_argument("--memory-size", type=int, default=250, metavar="WORDS", help="number of words of memory (default: 250)")
+
+    log_options = argparse.ArgumentParser(add_help=False)
+    log_options.add_argument("-v", "--verbose", action="count", default=0,
+                             help="log load, memory change, I/O, halt and error events to stderr or --log-file; "
+                                  "-vv also logs every instruction and memory write")
+    log_options.add_argument("--log-file", default=None, metavar="FILE", help="append events to this file instead of stderr")
+    log_options.add_argument("--log-format", choices=("json", "text"), default="json", help="event format (default: json lines)")
+    log_options.add_argument("--log-sample", type=int, default=1, metavar="N", help="with -vv, log one in N instructions (default: 1)")
+
+    trace_options = argparse.ArgumentParser(add_help=False)
+    trace_options.add_argument("--trace", default=None, metavar="FILE",
+                               help="write a Chrome trace-event JSON of loads, runs, basic blocks, input waits and redraws "
+                                    "(open in chrome://tracing or ui.perfetto.dev)")
+    trace_options.add_argument("--trace-sample", type=int, default=1, metavar="N", help="record one in N basic blocks (default: 1)")
+
+    convert_options = argparse.ArgumentParser(add_help=False)
+    convert_options.add_argument("--out-dir", default=None, help="directory for converted files (default: a _converted copy next to each file)")
+    convert_options.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    convert_options.add_argument("--report", default=None, help="write the JSON conversion report to this file instead of stdout")
+
+    gui_command = commands.add_parser("gui", parents=[memory_size, convert_options, log_options, trace_options], help="open the simulator window")
+    gui_command.add_argument("file", type=str, nargs="?", metavar="file_path", default=None, help="file path to the BasicML input file")
+    gui_command.add_argument("--refresh-rate", type=int, default=30, metavar="HZ", help="memory redraws per second when running in turbo mode (default: 30)")
+    gui_command.add_argument("--max-tabs", type=int, default=3, metavar="N", help="maximum number of program tabs, each with its own machine (default: 3)")
+    # Earlier command line, kept working: file_path --compile / --assemble, --convert DIR...
+    gui_command.add_argument("-c", "--compile", nargs="?", const="", default=None, metavar="OUTPUT", help="same as the compile command")
+    gui_command.add_argument("-a", "--assemble", action="store_true", help="same as the assemble command")
+    gui_command.add_argument("--convert", nargs="+", metavar="DIR", default=None, help="same as the convert command")
+    gui_command.set_defaults(handler=launch_gui)
+
+    run_command = commands.add_parser("run", parents=[memory_size, log_options, trace_options], help="run a program without a display")
+    run_command.add_argument("file", metavar="file_path", help="text program, assembly source or binary image")
+    run_command.add_argument("--input", default="", metavar="WORDS", help="comma separated words fed to READ, e.g. 5,-7")
+    run_command.add_argument("--output", default=None, metavar="FILE", help="write the report to this file instead of stdout")
+    run_command.add_argument("--engine", choices=ENGINES, default="reference", help="execution engine (default: reference)")
+    run_command.add_argument("--max-steps", type=non_negative_int, default=None, metavar="N", help="stop after N instructions (default: the CPU's instruction limit)")
+    run_command.add_argument("--format", choices=("text", "json"), default="text", help="report format (default: text)")
+    run_command.add_argument("--profile", default=None, metavar="FILE",
+                             help="record memory accesses per address and write them to FILE (.csv or .json); "
+                                  "runs with the reference engine")
+    run_command.set_defaults(handler=run_program)
+
+    batch_command = commands.add_parser("batch", parents=[memory_size], help="run programs with several input tapes, with coverage")
+    batch_command.add_argument("files", nargs="+", metavar="file_path", help="text programs, assembly sources or binary images")
+    batch_command.add_argument("--input", action="append", default=None, metavar="WORDS",
+                               help="comma separated words fed to READ, repeat for more tapes (each program runs once per tape)")
+    batch_command.add_argument("--engine", choices=ENGINES, default="reference", help="execution engine (default: reference)")
+    batch_command.add_argument("--max-steps", type=non_negative_int, default=None, metavar="N", help="instruction limit per run (default: the CPU's instruction limit)")
+    batch_command.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    batch_command.add_argument("--coverage", action="store_true", help="report instructions never executed and branches that only went one way")
+    batch_command.add_argument("--format", choices=("text", "json"), default="text", help="report format (default: text)")
+    batch_command.set_defaults(handler=batch)
+
+    bench_command = commands.add_parser("bench", parents=[memory_size], help="measure throughput of a program under each engine")
+    bench_command.add_argument("file", metavar="file_path", help="text program, assembly source or binary image")
+    bench_command.add_argument("--input", default="", metavar="WORDS", help="comma separated words fed to READ on every run")
+    bench_command.add_argument("--engine", choices=ENGINES, nargs="+", default=list(ENGINES), help="engines to compare (default: all)")
+    bench_command.add_argument("--runs", type=int, default=20, metavar="N", help="timed runs per engine (default: 20)")
+    bench_command.add_argument("--warmup", type=int, default=3, metavar="N", help="untimed runs per engine first (default: 3)")
+    bench_command.add_argument("--max-steps", type=non_negative_int, default=None, metavar="N", help="instruction limit per run (default: the CPU's instruction limit)")
+    bench_command.add_argument("--format", choices=("text", "json"), default="text", help="report format (default: text)")
+    bench_command.set_defaults(handler=bench)
+
+    watch_command = commands.add_parser("watch", parents=[memory_size], help="rerun a program headless whenever its file changes")
+    watch_command.add_argument("file", metavar="file_path", help="text program, assembly source or binary image")
+    watch_command.add_argument("--input", default="", metavar="WORDS", help="comma separated words fed to READ on every run")
+    watch_command.add_argument("--engine", choices=ENGINES, default="reference", help="execution engine (default: reference)")
+    watch_command.add_argument("--max-steps", type=non_negative_int, default=None, metavar="N", help="instruction limit per run (default: the CPU's instruction limit)")
+    watch_command.add_argument("--interval", type=float, default=0.5, metavar="SECONDS", help="seconds between checks of the file (default: 0.5)")
+    watch_command.add_argument("--once", action="store_true", help="load and run once, then exit")
+    watch_command.set_defaults(handler=watch)
+
+    debug_command = commands.add_parser("debug", parents=[memory_size], help="step through a program in a terminal debugger")
+    debug_command.add_argument("file", metavar="file_path", help="text program, assembly source or binary image")
+    debug_command.add_argument("--input", default="", metavar="WORDS", help="comma separated words fed to READ before asking")
+    debug_command.add_argument("--max-steps", type=non_negative_int, default=None, metavar="N", help="instruction limit of continue (default: the CPU's instruction limit)")
+    debug_command.set_defaults(handler=debug)
+
+    compile_command = commands.add_parser("compile", parents=[memory_size], help="compile a program into a binary image")
+    compile_command.add_argument("file", metavar="file_path")
+    compile_command.add_argument("-o", "--output", default=None, help="image file (default: file_path with a .bml extension)")
+    compile_command.set_defaults(handler=compile_program)
+
+    assemble_command = commands.add_parser("assemble", parents=[memory_size], help="assemble mnemonic source")
+    assemble_command.add_argument("file", metavar="file_path")
+    assemble_command.set_defaults(handler=assemble_program)
+
+    convert_command = commands.add_parser("convert", parents=[convert_options], help="convert legacy programs in parallel")
+    convert_command.add_argument("directories", nargs="+", metavar="DIR")
+    convert_command.set_defaults(handler=convert)
+
+    return parser
+
+
+def convert(args):
+    """Bulk convert legacy programs and emit a single JSON report"""
+    report = convert_directories(args.directories, args.out_dir, args.workers)
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Converted {report['converted']} of {report['files']} files "
+              f"({report['skipped']} skipped, {report['failed']} failed, "
+              f"{len(report['invalid_lines'])} invalid lines). Report saved to {args.report}")
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+def compile_program(args):
+    """Compile a text program into a binary image"""
+    try:
+        print(f"Saved image to {compile_file(args.file, args.output, args.memory_size)}")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+def assemble_program(args):
+    """Assemble mnemonic source into a program and a listing"""
+    try:
+        program, listing = assemble_file(args.file, memory_size=args.memory_size)
+        print(f"Saved program to {program}\nSaved listing to {listing}")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+def load(boot, file_name):
+    """Load a text program, assembly source or binary image into boot
+
+    Raises:
+    OSError: If the file can not be read
+    ValueError: If the program is invalid
+    IndexError: If the program is too large for memory
+    """
+    if not is_image(file_name):
+        with open(file_name, "r") as file:
+            text = file.read()
+        if is_assembly(text):
+            with span(boot.cpu.tracer, "load", "load", file=file_name):
+                assembler = Assembler(boot.memory.size)
+                assembler.update(text.split("\n"))
+                boot.load_program(assembler.assemble())
+            return
+    boot.load_from_file(file_name)
+
+
+def format_report(report):
+    """Render a headless run report as text"""
+    lines = list(report["outputs"])
+    lines.append(f"Error: {report['error']}" if report["error"] else "Halted")
+    lines.append(f"Accumulator: {report['accumulator']}  Pointer: {report['pointer']:03d}  "
+                 f"Instructions: {report['steps']}  Cycles: {report['cycles']}")
+    lines.append(report["memory_text"])
+    return "\n".join(lines)
+
+
+def setup_logging(args, boot):
+    """Apply the verbose and --log-* options, returning the event handler to remove at exit (or None)"""
+    boot.cpu.log = args.verbose > 0
+    if not args.verbose:
+        return None
+    if args.log_sample < 1:
+        raise ValueError("--log-sample must be at least 1")
+    boot.cpu.log_sample = args.log_sample
+    level = logging.DEBUG if args.verbose > 1 else logging.INFO
+    return configure_logging(level, args.log_file, structured=args.log_format == "json")
+
+
+def setup_tracing(args, boot):
+    """Give the CPU a Tracer when --trace is set, returning it (or None)
+
+    Raises:
+    ValueError: If --trace-sample is less than 1
+    """
+    boot.cpu.tracer = Tracer(args.trace_sample) if args.trace else None
+    return boot.cpu.tracer
+
+
+def save_trace(args, tracer):
+    """Write the trace to --trace, returning False if it could not be written"""
+    try:
+        tracer.save(args.trace)
+    except OSError as e:
+        print(f"Error: {e}")
+        return False
+    return True
+
+
+def run_program(args):
+    """Run a program headless, feeding --input to READ, and report its output and final state"""
+    boot = Bootstrapper(args.memory_size)
+    try:
+        handler = setup_logging(args, boot)
+        tracer = setup_tracing(args, boot)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    try:
+        status = run_and_report(args, boot)
+    finally:
+        if handler is not None:
+            remove_logging(handler)
+    if tracer is not None and not save_trace(args, tracer):
+        return 1
+    return status
+
+
+def run_and_report(args, boot):
+    """Load, run and report for run_program"""
+    try:
+        tape = TapeIO(TapeIO.parse(args.input))
+        load(boot, args.file)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"Error: {e}")
+        return 1
+    profile = ProfiledMemory.attach(boot) if args.profile else None
+
+    try:
+        result = boot.run(tape, max_steps=args.max_steps, engine=args.engine)
+    except (IndexError, ZeroDivisionError) as e:
+        result = f"Error: {e}"
+
+    if profile is not None:
+        try:
+            profile.export(args.profile)
+        except OSError as e:
+            print(f"Error: {e}")
+            return 1
+
+    cpu = boot.cpu
+    error = result[len("Error: "):] if result and result.startswith("Error: ") else result
+    report = {
+        "file": args.file,
+        "engine": boot.engine_used(args.engine),
+        "halted": not result,
+        "error": error,
+        "outputs": tape.outputs,
+        "accumulator": f"{int(cpu.accumulator):+07d}",
+        "pointer": cpu.pointer,
+        "steps": cpu.steps,
+        "cycles": cpu.cycles,
+        "elapsed": cpu.run_time(),
+        "memory": list(boot.memory.memory),
+    }
+
+    if args.format == "json":
+        output = json.dumps(report, indent=2)
+    else:
+        report["memory_text"] = str(boot.memory)
+        output = format_report(report)
+        if profile is not None:
+            output += "\n" + profile.summary()
+
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 0 if not result else 1
+
+
+def batch(args):
+    """Run every program with every input tape, optionally reporting instruction coverage"""
+    try:
+        tapes = [TapeIO.parse(text) for text in args.input or [""]]
+        report = run_batch(args.files, tapes, args.engine, args.max_steps, args.memory_size, args.workers, args.coverage)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.format == "json":
+        print(json.dumps(report, indent=2))
+    else:
+        for run in report["runs"]:
+            tape = ",".join(str(word) for word in run["inputs"])
+            print(f"{run['file']} [{tape}]: {run['result'] or 'Halted'}  outputs {' '.join(run['outputs']) or '-'}  "
+                  f"instructions {run['steps']}")
+        for coverage in report["coverage"] or []:
+            print(format_coverage(coverage))
+    return 0 if all(not run["result"] for run in report["runs"]) else 1
+
+
+def bench(args):
+    """Run a program repeatedly under each engine and report throughput, latency and peak memory"""
+    boot = Bootstrapper(args.memory_size)
+    try:
+        inputs = TapeIO.parse(args.input)
+        load(boot, args.file)
+        report = bench_program(boot, args.engine, args.runs, args.warmup, inputs, args.max_steps)
+    except (OSError, ValueError, IndexError, ZeroDivisionError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.format == "json":
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{args.file}: {args.runs} runs per engine after {args.warmup} warm-up runs")
+    for engine, entry in report.items():
+        latency = entry["latency"]
+        print(f"{engine:<10} {entry['instructions_per_second']:>14,.0f} instructions/s  "
+              f"{entry['steps']:,} instructions per run  peak memory {entry['peak_memory'] / 1024:,.1f} KiB")
+        print(f"{'':<10} latency  mean {latency['mean'] * 1000:.3f} ms  p50 {latency['p50'] * 1000:.3f} ms  "
+              f"p90 {latency['p90'] * 1000:.3f} ms  p99 {latency['p99'] * 1000:.3f} ms")
+        if entry["result"]:
+            print(f"{'':<10} program ended with: {entry['result']}")
+    return 0
+
+
+def watch(args):
+    """Rerun a program headless every time its file changes, printing the changes in its final state"""
+    try:
+        inputs = TapeIO.parse(args.input)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    watcher = ProgramWatcher(Bootstrapper(args.memory_size), args.file, inputs, args.engine, args.max_steps)
+
+    if not args.once:
+        print(f"Watching {args.file} (Ctrl+C to stop)")
+    try:
+        while True:
+            report = watcher.poll()
+            if report is not None:
+                print(format_watch_report(report), flush=True)
+            if args.once:
+                return 1 if report is None or "error" in report or report["state"]["result"] else 0
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+def debug(args):
+    """Open the terminal debugger on a program"""
+    boot = Bootstrapper(args.memory_size)
+    try:
+        inputs = TapeIO.parse(args.input)
+        load(boot, args.file)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    debugger = Debugger(boot, inputs, args.max_steps)
+    try:
+        debugger.cmdloop()
+    except KeyboardInterrupt:
+        print()
+    return 0
+
+
+def launch_gui(args):
+    """Open the GUI, or handle the earlier --compile/--assemble/--convert options"""
+    if args.convert:
+        args.directories = args.convert
+        return convert(args)
     if args.file:
         try:
-            open(args.file, "r")
+            open(args.file, "r").close()
         except FileNotFoundError:
             print(f"Error: File {args.file} not found.")
-            return
-        gui.App(boot, args.file)    
-    else:
-        gui.App(boot)
+            return 1
+        if args.assemble:
+            return assemble_program(args)
+        if args.compile is not None:
+            args.output = args.compile or None
+            return compile_program(args)
+
+    from . import gui  # Tk is only loaded when the window is opened
+
+    boot = Bootstrapper(args.memory_size)
+    try:
+        handler = setup_logging(args, boot)
+        tracer = setup_tracing(args, boot)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    try:
+        gui.App(boot, args.file, refresh_rate=args.refresh_rate, max_tabs=args.max_tabs)
+    finally:
+        if handler is not None:
+            remove_logging(handler)
+    if tracer is not None and not save_trace(args, tracer):
+        return 1
+    return 0
+
+
+def main(argv=None):
+    """Parse the command line and run the command, returning the exit status"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help", "--version")):
+        argv = ["gui", *argv]
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
 
 if __name__ == "__main__":
-    if args.verbose:
-        cpu.log = True
-        mem.log = True
-    main()
+    sys.exit(main())
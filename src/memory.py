@@ -4,6 +4,9 @@
 class Memory:
     """Memory functionality."""
 
+    MAX_WORD = 999999
+    MIN_WORD = -999999
+
     def __init__(self, size=250):
         """Initialize memory with specified size (default 250 words).
 
@@ -11,6 +14,49 @@ class Memory:
         """
         self.size = size
         self.memory = ["+000000"] * size
+        # Change sets handed out by watch(), see write()
+        self.watchers = []
+        # Per-address access counts, None unless count_accesses() was called
+        self.reads = None
+        self.writes = None
+        self.executes = None
+
+    def watch(self):
+        """Start tracking changed addresses.
+
+        Returns:
+        dict: Filled with {address: previous word} for every address written
+              (or reset) since the consumer last cleared it
+        """
+        changes = {}
+        self.watchers.append(changes)
+        return changes
+
+    def unwatch(self, changes):
+        """Stop tracking changes for a dict returned by watch()."""
+        self.watchers = [w for w in self.watchers if w is not changes]
+
+    def count_accesses(self, enabled=True):
+        """Start counting reads, writes and instruction fetches per address.
+
+        Counting is off by default, so uncounted accesses only pay a None check.
+        Calling it again resets the counts.
+
+        Parameters:
+        enabled (bool): False stops counting and drops the counts
+        """
+        if enabled:
+            self.reads = [0] * self.size
+            self.writes = [0] * self.size
+            self.executes = [0] * self.size
+        else:
+            self.reads = self.writes = self.executes = None
+
+    def _mark_all(self, previous):
+        """Record every address as changed after a bulk update."""
+        for changes in self.watchers:
+            for address, word in enumerate(previous):
+                changes.setdefault(address, word)
 
     def validate_address(self, address):
         """Validate if the memory address is within bounds.
@@ -58,6 +104,24 @@ class Memory:
         str: Word at specified address
         """
         self.validate_address(address)
+        if self.reads is not None:
+            self.reads[address] += 1
+        return self.memory[address]
+
+    def fetch(self, address):
+        """Read the instruction word at address for execution.
+
+        Same as read(), but counted as an execution instead of a read.
+
+        Parameters:
+        address (int): Memory address of the instruction
+
+        Returns:
+        str: Word at specified address
+        """
+        self.validate_address(address)
+        if self.executes is not None:
+            self.executes[address] += 1
         return self.memory[address]
 
     def write(self, address: int, word: int | str):
@@ -72,11 +136,40 @@ class Memory:
 
         self.validate_address(address)
         self.validate_word(word)
+        for changes in self.watchers:
+            changes.setdefault(address, self.memory[address])
+        if self.writes is not None:
+            self.writes[address] += 1
         self.memory[address] = word
 
+    def load_words(self, words):
+        """Replace memory contents with a program in one bulk copy.
+
+        Words past the end of the program are reset to +000000. The words are
+        trusted to be valid already (see image.ProgramImage), so no per-word
+        validation is done.
+
+        Parameters:
+        words (sequence): Validated words to place starting at address 0
+
+        Raises:
+        IndexError: If the program is larger than memory
+        """
+        if len(words) > self.size:
+            raise IndexError(f"IndexError: Cannot write to memory larger than size of {self.size}")
+
+        previous = self.memory
+        if len(words) == self.size:
+            self.memory = list(words)
+        else:
+            self.memory = list(words) + ["+000000"] * (self.size - len(words))
+        self._mark_all(previous)
+
     def clear(self):
         """Reset all memory locations to +000000."""
+        previous = self.memory
         self.memory = ["+000000"] * self.size
+        self._mark_all(previous)
 
     def __str__(self):
         """Return a string representation of the memory contents.
@@ -0,0 +1,171 @@
+"""Per-address memory access profiling.
+
+ProfiledMemory is a Memory that records, for every address, how often it was
+read, written and executed, which instructions did it, and the first and last
+step it was touched. It builds on Memory.count_accesses(), so the fast engine
+runs profiled programs with the reference engine and the GUI heatmap works on
+it. Plain Memory objects are not affected and pay nothing.
+"""
+
+import csv
+import json
+
+from src.memory import Memory
+
+# Columns of to_rows(), in CSV order
+FIELDS = ("address", "word", "reads", "writes", "executes", "first_step", "last_step",
+          "readers", "writers", "self_modified")
+
+# Counts shown by summary()
+SUMMARY_KINDS = ("accesses", "reads", "writes", "executes")
+
+
+class ProfiledMemory(Memory):
+    """Memory recording who accessed each address and when.
+
+    A step is one instruction fetch. Reads and writes are attributed to the
+    address of the last fetched instruction (current), None before the first
+    fetch (e.g. loading or editing).
+    """
+
+    def __init__(self, size=250):
+        """Initialize an empty, profiled memory.
+
+        Parameters:
+        size (int): Number of words
+        """
+        super().__init__(size)
+        self.reset()
+
+    def reset(self):
+        """Drop everything recorded so far."""
+        self.count_accesses()
+        self.step = 0
+        self.current = None  # Address of the instruction being executed
+        self.first_step = [None] * self.size
+        self.last_step = [None] * self.size
+        self.readers = [{} for _ in range(self.size)]  # {instruction address: reads}
+        self.writers = [{} for _ in range(self.size)]
+
+    def touch(self, address):
+        """Record that address was accessed at the current step."""
+        if self.first_step[address] is None:
+            self.first_step[address] = self.step
+        self.last_step[address] = self.step
+
+    def fetch(self, address):
+        """Fetch an instruction like Memory.fetch, starting a new step attributed to address."""
+        word = super().fetch(address)
+        self.step += 1
+        self.current = address
+        self.touch(address)
+        return word
+
+    def read(self, address):
+        """Read a word like Memory.read, attributing the read to the current instruction."""
+        word = super().read(address)
+        readers = self.readers[address]
+        readers[self.current] = readers.get(self.current, 0) + 1
+        self.touch(address)
+        return word
+
+    def write(self, address: int, word: int | str):
+        """Write a word like Memory.write, attributing the write to the current instruction."""
+        super().write(address, word)
+        writers = self.writers[address]
+        writers[self.current] = writers.get(self.current, 0) + 1
+        self.touch(address)
+
+    @classmethod
+    def attach(cls, boot):
+        """Replace the memory of a Bootstrapper with a profiled copy of it.
+
+        Parameters:
+        boot (Bootstrapper): Machine to profile, its CPU is pointed at the new memory
+
+        Returns:
+        ProfiledMemory: The memory now used by boot
+        """
+        memory = cls(boot.memory.size)
+        memory.memory = list(boot.memory.memory)
+        boot.memory = memory
+        boot.cpu.memory = memory
+        return memory
+
+    def to_rows(self):
+        """Return one dict per accessed address, with the FIELDS keys.
+
+        readers and writers map instruction addresses to counts, self_modified
+        is True for executed addresses that were also written by the program.
+        """
+        rows = []
+        for address in range(self.size):
+            if self.first_step[address] is None:
+                continue
+            rows.append({
+                "address": address,
+                "word": self.memory[address],
+                "reads": self.reads[address],
+                "writes": self.writes[address],
+                "executes": self.executes[address],
+                "first_step": self.first_step[address],
+                "last_step": self.last_step[address],
+                "readers": dict(self.readers[address]),
+                "writers": dict(self.writers[address]),
+                "self_modified": bool(self.executes[address])
+                and any(writer is not None for writer in self.writers[address]),
+            })
+        return rows
+
+    def export_json(self, file_name: str):
+        """Write the profile as JSON: {"steps": int, "addresses": to_rows()}."""
+        rows = self.to_rows()
+        for row in rows:  # JSON keys are strings, "none" for accesses before the first fetch
+            row["readers"] = {str(key).lower(): count for key, count in row["readers"].items()}
+            row["writers"] = {str(key).lower(): count for key, count in row["writers"].items()}
+        with open(file_name, "w") as file:
+            json.dump({"steps": self.step, "addresses": rows}, file, indent=2)
+
+    def export_csv(self, file_name: str):
+        """Write the profile as CSV, readers and writers as "address:count" lists separated by spaces."""
+        def pairs(counts):
+            return " ".join(f"{'-' if key is None else key}:{count}" for key, count in sorted(
+                counts.items(), key=lambda item: -1 if item[0] is None else item[0]))
+
+        with open(file_name, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            for row in self.to_rows():
+                row["readers"] = pairs(row["readers"])
+                row["writers"] = pairs(row["writers"])
+                writer.writerow(row)
+
+    def export(self, file_name: str):
+        """Write the profile as CSV if file_name ends in .csv, otherwise as JSON."""
+        if file_name.lower().endswith(".csv"):
+            self.export_csv(file_name)
+        else:
+            self.export_json(file_name)
+
+    def summary(self, kind="accesses"):
+        """Render access counts in the layout of str(Memory), with a total per row.
+
+        Parameters:
+        kind (str): One of SUMMARY_KINDS, "accesses" adds reads, writes and executes
+
+        Raises:
+        ValueError: If kind is unknown
+        """
+        if kind not in SUMMARY_KINDS:
+            raise ValueError(f"Unknown summary '{kind}', expected one of {', '.join(SUMMARY_KINDS)}")
+        if kind == "accesses":
+            counts = [r + w + e for r, w, e in zip(self.reads, self.writes, self.executes)]
+        else:
+            counts = getattr(self, kind)
+
+        output = ["     ", " ".join(f"{i:02d}   " for i in range(10)), f"   {kind}\n"]
+        for i in range(0, self.size, 10):
+            row = f"\xa0{i:02d} " if i < 100 else f"{i:03d} "
+            row += " ".join(f"{count:7d}" if count else "      ." for count in counts[i : i + 10])
+            output.append(f"{row} | {sum(counts[i : i + 10])}\n")
+        return "".join(output).rstrip()
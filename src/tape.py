@@ -0,0 +1,58 @@
+"""Headless front end for running BasicML programs without a display.
+
+TapeIO implements the front end protocol used by CPU.run: READ takes the next
+word from an input tape and WRITE appends to an output list, so programs can
+run in scripts, tests and benchmarks without Tk.
+"""
+
+from src.memory import Memory
+
+
+class TapeIO:
+    """Input tape and output collector for a headless run."""
+
+    def __init__(self, inputs=()):
+        """Prepare a tape.
+
+        Parameters:
+        inputs (iterable): Words (int or str) returned by successive READs
+        """
+        self.inputs = [int(value) for value in inputs]
+        self.position = 0
+        self.outputs = []
+
+    @staticmethod
+    def parse(text: str):
+        """Parse a comma separated list of words, e.g. "5,-7,+000010".
+
+        Raises:
+        ValueError: If an entry is not a number in word range
+        """
+        inputs = []
+        for entry in text.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            try:
+                value = int(entry)
+            except ValueError:
+                raise ValueError(f"Invalid input word '{entry}'")
+            Memory.int_to_word(value)  # Raises if out of range
+            inputs.append(value)
+        return inputs
+
+    def read_word(self):
+        """Return the next input word.
+
+        Raises:
+        ValueError: If the tape is exhausted, which ends the run with an error
+        """
+        if self.position >= len(self.inputs):
+            raise ValueError(f"READ with no input left (used all {len(self.inputs)} input words)")
+        value = self.inputs[self.position]
+        self.position += 1
+        return value
+
+    def write_word(self, word):
+        """Collect a word written by the program."""
+        self.outputs.append(word)
@@ -0,0 +1,107 @@
+"""Chrome trace-event export of simulator runs.
+
+A Tracer collects complete ("X") events in the Chrome trace-event format,
+which chrome://tracing and https://ui.perfetto.dev load directly:
+
+    load     load         reading a program into memory
+    run      cpu          one CPU.run call
+    block    cpu          a basic block, from a jump target to the next branch or halt (sampled)
+    READ     io           waiting on the front end for input
+    refresh  gui          redrawing the memory view
+
+Tracing is off unless a Tracer is set as CPU.tracer. Traced runs use the
+reference engine, which records blocks at branches and halts only. Untraced
+runs pay one None check per instruction there and nothing in the fast engine.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+
+class Tracer:
+    """Collects trace events of one process, from any thread."""
+
+    def __init__(self, block_sample=1):
+        """Start an empty trace, timestamps count from now.
+
+        Parameters:
+        block_sample (int): Record one in this many basic blocks
+
+        Raises:
+        ValueError: If block_sample is less than 1
+        """
+        if block_sample < 1:
+            raise ValueError("Block sample must be at least 1")
+        self.block_sample = block_sample
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.events = []
+        self.threads = {}  # Native thread id: name, for the viewer's thread labels
+        # Basic block in progress per thread: tid -> (start address, start time)
+        self.blocks = {}
+        self.block_counts = {}  # Blocks ended per thread, for sampling
+
+    def now(self):
+        """Microseconds since the trace started."""
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def complete(self, name, category, start, end=None, **args):
+        """Record a span that started at start (see now()) and ends at end, or now."""
+        tid = threading.get_native_id()
+        if tid not in self.threads:
+            self.threads[tid] = threading.current_thread().name
+        end = self.now() if end is None else end
+        self.events.append({"name": name, "cat": category, "ph": "X", "ts": start, "dur": end - start,
+                            "pid": self.pid, "tid": tid, "args": args})
+
+    @contextlib.contextmanager
+    def span(self, name, category, **args):
+        """Record the time spent in a with block."""
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.complete(name, category, start, **args)
+
+    def start_block(self, address):
+        """Start a basic block at address on the calling thread."""
+        self.blocks[threading.get_native_id()] = (address, self.now())
+
+    def end_block(self, last):
+        """End the basic block in progress on the calling thread, recording one in block_sample.
+
+        Parameters:
+        last (int): Address of the instruction ending the block
+        """
+        tid = threading.get_native_id()
+        if tid not in self.blocks:
+            return
+        address, start = self.blocks.pop(tid)
+        count = self.block_counts.get(tid, 0) + 1
+        self.block_counts[tid] = count
+        if count % self.block_sample == 0:
+            self.complete(f"block {address:03d}-{last:03d}", "cpu", start, first=address, last=last)
+
+    def to_json(self):
+        """Return the trace as a Chrome trace-event JSON object."""
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": "UVSim"}}]
+        metadata.extend(
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self.threads.items()
+        )
+        return {"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}
+
+    def save(self, file_name: str):
+        """Write the trace to file_name as JSON, see to_json()."""
+        with open(file_name, "w") as file:
+            json.dump(self.to_json(), file)
+
+
+def span(tracer, name, category, **args):
+    """Tracer.span() for an optional tracer, a no-op context if tracer is None."""
+    if tracer is None:
+        return contextlib.nullcontext()
+    return tracer.span(name, category, **args)
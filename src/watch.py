@@ -0,0 +1,198 @@
+"""Watch a program file and rerun it headless whenever it changes.
+
+Used by the uvsim watch command. A change is detected from the file's mtime
+and size first and confirmed with a content hash, so touching a file or
+polling an unchanged one never re-parses it. Only the lines that differ from
+the previous version are parsed again.
+"""
+
+import hashlib
+import os
+
+from src.assembler import Assembler, is_assembly
+from src.image import MAGIC, ProgramImage
+from src.legacy import convert_word
+from src.tape import TapeIO
+
+
+def parse_word(line: str):
+    """Parse one line of a text program.
+
+    Returns:
+    str: 6-digit word, None for a blank line, or a ValueError for an invalid word
+    """
+    words = line.split()
+    if not words:
+        return None
+    try:
+        return convert_word(words[0])[0]
+    except ValueError:
+        return ValueError(f"ValueError: Invalid Instruction given : {words[0]}")
+
+
+class ProgramWatcher:
+    """Reloads a program into a Bootstrapper when its file changes and reruns it."""
+
+    def __init__(self, boot, file_name, inputs=(), engine="reference", max_steps=None):
+        """Prepare a watcher, nothing is read until poll().
+
+        Parameters:
+        boot (Bootstrapper): Machine the program is loaded into and run on
+        file_name (str): Text program, assembly source or binary image
+        inputs (list): Words fed to READ on every run
+        engine (str): Engine used for the runs, see Bootstrapper.run
+        max_steps (int): Instruction limit per run, see CPU.run
+        """
+        self.boot = boot
+        self.file_name = file_name
+        self.inputs = list(inputs)
+        self.engine = engine
+        self.max_steps = max_steps
+
+        self.stamp = None  # (mtime, size) of the last file read
+        self.digest = None  # Hash of the last content loaded
+        self.lines = []
+        self.parsed = []  # parse_word() result per line of a text program
+        self.assembler = Assembler(boot.memory.size)
+        self.parse_count = 0  # Lines parsed so far, for tests and diagnostics
+        self.state = None  # Final state of the previous run
+
+    def changed(self):
+        """Return the file contents if they changed since the last call, otherwise None."""
+        stat = os.stat(self.file_name)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self.stamp:
+            return None
+        self.stamp = stamp
+
+        with open(self.file_name, "rb") as file:
+            data = file.read()
+        digest = hashlib.blake2b(data).digest()
+        if digest == self.digest:  # Touched or rewritten with the same content
+            return None
+        self.digest = digest
+        return data
+
+    def update_lines(self, lines):
+        """Replace the text program, parsing only the lines between the unchanged start and end."""
+        old = self.lines
+        start = 0
+        limit = min(len(old), len(lines))
+        while start < limit and old[start] == lines[start]:
+            start += 1
+        end = 0
+        while end < limit - start and old[-1 - end] == lines[-1 - end]:
+            end += 1
+
+        middle = [parse_word(line) for line in lines[start:len(lines) - end]]
+        self.parse_count += len(middle)
+        self.parsed = self.parsed[:start] + middle + (self.parsed[len(old) - end:] if end else [])
+        self.lines = lines
+
+    def build_image(self, data):
+        """Build the program image from new file contents.
+
+        Raises:
+        ValueError: If a word is invalid or the image is corrupt
+        IndexError: If program is too large for memory
+        """
+        size = self.boot.memory.size
+        if data.startswith(MAGIC):
+            return self.boot.build_image(self.file_name)
+
+        text = data.decode()
+        lines = text.split("\n")
+        if is_assembly(text):
+            before = self.assembler.parse_count
+            self.assembler.update(lines)
+            self.parse_count += self.assembler.parse_count - before
+            words = self.assembler.assemble()
+        else:
+            self.update_lines(lines)
+            words = []
+            for word in self.parsed:
+                if isinstance(word, ValueError):
+                    raise word
+                if word is not None:
+                    words.append(word)
+
+        if len(words) > size:
+            raise IndexError(f"IndexError: Cannot write to memory larger than size of {size}")
+        return ProgramImage(words, size, self.file_name)
+
+    def run(self):
+        """Run the loaded program from the start, returning its final state."""
+        boot = self.boot
+        boot.restore(boot.image)
+        tape = TapeIO(self.inputs)
+        try:
+            result = boot.run(tape, max_steps=self.max_steps, engine=self.engine)
+        except (IndexError, ZeroDivisionError) as e:
+            result = f"Error: {e}"
+        return {
+            "result": result,
+            "outputs": tape.outputs,
+            "accumulator": f"{int(boot.cpu.accumulator):+07d}",
+            "pointer": boot.cpu.pointer,
+            "steps": boot.cpu.steps,
+            "memory": list(boot.memory.memory),
+        }
+
+    def poll(self):
+        """Reload and rerun the program if its file changed.
+
+        Returns:
+        dict: None if nothing changed, otherwise {"error": message} when the program
+              could not be loaded, or {"state": final state, "diff": changes against
+              the previous run (None for the first run)}
+        """
+        try:
+            data = self.changed()
+        except OSError as e:
+            return {"error": str(e)}
+        if data is None:
+            return None
+
+        try:
+            self.boot.restore(self.build_image(data))
+        except (UnicodeDecodeError, ValueError, IndexError) as e:
+            return {"error": str(e)}
+
+        state = self.run()
+        diff = None if self.state is None else diff_states(self.state, state)
+        self.state = state
+        return {"state": state, "diff": diff}
+
+
+def diff_states(previous, current):
+    """Return the differences between the final states of two runs.
+
+    Returns:
+    list: {"field", "previous", "current"} per changed field, memory as one entry per address ("memory[7]")
+    """
+    diff = []
+    for field in ("result", "outputs", "accumulator", "pointer", "steps"):
+        if previous[field] != current[field]:
+            diff.append({"field": field, "previous": previous[field], "current": current[field]})
+    for address, (before, after) in enumerate(zip(previous["memory"], current["memory"])):
+        if before != after:
+            diff.append({"field": f"memory[{address}]", "previous": before, "current": after})
+    return diff
+
+
+def format_report(report):
+    """Render a poll() report as text."""
+    if "error" in report:
+        return f"Error: {report['error']}"
+
+    state = report["state"]
+    lines = list(state["outputs"])
+    lines.append(state["result"] or "Halted")
+    lines.append(f"Accumulator: {state['accumulator']}  Pointer: {state['pointer']:03d}  Instructions: {state['steps']}")
+    if report["diff"] is not None:
+        if report["diff"]:
+            lines.append("Changes since the previous run:")
+            lines.extend(f"  {change['field']}: {change['previous']} -> {change['current']}" for change in report["diff"])
+        else:
+            lines.append("Final state unchanged since the previous run")
+    return "\n".join(lines)
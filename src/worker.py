@@ -0,0 +1,119 @@
+"""Run the CPU on a background thread.
+
+CPUWorker is the front end handed to CPU.run on the worker thread. It never
+touches Tk: redraw requests, output and input requests are posted to a queue
+that the GUI drains on its own thread (see App.poll_worker), and input is
+handed back through provide_input(). stop() preempts a running program,
+including one blocked on READ.
+"""
+
+import queue
+import threading
+
+from src.cpu import Halt
+
+
+class CPUWorker:
+    """Background runner for a Bootstrapper's CPU."""
+
+    # Event kinds posted to self.events as (kind, payload)
+    STATE = "state"  # payload: (pointer, accumulator) snapshot, redraw memory
+    WRITE = "write"  # payload: word written by the program
+    READ = "read"  # payload: None, the program waits for provide_input()
+    DONE = "done"  # payload: error message or None
+
+    def __init__(self, boot, refresh_rate=None):
+        """Prepare a worker for boot.
+
+        Parameters:
+            boot - Bootstrapper whose CPU is run
+            refresh_rate - see CPU.run. None animates every step: the worker
+                           waits for the front end to draw each state (acknowledge())
+        """
+        self.boot = boot
+        self.refresh_rate = refresh_rate
+        self.events = queue.Queue()
+        self._inputs = queue.Queue()
+        self._drawn = threading.Event()
+        self._refresh_pending = False
+        self._stopping = False
+        self._thread = None
+
+    @property
+    def running(self):
+        """True while the program is executing on the worker thread."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, cont=False):
+        """Start running the program on a daemon thread."""
+        # Cleared here rather than in the engine, so a stop() right after start() is not lost
+        self.boot.cpu.stop_requested = False
+        self._thread = threading.Thread(target=self._run, args=(cont,), daemon=True)
+        self._thread.start()
+
+    def _run(self, cont):
+        try:
+            result = self.boot.run(self, cont, self.refresh_rate)
+        except Exception as e:  # e.g. ZeroDivisionError, reported like the CPU's own error results
+            result = f"Error: {e}"
+        if self._stopping:
+            result = None
+        self.events.put((CPUWorker.DONE, result))
+
+    def stop(self):
+        """Preempt the running program. Safe to call from the GUI thread."""
+        self._stopping = True
+        self.boot.cpu.stop()
+        # Unblock a pending READ or an animation step waiting to be drawn
+        self._inputs.put(None)
+        self._drawn.set()
+
+    def join(self, timeout=None):
+        """Wait for the worker thread to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def drain(self):
+        """Return every event posted since the last call, without blocking."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    # Front end protocol used by the CPU, called on the worker thread
+
+    def refresh_display(self):
+        """Post a state snapshot, coalescing redraws the GUI has not handled yet."""
+        if self.refresh_rate is None:
+            # Animate: wait until the front end drew this exact state
+            self._drawn.clear()
+            if self._stopping:
+                return
+            self.events.put((CPUWorker.STATE, (self.boot.cpu.pointer, self.boot.cpu.accumulator)))
+            self._drawn.wait()
+        elif not self._refresh_pending:
+            self._refresh_pending = True
+            self.events.put((CPUWorker.STATE, (self.boot.cpu.pointer, self.boot.cpu.accumulator)))
+
+    def acknowledge(self):
+        """Called by the front end once it drew a STATE event."""
+        self._refresh_pending = False
+        self._drawn.set()
+
+    def write_word(self, word):
+        """Post a word written by the program."""
+        self.events.put((CPUWorker.WRITE, word))
+
+    def read_word(self):
+        """Ask the front end for input and block until provide_input() or stop()."""
+        self.events.put((CPUWorker.READ, None))
+        value = self._inputs.get()
+        if value is None:
+            raise Halt
+        return value
+
+    def provide_input(self, value):
+        """Hand an entered word (int) to a program blocked on READ."""
+        self._inputs.put(value)
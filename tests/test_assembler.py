@@ -0,0 +1,173 @@
+import pytest
+from src.assembler import Assembler, AssemblyError, assemble_file, is_assembly, parse_line
+from src.boot import Bootstrapper
+
+COUNTDOWN = """\
+; count down from 3 to 0, storing the result in x
+        LOAD x
+loop:   BRANCHZERO done
+        SUBTRACT one
+        STORE x
+        BRANCH loop
+done:   WRITE x
+        HALT
+x:      DATA 3
+one:    DATA +1
+"""
+
+
+def assembled(source):
+    assembler = Assembler()
+    assembler.update(source.splitlines())
+    return assembler, assembler.assemble()
+
+
+def test_parse_line():
+    assert parse_line("loop: ADD one ; comment") == ("loop", "ADD", "one")
+    assert parse_line("  halt") == (None, "HALT", "0")
+    assert parse_line("end:") == ("end", None, None)
+    assert parse_line("+020007") == (None, "DATA", "+020007")
+    assert parse_line("# only a comment") == (None, None, None)
+
+
+@pytest.mark.parametrize("line", ["FOO 1", "LOAD", "LOAD x y", "1abc: HALT", "LOAD $x", "+12"])
+def test_parse_line_errors(line):
+    with pytest.raises(ValueError):
+        parse_line(line)
+
+
+def test_assemble_program():
+    assembler, words = assembled(COUNTDOWN)
+    assert words == [
+        "+020007",
+        "+042005",
+        "+031008",
+        "+021007",
+        "+040001",
+        "+011007",
+        "+043000",
+        "+000003",
+        "+000001",
+    ]
+    assert assembler.symbols == {"loop": 1, "done": 5, "x": 7, "one": 8}
+    assert assembler.source_line(0) == 2
+    assert assembler.source_line(7) == 9
+
+
+def test_assembled_program_runs():
+    _, words = assembled(COUNTDOWN)
+    boot = Bootstrapper()
+    boot.load_program(words)
+    boot.run(gui=None)
+    assert boot.memory.read(7) == "+000000"
+
+
+def test_undefined_label():
+    with pytest.raises(AssemblyError) as e:
+        assembled("LOAD nowhere\nHALT")
+    assert e.value.line == 1
+
+
+def test_duplicate_label():
+    with pytest.raises(AssemblyError) as e:
+        assembled("a: HALT\na: HALT")
+    assert e.value.line == 2
+
+
+def test_program_too_large():
+    assembler = Assembler(memory_size=3)
+    assembler.update(["HALT"] * 4)
+    with pytest.raises(AssemblyError):
+        assembler.assemble()
+
+
+def test_incremental_update_line():
+    assembler, _ = assembled(COUNTDOWN)
+    parsed = assembler.parse_count
+
+    assembler.update_line(8, "x:      DATA 5")
+    assert assembler.parse_count == parsed + 1
+    assert assembler.assemble()[7] == "+000005"
+
+
+def test_incremental_insert_only_parses_new_line():
+    lines = COUNTDOWN.splitlines()
+    assembler, _ = assembled(COUNTDOWN)
+    parsed = assembler.parse_count
+
+    lines.insert(2, "        ADD one")
+    assembler.update(lines)
+    assert assembler.parse_count == parsed + 1
+
+    fresh, words = assembled("\n".join(lines))
+    assert assembler.assemble() == words
+    assert assembler.symbols == fresh.symbols
+
+
+def test_edit_reencodes_only_changed_lines():
+    # 900 statements: a loop over labelled data, edited one line at a time like the editor does
+    lines = ["start: LOAD v0"]
+    lines += [f"       ADD v{i}" for i in range(1, 450)]
+    lines += ["       HALT"]
+    lines += [f"v{i}: DATA {i}" for i in range(450)]
+    assembler = Assembler(memory_size=1000)
+    assembler.update(lines)
+    assembler.assemble()
+
+    encoded = assembler.encode_count
+    lines[1] = "       SUBTRACT v2"
+    assembler.update(lines)
+    words = assembler.assemble()
+    assert assembler.encode_count == encoded + 1
+    assert words[1] == "+031453"  # v0 follows the 451 instructions
+
+    # A new label moves nothing but changes the symbols, so everything is encoded again
+    encoded = assembler.encode_count
+    lines[2] = "again: ADD v2"
+    assembler.update(lines)
+    fresh = Assembler(memory_size=1000)
+    fresh.update(lines)
+    assert assembler.assemble() == fresh.assemble()
+    assert assembler.encode_count == encoded + len(words)
+    assert assembler.symbols["again"] == 2
+
+
+def test_cached_layout_reports_errors():
+    assembler, words = assembled(COUNTDOWN)
+    assembler.update_line(3, "        SUBTRACT two")
+    with pytest.raises(AssemblyError) as e:
+        assembler.assemble()
+    assert e.value.line == 4
+
+    assembler.update_line(3, "        SUBTRACT one")
+    assert assembler.assemble() == words
+    assert assembler.errors == []
+
+
+def test_shifted_error_line_numbers():
+    assembler = Assembler()
+    assembler.update(["HALT", "BAD"])
+    assembler.update(["HALT", "HALT", "BAD"])
+    with pytest.raises(AssemblyError) as e:
+        assembler.assemble()
+    assert e.value.line == 3
+
+
+def test_assemble_file(tmp_path):
+    source = tmp_path / "countdown.asm"
+    source.write_text(COUNTDOWN)
+    program, listing = assemble_file(str(source))
+
+    assert program == str(tmp_path / "countdown_assembled.txt")
+    with open(program) as file:
+        assert file.read().split("\n")[0] == "+020007"
+    with open(listing) as file:
+        text = file.read()
+    assert "001   +042005     3  loop:   BRANCHZERO done" in text
+    assert "done             005" in text
+
+
+def test_is_assembly():
+    assert is_assembly(COUNTDOWN)
+    assert not is_assembly("+020007\n+043000")
+    assert not is_assembly("")
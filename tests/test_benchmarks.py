@@ -0,0 +1,35 @@
+from benchmarks.suite import compare, load_baseline, run_benchmarks, save_baseline
+
+
+def test_compare_flags_regressions():
+    baseline = {"a": {"rate": 100.0, "unit": "ops/s"}, "b": {"rate": 100.0, "unit": "ops/s"}}
+    results = {"a": {"rate": 85.0, "unit": "ops/s"}, "b": {"rate": 70.0, "unit": "ops/s"}, "new": {"rate": 1.0, "unit": "ops/s"}}
+
+    comparison = {entry["name"]: entry for entry in compare(results, baseline, threshold=0.2)}
+    assert set(comparison) == {"a", "b"}
+    assert not comparison["a"]["regressed"]
+    assert comparison["b"]["regressed"]
+    assert round(comparison["b"]["change"], 2) == -0.3
+
+
+def test_quick_run_and_baseline(tmp_path):
+    results = run_benchmarks(scale=0.01, only=["cpu_run_fast", "memory_write", "convert_file"])
+    assert set(results) == {"cpu_run_fast", "memory_write", "convert_file"}
+    assert results["cpu_run_fast"]["unit"] == "instructions/s"
+    assert all(result["rate"] > 0 for result in results.values())
+
+    path = str(tmp_path / "baseline.json")
+    assert load_baseline(path) is None
+    save_baseline(results, path)
+    assert load_baseline(path) == results
+
+
+def test_missing_baseline_fails(tmp_path, capsys):
+    from benchmarks.__main__ import main
+
+    path = str(tmp_path / "baseline.json")
+    args = ["--scale", "0.01", "--only", "memory_write", "--baseline", path, "--threshold", "0.99"]
+    assert main(args) == 1
+    assert "no baseline" in capsys.readouterr().err
+    assert main(args + ["--save"]) == 0
+    assert main(args) == 0
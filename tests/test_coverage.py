@@ -0,0 +1,106 @@
+import pytest
+from src.boot import Bootstrapper
+from src.batch import run_batch
+from src.coverage import CoverageMemory, ProgramCoverage, format_coverage, from_bitmap, to_bitmap
+
+ABS = """; prints the absolute value of the input
+        READ x
+        LOAD x
+        BRANCHNEG neg
+        WRITE x
+        HALT
+neg:    LOAD zero
+        SUBTRACT x
+        STORE x
+        WRITE x
+        HALT
+x:      DATA 0
+zero:   DATA 0
+"""
+
+# The same program as numbered words, with a blank line after the branch
+ABS_WORDS = "+010010\n+020010\n+041005\n\n+011010\n+043000\n+020011\n+031010\n+021010\n+011010\n+043000\n+000000\n+000000\n"
+
+
+def test_bitmaps():
+    assert to_bitmap([0, 3, 200]) == (1 << 200) | 0b1001
+    assert from_bitmap(to_bitmap([0, 3, 200])) == [0, 3, 200]
+    assert from_bitmap(0) == []
+
+
+def test_coverage_memory_branch_directions():
+    boot = Bootstrapper()
+    # 0: BRANCHZERO 1 (goes both ways), 1: BRANCHNEG 3, 2: HALT, 3: HALT
+    boot.load_program(["+042001", "+041003", "+043000", "+043000"])
+    memory = CoverageMemory.attach(boot)
+    assert boot.run(None, engine="fast") is None
+    bitmaps = memory.bitmaps()
+    assert from_bitmap(bitmaps["executed"]) == [0, 1, 2]
+    assert from_bitmap(bitmaps["taken"]) == [0]
+    assert from_bitmap(bitmaps["not_taken"]) == [0, 1]
+
+
+def test_coverage_memory_reused_between_runs():
+    boot = Bootstrapper()
+    # 0: BRANCHNEG 2 (never taken), 1: HALT, 2: HALT
+    boot.load_program(["+041002", "+043000", "+043000"])
+    memory = CoverageMemory.attach(boot)
+
+    # The first run stops at the limit right after the branch
+    assert boot.run(None, max_steps=1) is not None
+    boot.restore(boot.image)
+    assert boot.run(None) is None
+    bitmaps = memory.bitmaps()
+    assert from_bitmap(bitmaps["taken"]) == []
+    assert from_bitmap(bitmaps["not_taken"]) == [0]
+
+    memory.count_accesses()
+    assert memory.bitmaps() == {"executed": 0, "taken": 0, "not_taken": 0}
+    assert memory.branch is None
+
+
+def test_line_mapping(tmp_path):
+    words = tmp_path / "abs.txt"
+    words.write_text(ABS_WORDS)
+    program = ProgramCoverage.from_file(str(words))
+    assert program.lines[:5] == [1, 2, 3, 5, 6]
+    assert from_bitmap(program.instructions) == list(range(10))
+    assert from_bitmap(program.branches) == [2]
+
+    source = tmp_path / "abs.asm"
+    source.write_text(ABS)
+    program = ProgramCoverage.from_file(str(source))
+    assert program.lines[5] == 7 and program.sources[5] == "neg:    LOAD zero"
+    assert from_bitmap(program.instructions) == list(range(10))  # DATA lines are not instructions
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_merges_coverage(tmp_path, workers):
+    source = tmp_path / "abs.asm"
+    source.write_text(ABS)
+    words = tmp_path / "abs.txt"
+    words.write_text(ABS_WORDS)
+
+    report = run_batch([str(source), str(words)], [[5]], workers=workers, coverage=True)
+    assert [run["outputs"] for run in report["runs"]] == [["+000005"], ["+000005"]]
+    coverage = report["coverage"][0]
+    assert (coverage["covered"], coverage["instructions"], coverage["runs"]) == (5, 10, 1)
+    assert [entry["line"] for entry in coverage["uncovered"]] == [7, 8, 9, 10, 11]
+    assert coverage["partial_branches"][0]["missing"] == "taken"
+    assert "line    4  002  BRANCHNEG 5" in format_coverage(coverage)
+    assert report["coverage"][1]["uncovered"][0]["line"] == 7  # Line 4 is blank
+
+    report = run_batch([str(source)], [[5], [-3]], workers=workers, coverage=True)
+    coverage = report["coverage"][0]
+    assert coverage["percent"] == 100.0 and coverage["runs"] == 2
+    assert coverage["uncovered"] == [] and coverage["partial_branches"] == []
+
+
+def test_batch_command(tmp_path, capsys):
+    from src.main import main
+    source = tmp_path / "abs.asm"
+    source.write_text(ABS)
+    assert main(["batch", str(source), "--input", "5", "--input", "-3", "--coverage", "--workers", "1"]) == 0
+    output = capsys.readouterr().out
+    assert "[-3]: Halted  outputs +000003" in output
+    assert "10/10 instructions covered (100.0%) in 2 runs" in output
@@ -1,5 +1,7 @@
+import os
 import pytest  # type: ignore
 import unittest
+from unittest import mock
 
 if __name__ != "__main__":
     from src.cpu import CPU, Halt
@@ -144,3 +146,79 @@ class TestCPU(unittest.TestCase):
                 boot.cpu.read_from_memory(i)
                 assert Memory.word_to_int(word.strip()) == boot.cpu.register
 
+
+    def test_refresh_rate(self):
+        class Display:
+            refreshes = 0
+
+            def refresh_display(self):
+                self.refreshes += 1
+
+        countdown = ["+020006", "+031007", "+021006", "+042005", "+040000", "+043000", "+000050", "+000001"]
+
+        animate = Display()
+        boot = Bootstrapper()
+        boot.load_program(countdown)
+        boot.run(animate)
+
+        turbo = Display()
+        boot = Bootstrapper()
+        boot.load_program(countdown)
+        boot.run(turbo, refresh_rate=0.001)
+
+        assert animate.refreshes == 250  # One redraw per executed instruction
+        assert turbo.refreshes == 1
+        assert boot.memory.read(6) == "+000000"
+
+    def test_describe_and_disassemble(self):
+        assert CPU.disassemble(10007) == "READ 7"
+        assert CPU.disassemble(43000) == "HALT"
+        assert CPU.disassemble(-5) == "DATA -5"
+        assert CPU.disassemble(99) == "DATA 99"
+
+        assert CPU.describe(20003).startswith("+020003: LOAD (20)")
+        assert CPU.describe(12) is None
+
+        CPU.describe.cache_clear()
+        for _ in range(3):
+            CPU.describe(30008)
+        assert CPU.describe.cache_info().hits == 2
+
+    def test_performance_counters(self):
+        countdown = ["+020006", "+031007", "+021006", "+042005", "+040000", "+043000", "+000050", "+000001"]
+        boot = Bootstrapper()
+        boot.load_program(countdown)
+        boot.memory.count_accesses()
+        boot.run(gui=None)
+
+        assert boot.cpu.steps == 250
+        # 50 iterations of LOAD, SUBTRACT, STORE (2 cycles each), BRANCHZERO and BRANCH (1 each), minus the last BRANCH, plus HALT
+        assert boot.cpu.cycles == 50 * 8 - 1 + 1
+        assert boot.cpu.run_time() > 0
+        assert boot.cpu.started is None
+        assert boot.memory.executes[0] == 50
+        assert boot.memory.executes[5] == 1
+        assert boot.memory.writes[6] == 50
+        assert boot.memory.reads[7] == 50
+
+    def test_memory_diff(self):
+        boot = Bootstrapper()
+        boot.load_program(["+020003", "+021004", "+043000", "+000042"])
+        cpu = boot.cpu
+
+        assert [change["address"] for change in cpu.memory_diff()] == [0, 1, 2, 3]
+        assert cpu.memory_diff() == []
+
+        boot.memory.write(120, "+000007")
+        boot.memory.write(5, "+000001")
+        boot.memory.write(5, "+000000")  # Written back, not a change
+        assert cpu.memory_diff() == [{"address": 120, "previous": "+000000", "word": "+000007"}]
+
+        boot.run(gui=None)
+        with mock.patch.dict(os.environ, {"FORCE_COLOR": "1"}):
+            output = cpu.print_memory()
+        lines = output.split("\n")
+        assert len(lines) == 2  # Header and the row holding address 4
+        assert lines[1].startswith("\xa000 ")
+        assert "\x1b[32m+000042" in lines[1]
+        assert cpu.print_memory() == ""
@@ -0,0 +1,78 @@
+import io
+import pytest
+from src.boot import Bootstrapper
+from src.cpu import CPU
+from src.debugger import Debugger
+from src.tape import TapeIO
+
+# READ 7, READ 8, LOAD 7, ADD 8, STORE 9, WRITE 9, HALT
+SUM = ["+010007", "+010008", "+020007", "+030008", "+021009", "+011009", "+043000"]
+
+
+def session(program, commands, inputs=(), stdin=""):
+    boot = Bootstrapper()
+    boot.load_program(program)
+    stdout = io.StringIO()
+    debugger = Debugger(boot, inputs, stdin=io.StringIO(stdin), stdout=stdout)
+    for command in commands:
+        debugger.onecmd(command)
+    return debugger, stdout.getvalue()
+
+
+def test_step_break_and_continue():
+    debugger, output = session(SUM, ["step 2", "break 5", "continue", "print acc", "continue"], inputs=[2, 3])
+    assert "READ +000002 (input 1)" in output
+    assert "Breakpoint 005" in output
+    assert "005: WRITE 9" in output
+    assert "+000005\n" in output
+    assert "WRITE +000005" in output
+    assert "Halted after 2 instructions, accumulator +000005" in output
+    assert debugger.finished
+
+
+def test_watchpoint_stops_after_write():
+    debugger, output = session(SUM, ["watch 9", "continue"], inputs=[4, 5])
+    assert "Watchpoint 009: +000000 -> +000009" in output
+    assert debugger.boot.cpu.pointer == 5
+
+
+def test_read_asks_when_tape_is_empty_and_set_changes_state():
+    debugger, output = session(SUM, ["step 2", "set 8 10", "set pc 2", "continue"], stdin="1\n2\n")
+    assert output.count("READ > ") == 2
+    assert "WRITE +000011" in output
+
+
+def test_invalid_arguments_are_reported():
+    debugger, output = session(SUM, ["break 300", "step x", "set acc 1000000"])
+    assert "Error: Address 300 out of bounds" in output
+    assert "Error: Invalid step count 'x'" in output
+    assert "Error: Number out of range" in output
+    assert debugger.breakpoints == set()
+
+
+@pytest.mark.parametrize("engine", ["run", "run_fast"])
+def test_cpu_breakpoints(engine):
+    boot = Bootstrapper()
+    boot.load_program(["+020004", "+030004", "+021005", "+043000", "+000003"])
+    cpu = boot.cpu
+    assert getattr(cpu, engine)(None, breakpoints={2}) is None
+    assert not cpu.halted and cpu.pointer == 2 and cpu.accumulator == 6
+    # Continuing from a breakpoint executes it
+    assert getattr(cpu, engine)(None, cont=True, max_steps=10, watchpoints={5}) is None
+    assert cpu.pointer == 3 and boot.memory.read(5) == "+000006"
+    assert getattr(cpu, engine)(None, max_steps=1) == CPU.LIMIT_REACHED
+
+
+def test_run_watchpoints_use_the_fetched_instruction():
+    # Counted memories run on run(), where operations overwrite the register
+    boot = Bootstrapper()
+    # READ 5, LOAD 3, HALT, then a data word that looks like STORE 9
+    boot.load_program(["+010005", "+020003", "+043000", "+021009"])
+    boot.memory.count_accesses()
+    cpu = boot.cpu
+    assert cpu.run(TapeIO([7]), watchpoints={5}) is None
+    assert not cpu.halted and cpu.pointer == 1 and boot.memory.read(5) == "+000007"
+
+    # LOAD of +021009 does not write address 9
+    assert cpu.run(TapeIO([7]), watchpoints={9}) is None
+    assert cpu.halted
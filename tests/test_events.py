@@ -0,0 +1,82 @@
+import json
+import logging
+import subprocess
+import sys
+from src.boot import Bootstrapper
+from src.events import configure_logging, remove_logging
+from src.tape import TapeIO
+
+# READ 7, READ 8, LOAD 7, ADD 8, STORE 9, WRITE 9, HALT
+SUM = ["+010007", "+010008", "+020007", "+030008", "+021009", "+011009", "+043000"]
+
+
+def run_logged(tmp_path, level, engine="reference", sample=1, program=SUM, log=False):
+    path = tmp_path / "events.log"
+    boot = Bootstrapper()
+    boot.cpu.log_sample = sample
+    boot.cpu.log = log
+    handler = configure_logging(level, str(path))
+    try:
+        boot.load_program(program)
+        boot.restore(boot.image)
+        boot.run(TapeIO([2, 3]), engine=engine)
+        buffered = path.read_text()
+    finally:
+        remove_logging(handler)
+    return buffered, [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_debug_events(tmp_path):
+    buffered, events = run_logged(tmp_path, logging.DEBUG, engine="fast")
+    assert buffered == ""  # Nothing is formatted or written until the buffer is flushed
+    names = [entry["event"] for entry in events]
+    assert names.count("instruction") == len(SUM)
+    assert names[0] == "load" and names[-1] == "halt"
+    writes = [entry for entry in events if entry["event"] == "write"]
+    assert [(entry["address"], entry["word"]) for entry in writes] == [(7, "+000002"), (8, "+000003"), (9, "+000005")]
+    io = [(entry["operation"], entry["word"]) for entry in events if entry["event"] == "io"]
+    assert io == [("READ", 2), ("READ", 3), ("WRITE", 5)]
+    assert events[-1]["steps"] == len(SUM)
+
+
+def test_info_events_and_sampling(tmp_path):
+    _, events = run_logged(tmp_path, logging.INFO, engine="fast")
+    assert {entry["event"] for entry in events} == {"load", "io", "halt"}
+
+    _, events = run_logged(tmp_path, logging.DEBUG, sample=3)
+    assert [entry["address"] for entry in events if entry["event"] == "instruction"] == [0, 3, 6]
+
+
+def test_memory_events(tmp_path, capsys):
+    _, events = run_logged(tmp_path, logging.INFO, log=True)
+    memory = [entry for entry in events if entry["event"] == "memory"]
+    # The first event holds the whole program and the first READ, then one per instruction that wrote memory
+    assert [change["address"] for change in memory[0]["changes"]] == list(range(len(SUM))) + [7]
+    assert [entry["changes"] for entry in memory[1:]] == [
+        [{"address": 8, "previous": "+000000", "word": "+000003"}],
+        [{"address": 9, "previous": "+000000", "word": "+000005"}],
+    ]
+    assert memory[-1]["pointer"] == 4
+    assert capsys.readouterr().out == ""
+
+
+def test_error_event(tmp_path):
+    _, events = run_logged(tmp_path, logging.INFO, program=["+020001", "+000000"])
+    assert events[-1]["event"] == "error"
+    assert events[-1]["level"] == "ERROR" and events[-1]["pointer"] == 2
+
+
+def test_disabled_logging_keeps_fast_engine():
+    boot = Bootstrapper()
+    boot.load_program(SUM)
+    boot.cpu.run = None  # run_fast must not fall back to run() when no events are enabled
+    assert boot.run(TapeIO([2, 3]), engine="fast") is None
+    assert boot.memory.watchers == []
+
+
+def test_unconfigured_events_are_silent(tmp_path):
+    # In a fresh interpreter: pytest's own log handlers would hide logging's last resort output
+    program = tmp_path / "bad.txt"
+    program.write_text("+020001\n+000000\n")
+    result = subprocess.run([sys.executable, "-m", "src.main", "run", str(program)], capture_output=True, text=True)
+    assert result.returncode == 1 and result.stderr == ""
@@ -0,0 +1,176 @@
+import os
+import pytest
+from src.boot import Bootstrapper
+from src.image import compile_file, pack_words, unpack_words, HEADER
+
+
+def test_compile_and_load_matches_text(tmp_path):
+    image = compile_file("XML_files/6digit_start.txt", str(tmp_path / "prog.bml"))
+
+    text_boot = Bootstrapper()
+    text_boot.load_from_file("XML_files/6digit_start.txt")
+    image_boot = Bootstrapper()
+    image_boot.load_from_file(image)
+
+    assert image_boot.memory.memory == text_boot.memory.memory
+
+
+def test_image_runs_like_text(tmp_path):
+    image = compile_file("XML_files/6digit_start.txt", str(tmp_path / "prog.bml"))
+    boot = Bootstrapper()
+    boot.load_from_image(image)
+    boot.run(gui=None)
+
+    with open("XML_files/6digit_final.txt") as file:
+        final = [line.split()[0] for line in file if line.strip()]
+    assert boot.memory.memory[: len(final)] == final
+
+
+def test_compile_legacy_program(tmp_path):
+    image = compile_file("XML_files/4digit_start.txt", str(tmp_path / "prog.bml"))
+
+    text_boot = Bootstrapper()
+    text_boot.load_from_file("XML_files/4digit_start.txt")
+    image_boot = Bootstrapper()
+    image_boot.load_from_file(image)
+
+    assert image_boot.memory.memory == text_boot.memory.memory
+
+
+def test_image_memory_size_is_checked(tmp_path):
+    image = tmp_path / "prog.bml"
+    image.write_bytes(pack_words([10007, 43000], 1000))
+    assert Bootstrapper(1000).build_image(str(image)).memory_size == 1000
+    with pytest.raises(IndexError):
+        Bootstrapper(250).build_image(str(image))
+
+
+def test_header_memory_size_too_small():
+    data = bytearray(pack_words([10007, 43000, 0]))
+    data[8:12] = (2).to_bytes(4, "little")
+    with pytest.raises(ValueError):
+        unpack_words(bytes(data))
+
+
+def test_default_output_name(tmp_path):
+    source = tmp_path / "prog.txt"
+    source.write_text("+020003\n-000004\n+043000\n")
+    assert compile_file(str(source)) == str(tmp_path / "prog.bml")
+
+
+def test_round_trip_negative_words():
+    size, words = unpack_words(pack_words([-999999, 0, 999999, -1]))
+    assert size == 250
+    assert list(words) == [-999999, 0, 999999, -1]
+
+
+def test_corrupt_image():
+    data = bytearray(pack_words([10007, 43000]))
+    data[-1] ^= 0xFF
+    with pytest.raises(ValueError):
+        unpack_words(bytes(data))
+
+    with pytest.raises(ValueError):
+        unpack_words(b"UVSB")
+
+    with pytest.raises(ValueError):
+        unpack_words(b"XXXX" + bytes(data[4:]))
+
+
+def test_word_out_of_range():
+    data = pack_words([1000000])
+    with pytest.raises(ValueError):
+        unpack_words(data)
+    assert len(data) == HEADER.size + 4
+
+
+def test_invalid_text_word(tmp_path):
+    source = tmp_path / "bad.txt"
+    source.write_text("+020003\n+12\n")
+    with pytest.raises(ValueError):
+        compile_file(str(source))
+
+
+def test_program_too_large():
+    with pytest.raises(ValueError):
+        pack_words([0] * 251, 250)
+
+
+def test_program_image_is_shared_and_immutable():
+    boot = Bootstrapper()
+    image = boot.build_image("XML_files/6digit_start.txt")
+
+    with pytest.raises(AttributeError):
+        image.words = ()
+
+    machines = [Bootstrapper() for _ in range(3)]
+    for machine in machines:
+        machine.restore(image)
+        machine.run(gui=None)
+
+    with open("XML_files/6digit_final.txt") as file:
+        final = [line.split()[0] for line in file if line.strip()]
+    for machine in machines:
+        assert machine.memory.memory[: len(final)] == final
+
+    # The image itself is untouched by the runs
+    assert image.words[85] == "+000000"
+
+
+def test_restore_resets_memory_and_cpu():
+    boot = Bootstrapper()
+    boot.load_from_file("XML_files/6digit_start.txt")
+    start = list(boot.memory.memory)
+    boot.run(gui=None)
+    assert boot.memory.memory != start
+
+    boot.restore(boot.image)
+    assert boot.memory.memory == start
+    assert boot.cpu.pointer == 0
+    assert boot.cpu.accumulator == 0
+
+
+def test_program_image_pickles():
+    import pickle
+
+    image = Bootstrapper().build_image("XML_files/6digit_start.txt")
+    assert pickle.loads(pickle.dumps(image)) == image
+
+
+def test_load_program_records_image():
+    boot = Bootstrapper()
+    boot.load_program(["+020003", "+043000"])
+    assert boot.image.words == ("+020003", "+043000")
+
+
+def test_load_legacy_file_without_converting(tmp_path):
+    legacy = Bootstrapper()
+    legacy.load_from_file("XML_files/4digit_start.txt")
+    legacy.run(gui=None)
+
+    modern = Bootstrapper()
+    with open("XML_files/4digit_start.txt") as file:
+        modern.legacy_load([line.split()[0] for line in file if line.strip()])
+    modern.run(gui=None)
+
+    assert legacy.memory.memory == modern.memory.memory
+    assert not any(name.endswith("_converted.txt") for name in os.listdir("XML_files"))
+
+
+def test_load_mixed_file(tmp_path):
+    source = tmp_path / "mixed.txt"
+    source.write_text("+2003\n+030004\n-0001  legacy data\n+000005\n")
+    boot = Bootstrapper()
+    boot.load_from_file(str(source))
+    assert boot.memory.memory[:4] == ["+020003", "+030004", "-000001", "+000005"]
+
+    boot = Bootstrapper()
+    boot.load_program(["+2003", "+030004"])
+    assert boot.image.words == ("+020003", "+030004")
+
+
+def test_load_invalid_word(tmp_path):
+    source = tmp_path / "bad.txt"
+    source.write_text("+2003\n+30004\n")
+    with pytest.raises(ValueError):
+        Bootstrapper().load_from_file(str(source))
@@ -0,0 +1,81 @@
+import os
+import pytest
+from src.legacy import convert_directories, convert_file, converted_path, legacy_word_to_new
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def test_legacy_word_to_new():
+    assert legacy_word_to_new("+1007") == "+010007"
+    assert legacy_word_to_new("-4350") == "-043050"
+    with pytest.raises(ValueError):
+        legacy_word_to_new("+010007")
+
+
+def test_converted_path():
+    assert converted_path("dir/prog.txt") == "dir/prog_converted.txt"
+    assert converted_path("dir.d/prog") == "dir.d/prog_converted"
+
+
+def test_convert_file_matches_6digit(tmp_path):
+    with open("XML_files/Test1.txt") as file:
+        lines = file.read().split("\n")[:10]
+    source = write(tmp_path / "prog.txt", "\n".join(lines))
+    copy = convert_file(source)
+
+    with open(copy) as file:
+        converted = file.read()
+    assert not converted.endswith("\n")
+    assert converted.split("\n")[:7] == ["+010007", "+010008", "+020007", "+030008", "+021009", "+011009", "+043000"]
+
+
+def test_convert_file_already_converted(tmp_path):
+    source = write(tmp_path / "prog.txt", "+010007\n+043000\n")
+    with pytest.raises(ValueError):
+        convert_file(source)
+    assert os.listdir(tmp_path) == ["prog.txt"]
+
+
+def test_convert_file_nulls_invalid(tmp_path):
+    source = write(tmp_path / "prog.txt", "+1007\nabc\n+4300\n")
+    with pytest.raises(ValueError):
+        convert_file(source)
+    with open(converted_path(source)) as file:
+        assert file.read() == "+010007\n+000000\n+043000"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convert_directories(tmp_path, workers):
+    archive = tmp_path / "archive"
+    write(archive / "a.txt", "+1007\n+4300\n")
+    write(archive / "nested" / "b.txt", "+2005\nbad\n+4300\n")
+    write(archive / "modern.txt", "+010007\n+043000\n")
+    write(archive / "old_converted.txt", "+010007\n")
+    write(archive / "notes.md", "not a program")
+
+    out = tmp_path / "out"
+    report = convert_directories([str(archive)], str(out), workers=workers)
+
+    assert report["files"] == 3
+    assert report["converted"] == 2
+    assert report["skipped"] == 1
+    assert report["failed"] == 0
+    assert report["invalid_lines"] == [
+        {"file": str(archive / "nested" / "b.txt"), "line": 2, "word": "bad"},
+    ]
+
+    assert (out / "archive" / "a.txt").read_text() == "+010007\n+043000"
+    assert (out / "archive" / "nested" / "b.txt").read_text() == "+020005\n+000000\n+043000"
+    assert not (out / "archive" / "modern.txt").exists()
+    assert not any(name.endswith(".part") for _, _, files in os.walk(out) for name in files)
+
+
+def test_convert_directories_in_place(tmp_path):
+    source = write(tmp_path / "a.txt", "+1007\n")
+    report = convert_directories([str(tmp_path)], workers=1)
+    assert report["results"][0]["output"] == converted_path(source)
+    assert (tmp_path / "a_converted.txt").read_text() == "+010007"
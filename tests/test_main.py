@@ -0,0 +1,157 @@
+import json
+import pytest
+from src.boot import Bootstrapper
+from src.main import main
+from src.tape import TapeIO
+
+# READ 7, READ 8, LOAD 7, ADD 8, STORE 9, WRITE 9, HALT
+SUM = ["+010007", "+010008", "+020007", "+030008", "+021009", "+011009", "+043000"]
+
+
+def write_program(tmp_path, words, name="prog.txt"):
+    path = tmp_path / name
+    path.write_text("\n".join(words))
+    return str(path)
+
+
+@pytest.mark.parametrize("engine", ["reference", "fast"])
+def test_run_json(tmp_path, capsys, engine):
+    program = write_program(tmp_path, SUM)
+    assert main(["run", program, "--input", "5,-7", "--engine", engine, "--format", "json"]) == 0
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["halted"]
+    assert report["error"] is None
+    assert report["outputs"] == ["-000002"]
+    assert report["accumulator"] == "-000002"
+    assert report["steps"] == 7
+    assert report["memory"][9] == "-000002"
+
+
+def test_run_text_to_file(tmp_path, capsys):
+    program = write_program(tmp_path, SUM)
+    output = tmp_path / "out.txt"
+    assert main(["run", program, "--input", "1,2", "--output", str(output)]) == 0
+
+    assert capsys.readouterr().out == ""
+    lines = output.read_text().split("\n")
+    assert lines[:3] == ["+000003", "Halted", "Accumulator: +000003  Pointer: 007  Instructions: 7  Cycles: 13"]
+
+
+def test_run_errors(tmp_path, capsys):
+    program = write_program(tmp_path, SUM)
+    assert main(["run", program, "--input", "1", "--format", "json"]) == 1
+    assert "no input left" in json.loads(capsys.readouterr().out)["error"]
+
+    loop = write_program(tmp_path, ["+040000"], "loop.txt")
+    assert main(["run", loop, "--max-steps", "10", "--format", "json"]) == 1
+    report = json.loads(capsys.readouterr().out)
+    assert report["error"] == "MAX INSTRUCTIONS LIMIT REACHED : Halting"
+    assert report["steps"] == 10
+
+    assert main(["run", str(tmp_path / "missing.txt")]) == 1
+    assert "Error" in capsys.readouterr().out
+
+
+def test_run_json_verbose(tmp_path, capsys):
+    program = write_program(tmp_path, SUM)
+    assert main(["run", program, "--input", "5,7", "--format", "json", "-v"]) == 0
+
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)["outputs"] == ["+000012"]
+    events = [json.loads(line)["event"] for line in captured.err.splitlines()]
+    assert "memory" in events and events[-1] == "halt"
+
+
+@pytest.mark.parametrize("command", ["run", "batch", "bench", "watch", "debug"])
+def test_negative_max_steps(tmp_path, capsys, command):
+    program = write_program(tmp_path, SUM)
+    with pytest.raises(SystemExit):
+        main([command, program, "--max-steps", "-1"])
+    assert "must be at least 0" in capsys.readouterr().err
+
+
+def test_run_assembly_source(tmp_path, capsys):
+    source = tmp_path / "countdown.asm"
+    source.write_text("LOAD x\nloop: BRANCHZERO done\nSUBTRACT one\nSTORE x\nBRANCH loop\ndone: WRITE x\nHALT\nx: DATA 3\none: DATA 1\n")
+    assert main(["run", str(source), "--engine", "fast", "--format", "json"]) == 0
+    assert json.loads(capsys.readouterr().out)["outputs"] == ["+000000"]
+
+
+def test_tape_parse():
+    assert TapeIO.parse("5, -7,+000010,") == [5, -7, 10]
+    with pytest.raises(ValueError):
+        TapeIO.parse("5,abc")
+    with pytest.raises(ValueError):
+        TapeIO.parse("1000000")
+
+
+PROGRAMS = {
+    "countdown": ["+020006", "+031007", "+021006", "+042005", "+040000", "+043000", "+000050", "+000001"],
+    "sum": SUM,
+    "multiply_divide": ["+020005", "+033006", "+032007", "+021008", "+043000", "+000012", "+000005", "+000007"],
+    "store_overflow": ["+020003", "+033003", "+021004", "+999999", "+000000"],
+    "invalid_operator": ["+020003", "+050000", "+043000", "+000001"],
+    "negative_word": ["+020002", "-020002", "+000001"],
+    "no_op": ["+099000", "+043000"],
+    "out_of_range_operand": ["+020300", "+043000"],
+    "branch_away": ["+040400"],
+    "divide_by_zero": ["+020003", "+032004", "+043000", "+000007", "+000000"],
+}
+
+
+@pytest.mark.parametrize("name", sorted(PROGRAMS))
+def test_engines_match(name):
+    states = []
+    for engine in ("reference", "fast"):
+        boot = Bootstrapper()
+        boot.load_program(PROGRAMS[name])
+        tape = TapeIO([4, 9])
+        changes = boot.memory.watch()
+        try:
+            result = boot.run(tape, engine=engine)
+        except (IndexError, ZeroDivisionError) as e:
+            result = f"{type(e).__name__}: {e}"
+        cpu = boot.cpu
+        states.append((result, tape.outputs, cpu.accumulator, cpu.pointer, cpu.register,
+                       cpu.halted, cpu.steps, cpu.cycles, boot.memory.memory, sorted(changes)))
+
+    assert states[0] == states[1]
+
+
+def test_engines_match_on_sample_programs():
+    for file_name in ("XML_files/4digit_start.txt", "XML_files/6digit_start.txt", "XML_files/instructions_test.txt"):
+        states = []
+        for engine in ("reference", "fast"):
+            boot = Bootstrapper()
+            boot.load_from_file(file_name)
+            tape = TapeIO([5, 7, 3])
+            result = boot.run(tape, engine=engine)
+            states.append((result, tape.outputs, boot.cpu.accumulator, boot.cpu.pointer, boot.memory.memory))
+        assert states[0] == states[1], file_name
+
+
+def test_bench(tmp_path, capsys):
+    program = write_program(tmp_path, PROGRAMS["countdown"])
+    assert main(["bench", program, "--runs", "4", "--warmup", "1", "--format", "json"]) == 0
+
+    report = json.loads(capsys.readouterr().out)
+    assert set(report) == {"reference", "fast"}
+    for entry in report.values():
+        assert entry["result"] is None
+        assert entry["steps"] == 250
+        assert entry["runs"] == 4
+        assert entry["instructions_per_second"] > 0
+        assert entry["latency"]["min"] <= entry["latency"]["p50"] <= entry["latency"]["p99"] <= entry["latency"]["max"]
+        assert entry["peak_memory"] > 0
+
+    assert main(["bench", program, "--runs", "0"]) == 1
+
+
+def test_percentile():
+    from src.bench import percentile
+
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([3.0], 90) == 3.0
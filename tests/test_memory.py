@@ -62,3 +62,52 @@ def test_memory_string_representation():
         "\xa010 -002222 +000000 +000000 +000000 +000000 +000000 +000000 +000000 +000000 +000000"
     )
     assert str(memory) == expected
+
+
+def test_watch_tracks_changed_addresses():
+    memory = Memory()
+    changes = memory.watch()
+    memory.write(3, "+001234")
+    memory.write(3, "+004321")
+    memory.write(7, -5)
+    assert changes == {3: "+000000", 7: "+000000"}
+
+    changes.clear()
+    memory.clear()
+    assert len(changes) == 250
+    assert changes[3] == "+004321"
+
+    memory.unwatch(changes)
+    changes.clear()
+    memory.write(1, "+000001")
+    assert changes == {}
+
+
+def test_large_memory():
+    from src.boot import Bootstrapper
+
+    boot = Bootstrapper(memory_size=10000)
+    boot.load_from_file("XML_files/6digit_start.txt")
+    boot.run(gui=None)
+    assert boot.memory.read(85) == "+001875"
+    boot.memory.write(9999, "+000001")
+    assert str(boot.memory).endswith("+000001")
+
+
+def test_count_accesses():
+    memory = Memory()
+    memory.read(3)
+    assert memory.reads is None
+
+    memory.count_accesses()
+    memory.read(3)
+    memory.read(3)
+    memory.fetch(0)
+    memory.write(4, "+000001")
+    assert memory.reads[3] == 2
+    assert memory.executes[0] == 1
+    assert memory.writes[4] == 1
+    assert sum(memory.reads) == 2
+
+    memory.count_accesses(False)
+    assert memory.reads is None and memory.writes is None and memory.executes is None
@@ -0,0 +1,87 @@
+import csv
+import json
+import pytest
+from src.boot import Bootstrapper
+from src.profiler import ProfiledMemory
+from src.tape import TapeIO
+
+# Adds 4 to the input, then overwrites its own BRANCH with a HALT
+PROGRAM = [
+    "+010009",  # 0: READ 9
+    "+020009",  # 1: LOAD 9
+    "+030010",  # 2: ADD 10
+    "+021009",  # 3: STORE 9
+    "+020011",  # 4: LOAD 11
+    "+021006",  # 5: STORE 6, replaces the BRANCH below with HALT
+    "+040000",  # 6: BRANCH 0
+    "+000000",
+    "+000000",
+    "+000000",  # 9: value
+    "+000004",  # 10: increment
+    "+043000",  # 11: HALT word
+]
+
+
+def profiled_run(engine="reference"):
+    boot = Bootstrapper()
+    boot.load_program(PROGRAM)
+    profile = ProfiledMemory.attach(boot)
+    assert boot.run(TapeIO([3]), engine=engine) is None
+    return boot, profile
+
+
+@pytest.mark.parametrize("engine", ["reference", "fast"])
+def test_profile_records_accesses(engine):
+    boot, profile = profiled_run(engine)
+    assert boot.memory is profile and profile.memory[9] == "+000007"
+    rows = {row["address"]: row for row in profile.to_rows()}
+    assert profile.step == 7
+    assert rows[9]["readers"] == {1: 1} and rows[9]["writers"] == {0: 1, 3: 1}
+    assert (rows[9]["first_step"], rows[9]["last_step"]) == (1, 4)
+    assert rows[6]["self_modified"] and rows[6]["writers"] == {5: 1}
+    assert not rows[9]["self_modified"]
+    assert 7 not in rows  # Never touched
+
+
+def test_profile_exports(tmp_path):
+    _, profile = profiled_run()
+    profile.read(10)  # Outside a run, after the HALT: still attributed to the HALT's address
+    profile.current = None
+    profile.read(10)
+
+    profile.export(str(tmp_path / "profile.json"))
+    data = json.loads((tmp_path / "profile.json").read_text())
+    assert data["steps"] == 7
+    row = next(row for row in data["addresses"] if row["address"] == 10)
+    assert row["readers"] == {"2": 1, "6": 1, "none": 1}
+
+    profile.export(str(tmp_path / "profile.csv"))
+    with open(tmp_path / "profile.csv", newline="") as file:
+        rows = {int(row["address"]): row for row in csv.DictReader(file)}
+    assert rows[10]["readers"] == "-:1 2:1 6:1"
+    assert rows[6]["self_modified"] == "True"
+
+
+def test_profile_summary():
+    _, profile = profiled_run()
+    lines = profile.summary().splitlines()
+    assert len(lines) == 1 + 25
+    # Row 0: executes, reads and writes of addresses 0-9 in str(Memory) layout
+    assert lines[1] == "\xa000 " + " ".join(f"{cell:>7}" for cell in [1, 1, 1, 1, 1, 1, 2, ".", ".", 3]) + " | 11"
+    assert lines[2].split("|")[0].split()[1:] == ["1", "1", ".", ".", ".", ".", ".", ".", ".", "."]
+    with pytest.raises(ValueError):
+        profile.summary("bogus")
+
+
+def test_run_profile_option(tmp_path, capsys):
+    from src.main import main
+    program = tmp_path / "prog.txt"
+    program.write_text("\n".join(PROGRAM))
+    assert main(["run", str(program), "--input", "3", "--engine", "fast", "--profile", str(tmp_path / "p.csv")]) == 0
+    assert "   accesses" in capsys.readouterr().out
+    assert (tmp_path / "p.csv").read_text().startswith("address,word,reads")
+
+    # Profiled runs fall back to the reference engine, the report says so
+    assert main(["run", str(program), "--input", "3", "--engine", "fast", "--profile", str(tmp_path / "p.json"),
+                 "--format", "json"]) == 0
+    assert json.loads(capsys.readouterr().out)["engine"] == "reference"
@@ -0,0 +1,35 @@
+import json
+import subprocess
+import sys
+import pytest
+
+# Cold import budget for the core CPU module, in seconds. A cold import takes a few
+# milliseconds, the budget leaves room for slow machines but fails if Tk or other
+# heavy modules creep back into the import chain.
+CPU_IMPORT_BUDGET = 0.1
+
+HEAVY_MODULES = ("tkinter", "termcolor", "difflib", "multiprocessing")
+
+
+def cold_import(module):
+    """Import module in a fresh interpreter, returning (seconds, heavy modules loaded)."""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps([elapsed, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def test_cpu_cold_import_time():
+    # Best of a few runs, to not fail on a single scheduling hiccup
+    elapsed = min(cold_import("src.cpu")[0] for _ in range(3))
+    assert elapsed < CPU_IMPORT_BUDGET
+
+
+@pytest.mark.parametrize("module", ["src.memory", "src.cpu", "src.boot", "src.legacy", "src.tape", "src.main"])
+def test_core_imports_without_gui_or_color(module):
+    assert cold_import(module)[1] == []
@@ -0,0 +1,60 @@
+import json
+import time
+import pytest
+from src.boot import Bootstrapper
+from src.tape import TapeIO
+from src.trace import Tracer
+
+# READ 7, LOAD 7, BRANCHZERO 5, SUBTRACT 8, BRANCH 1, HALT, -, data, 1: counts the input down to zero
+COUNTDOWN = ["+010007", "+020007", "+042005", "+031008", "+040002", "+043000", "+000000", "+000000", "+000001"]
+
+
+class SlowTape(TapeIO):
+    def read_word(self):
+        time.sleep(0.01)
+        return super().read_word()
+
+
+def traced_run(tmp_path, sample=1, engine="reference"):
+    program = tmp_path / "countdown.txt"
+    program.write_text("\n".join(COUNTDOWN))
+    boot = Bootstrapper()
+    boot.cpu.tracer = Tracer(sample)
+    boot.load_from_file(str(program))
+    assert boot.run(SlowTape([3]), engine=engine) is None
+    return boot.cpu.tracer.to_json()["traceEvents"]
+
+
+@pytest.mark.parametrize("engine", ["reference", "fast"])
+def test_trace_spans(tmp_path, engine):
+    events = traced_run(tmp_path, engine=engine)
+    spans = [event for event in events if event["ph"] == "X"]
+    names = [event["name"] for event in spans]
+    assert names[0] == "load" and names[-1] == "run"
+    # 0-2 READ/LOAD/BRANCHZERO, then 3 rounds of SUBTRACT/BRANCH + BRANCHZERO, the last one jumping to the HALT
+    assert names[1:-1] == ["READ", "block 000-002"] + ["block 003-004", "block 002-002"] * 3 + ["block 005-005"]
+    read = spans[1]
+    assert read["dur"] >= 10000 and read["args"] == {"address": 7}
+    run = spans[-1]
+    assert run["args"]["steps"] == 3 + 3 * 3 + 1
+    # Blocks and the input wait nest inside the run span
+    assert all(run["ts"] <= event["ts"] and event["ts"] + event["dur"] <= run["ts"] + run["dur"] for event in spans[1:-1])
+    assert {event["ph"] for event in events} == {"M", "X"}
+
+
+def test_block_sampling(tmp_path):
+    names = [event["name"] for event in traced_run(tmp_path, sample=3) if event["name"].startswith("block")]
+    assert names == ["block 002-002", "block 003-004"]  # The 3rd and 6th of 8 blocks
+    with pytest.raises(ValueError):
+        Tracer(0)
+
+
+def test_run_trace_option(tmp_path):
+    from src.main import main
+    program = tmp_path / "countdown.txt"
+    program.write_text("\n".join(COUNTDOWN))
+    trace = tmp_path / "trace.json"
+    assert main(["run", str(program), "--input", "2", "--engine", "fast", "--trace", str(trace)]) == 0
+    events = json.loads(trace.read_text())["traceEvents"]
+    assert {"load", "run", "READ"} <= {event["name"] for event in events}
+    assert main(["run", str(program), "--trace", str(trace), "--trace-sample", "0"]) == 1
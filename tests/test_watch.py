@@ -0,0 +1,60 @@
+import os
+from src.boot import Bootstrapper
+from src.watch import ProgramWatcher, format_report
+
+# READ 7, READ 8, LOAD 7, ADD 8, STORE 9, WRITE 9, HALT
+SUM = ["+010007", "+010008", "+020007", "+030008", "+021009", "+011009", "+043000"]
+
+
+def save(path, lines):
+    path.write_text("\n".join(lines))
+    # Make sure the change is visible even on filesystems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_rerun_on_change(tmp_path):
+    program = tmp_path / "prog.txt"
+    save(program, SUM)
+    watcher = ProgramWatcher(Bootstrapper(), str(program), inputs=[2, 3])
+
+    report = watcher.poll()
+    assert report["diff"] is None
+    assert report["state"]["outputs"] == ["+000005"]
+    assert watcher.parse_count == len(SUM)
+    assert watcher.poll() is None
+
+    # ADD becomes SUBTRACT: one line is parsed again
+    changed = list(SUM)
+    changed[3] = "+031008"
+    save(program, changed)
+    report = watcher.poll()
+    assert watcher.parse_count == len(SUM) + 1
+    assert report["state"]["outputs"] == ["-000001"]
+    fields = {change["field"]: change for change in report["diff"]}
+    assert fields["outputs"]["current"] == ["-000001"]
+    assert fields["memory[3]"]["previous"] == "+030008"
+    assert fields["memory[9]"]["current"] == "-000001"
+    assert "memory[9]: +000005 -> -000001" in format_report(report)
+
+
+def test_unchanged_content_is_not_reloaded(tmp_path):
+    program = tmp_path / "prog.txt"
+    save(program, SUM)
+    watcher = ProgramWatcher(Bootstrapper(), str(program), inputs=[1, 1])
+    watcher.poll()
+
+    save(program, SUM)  # New mtime, same content
+    assert watcher.poll() is None
+    assert watcher.parse_count == len(SUM)
+
+
+def test_invalid_word_keeps_watching(tmp_path):
+    program = tmp_path / "prog.txt"
+    save(program, ["+020003", "+2x", "+043000"])
+    watcher = ProgramWatcher(Bootstrapper(), str(program))
+    assert "Invalid Instruction" in watcher.poll()["error"]
+
+    save(program, ["+020002", "+043000", "+000042"])
+    report = watcher.poll()
+    assert report["state"]["accumulator"] == "+000042"
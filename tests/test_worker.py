@@ -0,0 +1,143 @@
+import queue
+import pytest
+from src.boot import Bootstrapper
+from src.cpu import CPU
+from src.worker import CPUWorker
+
+# READ 7, READ 8, LOAD 7, ADD 8, STORE 9, WRITE 9, HALT
+SUM = ["+010007", "+010008", "+020007", "+030008", "+021009", "+011009", "+043000"]
+# BRANCH 0 forever
+LOOP = ["+040000"]
+
+
+def next_event(worker, kind):
+    while True:
+        event = worker.events.get(timeout=5)
+        if event[0] == kind:
+            return event
+        if event[0] == CPUWorker.STATE:
+            worker.acknowledge()
+
+
+def test_worker_io_round_trip():
+    boot = Bootstrapper()
+    boot.load_program(SUM)
+    worker = CPUWorker(boot, refresh_rate=30)
+    worker.start()
+
+    next_event(worker, CPUWorker.READ)
+    worker.provide_input(5)
+    next_event(worker, CPUWorker.READ)
+    worker.provide_input(-7)
+
+    assert next_event(worker, CPUWorker.WRITE) == (CPUWorker.WRITE, "-000002")
+    assert next_event(worker, CPUWorker.DONE) == (CPUWorker.DONE, None)
+    worker.join(5)
+    assert not worker.running
+    assert boot.cpu.halted
+
+
+def test_animate_waits_for_each_draw():
+    boot = Bootstrapper()
+    boot.load_program(LOOP)
+    worker = CPUWorker(boot, refresh_rate=None)
+    worker.start()
+
+    state = worker.events.get(timeout=5)
+    assert state[0] == CPUWorker.STATE
+    # Nothing more is posted until the state is acknowledged
+    try:
+        worker.events.get(timeout=0.05)
+        assert False, "worker ran ahead of the display"
+    except queue.Empty:
+        pass
+
+    worker.stop()
+    assert next_event(worker, CPUWorker.DONE) == (CPUWorker.DONE, None)
+
+
+def test_stop_preempts_running_program(monkeypatch):
+    monkeypatch.setattr(CPU, "MAX_INSTRUCTION_LIMIT", 10**9)
+    boot = Bootstrapper()
+    boot.load_program(LOOP)
+    worker = CPUWorker(boot, refresh_rate=30)
+    worker.start()
+
+    next_event(worker, CPUWorker.STATE)
+    worker.stop()
+    assert next_event(worker, CPUWorker.DONE) == (CPUWorker.DONE, None)
+    worker.join(5)
+    assert not worker.running
+
+
+def test_stop_right_after_start(monkeypatch):
+    monkeypatch.setattr(CPU, "MAX_INSTRUCTION_LIMIT", 10**9)
+    boot = Bootstrapper()
+    boot.load_program(LOOP)
+    boot.cpu.stop()  # Left over from an earlier run, cleared by start()
+    worker = CPUWorker(boot, refresh_rate=30)
+    worker.start()
+    worker.stop()  # May land before the engine loop starts
+    assert next_event(worker, CPUWorker.DONE) == (CPUWorker.DONE, None)
+    worker.join(5)
+    assert not worker.running
+
+
+@pytest.mark.parametrize("engine", ["reference", "fast"])
+def test_stop_before_run(engine):
+    boot = Bootstrapper()
+    boot.load_program(LOOP)
+    boot.cpu.stop()
+    assert boot.run(None, max_steps=100, engine=engine) is None
+    assert boot.cpu.steps == 0
+    assert boot.cpu.halted
+
+    boot.restore(boot.image)
+    assert boot.run(None, max_steps=100, engine=engine) == CPU.LIMIT_REACHED
+
+
+def test_unexpected_error_is_reported():
+    boot = Bootstrapper()
+    # LOAD 3, DIVIDE 4 (zero), HALT
+    boot.load_program(["+020003", "+032004", "+043000", "+000005", "+000000"])
+    worker = CPUWorker(boot, refresh_rate=30)
+    worker.start()
+    assert next_event(worker, CPUWorker.DONE) == (CPUWorker.DONE, "Error: division by zero")
+
+
+def test_stop_while_waiting_for_input():
+    boot = Bootstrapper()
+    boot.load_program(SUM)
+    worker = CPUWorker(boot, refresh_rate=30)
+    worker.start()
+
+    next_event(worker, CPUWorker.READ)
+    worker.stop()
+    assert next_event(worker, CPUWorker.DONE) == (CPUWorker.DONE, None)
+    assert boot.cpu.halted
+
+
+def test_independent_machines_run_concurrently():
+    # One machine blocks on READ while another runs to completion, like two GUI tabs
+    waiting = Bootstrapper()
+    waiting.load_program(SUM)
+    first = CPUWorker(waiting, refresh_rate=30)
+    first.start()
+    next_event(first, CPUWorker.READ)
+
+    other = Bootstrapper()
+    other.load_program(SUM)
+    second = CPUWorker(other, refresh_rate=30)
+    second.start()
+    next_event(second, CPUWorker.READ)
+    second.provide_input(1)
+    next_event(second, CPUWorker.READ)
+    second.provide_input(2)
+    assert next_event(second, CPUWorker.DONE) == (CPUWorker.DONE, None)
+
+    assert first.running
+    assert waiting.memory.read(9) == "+000000"
+    assert other.memory.read(9) == "+000003"
+
+    first.stop()
+    assert next_event(first, CPUWorker.DONE) == (CPUWorker.DONE, None)